@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+"""
+QuickSight-visning i kiosk/fullskjerm (Selenium).
+
+Modulene importerer kun standardbiblioteket ved import; Selenium lastes først når en
+nettleser faktisk startes (browser.setup_driver), og venv-oppsettet (env.ensure_env)
+kjøres kun fra inngangspunktene scraper.py, mechanics_scraper.py og `python -m quicksight_kiosk`.
+
+- config:    innstillinger fra .env, byer og dashboard-URL-er
+- schedule:  tema etter klokkeslett og faste restarter
+- metrics:   JSON-lines-metrikker og Prometheus-endepunkt
+- browser:   driver-fabrikk (Chrome-profil, kiosk-flagg, nettverksfilter)
+- auth:      innlogging
+- health:    helseprobe og venting på synlig dashboard
+- recovery:  gjenoppretting i trinn og prosessrestart
+- kiosk:     visningsløkkene (én visning og rotasjon)
+- extract:   datauttrekk
+"""
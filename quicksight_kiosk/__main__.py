@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+"""python -m quicksight_kiosk [--extract …] [--check-env]"""
+
+from quicksight_kiosk.env import ensure_env
+
+ensure_env()
+
+from quicksight_kiosk.cli import run  # noqa: E402  (etter eventuell exec inn i venv)
+
+run()
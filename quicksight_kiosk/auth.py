@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""Innlogging i QuickSight (konto, e-post, passord). Hopper over alt når profilen allerede er innlogget."""
+
+import os
+import time
+
+from .config import DEFAULT_URL, load_dotenv
+from .metrics import metric_observe
+from .session import (
+    SESSION_STATE, SESSION_STORE_FILE, load_session, restore_session, save_session, session_accepted,
+    discard_session,
+)
+from .waits import click_xpath_if_present, type_into, wait_any_css
+
+# Selectors
+SEL_ACCOUNT = "#account-name-input"
+SEL_EMAIL = "#username-input, input#username, input[name='username'], input[type='email']"
+SEL_PASS = "input#awsui-input-0, input[id^='awsui-input'], input[type='password'], input.awsui-input-type-password, #password"
+SEL_NEXT = "//button[contains(., 'Next') or contains(., 'Neste') or @type='submit']"
+SEL_SIGNIN = "//button[contains(., 'Sign in') or @type='submit']"
+
+
+def credentials():
+    """(konto, brukernavn, passord) fra miljøet/.env."""
+    if load_dotenv:
+        load_dotenv()
+    account = os.getenv("ACCOUNT_NAME", "ryde-tech").strip()
+    username = os.getenv("USERNAME", "").strip()
+    password = os.getenv("PASSWORD", "").strip()
+    return account, username, password
+
+
+def login_if_needed(driver, account, username, password, target_url=DEFAULT_URL, use_session=True, save=True):
+    """
+    Logg inn via skjemaet hvis nettleseren havner på signin. use_session=False hopper over lagret
+    sesjon og tvinger en ny innlogging (fornyelse i bakgrunnen, se reauth). save=False lar den delte
+    sesjonsfilen være i fred (benchmarken mot mock-serveren). True ved suksess.
+    """
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.common.exceptions import TimeoutException
+
+    print("➡️  Går til innloggingssiden …")
+    t0 = time.time()
+    driver.get(target_url)
+    time.sleep(1.0)
+
+    # Profilens egne cookies er utløpt: prøv lagret sesjon fra en annen prosess før skjemaet
+    if ("signin" in driver.current_url.lower() and use_session and not SESSION_STATE["restored"]
+            and restore_session(driver)):
+        driver.get(target_url)
+
+    # Hvis vi allerede er innlogget (lagret sesjon eller persistent profil), gå direkte til dashboard
+    if "signin" not in driver.current_url.lower():
+        outcome = "session" if SESSION_STATE["restored"] else "profile"
+        source = "lagret sesjon" if outcome == "session" else "profil"
+        print(f"✅ Allerede innlogget ({source}). Hopper til dashboard …")
+        session_accepted(driver)
+        if outcome == "profile":
+            # Profilens innlogging har ukjent alder; samme innlogging ligger trolig i delt sesjon
+            stored = load_session() if SESSION_STORE_FILE.exists() else None
+            SESSION_STATE["authenticated_at"] = stored["saved_at"] if stored else time.time()
+            if stored is None and save:
+                save_session(driver)
+        metric_observe("qs_login_seconds", time.time() - t0, outcome=outcome)
+        return True
+
+    if use_session and SESSION_STATE["restored"]:
+        print("⚠️  Lagret sesjon ble avvist – logger inn via skjemaet.")
+        discard_session()
+
+    # 1) Account name
+    try:
+        print("🔎 Fyller konto-navn …")
+        type_into(driver, SEL_ACCOUNT, account, timeout=15)
+        if not click_xpath_if_present(driver, SEL_NEXT, timeout=5):
+            print("ℹ️  Fant ikke Next-knapp etter konto. Fortsetter …")
+    except Exception as e:
+        print("ℹ️  Konto-felt ikke synlig:", e)
+
+    # 2) E-post / brukernavn
+    try:
+        print("📧 Fyller e-post …")
+        type_into(driver, SEL_EMAIL, username, timeout=15)
+        if not click_xpath_if_present(driver, SEL_NEXT, timeout=5):
+            print("ℹ️  Fant ikke Next-knapp etter e-post. Fortsetter …")
+    except Exception as e:
+        print("❌ Fant ikke e-postfelt:", e)
+
+    # 3) Passord
+    try:
+        print("🔐 Fyller passord …")
+        type_into(driver, SEL_PASS, password, timeout=15)
+    except Exception as e:
+        print("❌ Fant ikke passordfelt:", e)
+
+    # 4) Sign in
+    if not click_xpath_if_present(driver, SEL_SIGNIN, timeout=10):
+        print("ℹ️  Fant ikke 'Sign in'-knapp – forsøker å submitte med Enter …")
+        try:
+            el = wait_any_css(driver, SEL_PASS, timeout=5)
+            el.submit()
+        except Exception:
+            pass
+
+    # Vent på at vi forlater signin
+    try:
+        WebDriverWait(driver, 60).until(lambda d: "signin" not in d.current_url.lower())
+        print("✅ Innlogging OK.")
+        metric_observe("qs_login_seconds", time.time() - t0, outcome="ok")
+        SESSION_STATE["authenticated_at"] = time.time()
+        session_accepted(driver)
+        if save:
+            try:
+                save_session(driver)
+            except Exception as e:
+                print(f"⚠️  Klarte ikke lagre sesjon: {e}")
+        return True
+    except TimeoutException:
+        print("⚠️  Ser fortsatt signin-URL – kanskje MFA eller feil passord?")
+        metric_observe("qs_login_seconds", time.time() - t0, outcome="failed")
+        return False
+
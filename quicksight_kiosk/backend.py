@@ -0,0 +1,375 @@
+# -*- coding: utf-8 -*-
+"""
+Playwright-motor bak samme grensesnitt som Selenium WebDriver. PlaywrightDriver implementerer delmengden av
+WebDriver som pakken bruker (get, execute_script, execute_cdp_cmd, faner, elementer, performance-logg),
+så auth, health, refresh og kiosk-løkkene er uendret. Chrome styres over én vedvarende CDP-forbindelse
+per fane i stedet for et HTTP-kall til chromedriver per kommando. Selenium-pakken trengs fortsatt for
+WebDriverWait og unntakstypene.
+"""
+
+import os
+import sys
+import json
+import time
+import functools
+from types import SimpleNamespace
+
+from .env import timed_phase
+
+# Network-hendelser som samles når performance_log er på (samme format som chromedrivers performance-logg)
+PERF_LOG_EVENTS = (
+    "Network.requestWillBeSent", "Network.responseReceived", "Network.loadingFinished", "Network.loadingFailed",
+)
+# Selenium venter i opptil 300 s på sidelasting; samme grense her
+PAGE_LOAD_TIMEOUT_MS = 300_000
+# Én Playwright-instans (node-driver) per prosess, delt av alle nettlesere (kiosk + skjult re-auth)
+PLAYWRIGHT = {"pw": None, "pid": None, "users": 0}
+
+# Kjører et Selenium-skript (funksjonskropp med arguments og return) i siden. DOM-noder kan ikke serialiseres,
+# så et resultat med noder legges i window.__qsResult og hentes som handle i et eget kall.
+EXEC_JS = """([src, args]) => {
+    const value = new Function(src).apply(window, args);
+    const isNode = v => v instanceof Node;
+    if (isNode(value) || (Array.isArray(value) && value.some(isNode))) {
+        window.__qsResult = value;
+        return {handle: true};
+    }
+    return {value: value === undefined ? null : value};
+}"""
+SUBMIT_JS = "el => { const f = el.form || el.closest('form'); if (f) f.requestSubmit(); }"
+TAKE_RESULT_JS = "() => { const v = window.__qsResult; delete window.__qsResult; return v; }"
+# execute_async_script: siste argument er callbacken, som i Selenium
+EXEC_ASYNC_JS = """([src, args, timeoutMs]) => new Promise((resolve, reject) => {
+    const timer = setTimeout(() => reject(new Error('qs-script-timeout')), timeoutMs);
+    new Function(src).apply(window, args.concat([v => { clearTimeout(timer); resolve(v === undefined ? null : v); }]));
+})"""
+
+
+def _child_pids():
+    """PID-er til denne prosessens barn (Linux /proc, tom mengde ellers)."""
+    pids = set()
+    try:
+        for task in os.listdir("/proc/self/task"):
+            with open(f"/proc/self/task/{task}/children") as f:
+                pids.update(int(c) for c in f.read().split())
+    except (OSError, ValueError):
+        pass
+    return pids
+
+
+def _webdriver_error(exc, default="WebDriverException"):
+    """Playwright-feil -> tilsvarende Selenium-unntak, så eksisterende except/ignored_exceptions virker."""
+    from selenium.common import exceptions
+    message = str(exc).splitlines()[0] if str(exc) else type(exc).__name__
+    if type(exc).__name__ == "TimeoutError" or "qs-script-timeout" in message:
+        return exceptions.TimeoutException(message)
+    if "has been closed" in message or "Target closed" in message:
+        return exceptions.NoSuchWindowException(message)
+    return getattr(exceptions, default)(message)
+
+
+def _command(default="WebDriverException"):
+    """Tell kallet som én rundtur (webdriver_calls) og oversett Playwright-feil til Selenium-unntak."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            self._qs_call_count += 1
+            try:
+                return fn(self, *args, **kwargs)
+            except Exception as e:
+                if type(e).__module__.startswith("playwright"):
+                    raise _webdriver_error(e, default) from e
+                raise
+        return wrapper
+    return decorate
+
+
+class PlaywrightElement:
+    """WebElement-delmengde over en Playwright ElementHandle. Kallene telles på driveren, som i Selenium."""
+
+    def __init__(self, driver, handle):
+        self._driver = driver
+        self._handle = handle
+
+    def _counted(self, fn, *args):
+        self._driver._qs_call_count += 1
+        try:
+            return fn(*args)
+        except Exception as e:
+            if type(e).__module__.startswith("playwright"):
+                raise _webdriver_error(e, "StaleElementReferenceException") from e
+            raise
+
+    def click(self):
+        self._counted(self._handle.click)
+
+    def clear(self):
+        self._counted(self._handle.fill, "")
+
+    def send_keys(self, text):
+        self._counted(self._handle.type, text)
+
+    def submit(self):
+        self._counted(self._handle.evaluate, SUBMIT_JS)
+
+    def is_displayed(self):
+        return self._counted(self._handle.is_visible)
+
+    def get_attribute(self, name):
+        return self._counted(self._handle.get_attribute, name)
+
+    @property
+    def text(self):
+        return self._counted(self._handle.inner_text)
+
+    @property
+    def size(self):
+        box = self._counted(self._handle.bounding_box) or {}
+        return {"width": box.get("width", 0), "height": box.get("height", 0)}
+
+
+class _SwitchTo:
+    def __init__(self, driver):
+        self._driver = driver
+
+    def window(self, handle):
+        self._driver._switch(handle)
+
+    def new_window(self, type_hint="tab"):
+        self._driver._new_page()
+
+
+class PlaywrightDriver:
+    """
+    WebDriver-delmengde over en Playwright BrowserContext. Et vindushåndtak er fanens CDP target-id,
+    så handles fra Target.createTarget (preload) og window_handles er de samme.
+    """
+
+    def __init__(self, context, performance_log=False, driver_pid=None, profile_dir=None):
+        self._context = context
+        self._profile_dir = profile_dir
+        self._targets = {}  # target-id -> (Page, CDPSession)
+        self._perf_log = [] if performance_log else None
+        self._script_timeout_ms = 30_000
+        self._qs_call_count = 0
+        # chrome_rss_mb() måler prosesstreet under service.process.pid, som for chromedriver
+        self.service = SimpleNamespace(process=SimpleNamespace(pid=driver_pid))
+        self.switch_to = _SwitchTo(self)
+        page = context.pages[0] if context.pages else context.new_page()
+        self._handle = self._attach(page)
+
+    # --- faner ---
+
+    def _attach(self, page):
+        cdp = self._context.new_cdp_session(page)
+        target_id = cdp.send("Target.getTargetInfo")["targetInfo"]["targetId"]
+        self._targets[target_id] = (page, cdp)
+        if self._perf_log is not None:
+            cdp.send("Network.enable")
+            for event in PERF_LOG_EVENTS:
+                cdp.on(event, functools.partial(self._log_event, event))
+        return target_id
+
+    def _log_event(self, method, params):
+        self._perf_log.append({
+            "message": json.dumps({"message": {"method": method, "params": params}}),
+            "timestamp": int(time.time() * 1000),
+        })
+
+    def _sync_targets(self):
+        """Fang opp faner åpnet utenfor Playwright (CDP Target.createTarget) og glem lukkede."""
+        known = {id(page) for page, _ in self._targets.values()}
+        for page in self._context.pages:
+            if id(page) not in known:
+                self._attach(page)
+        for target_id, (page, _) in list(self._targets.items()):
+            if page.is_closed():
+                del self._targets[target_id]
+
+    @property
+    def _page(self):
+        from selenium.common.exceptions import NoSuchWindowException
+        entry = self._targets.get(self._handle)
+        if entry is None:
+            raise NoSuchWindowException(f"Fanen {self._handle} er lukket")
+        return entry[0]
+
+    @_command()
+    def _switch(self, handle):
+        deadline = time.time() + 5
+        self._sync_targets()
+        # En fane fra Target.createTarget meldes til Playwright asynkront; gi den litt tid
+        while handle not in self._targets and self._context.pages and time.time() < deadline:
+            self._context.pages[0].wait_for_timeout(100)
+            self._sync_targets()
+        if handle not in self._targets:
+            from selenium.common.exceptions import NoSuchWindowException
+            raise NoSuchWindowException(f"Ukjent fane: {handle}")
+        self._handle = handle
+        self._targets[handle][0].bring_to_front()
+
+    @_command()
+    def _new_page(self):
+        page = self._context.new_page()
+        self._handle = self._attach(page)
+        page.bring_to_front()
+
+    @property
+    def window_handles(self):
+        self._sync_targets()
+        return list(self._targets)
+
+    @property
+    def current_window_handle(self):
+        return self._handle
+
+    @_command()
+    def close(self):
+        page, _ = self._targets.pop(self._handle)
+        page.close()
+
+    # --- navigasjon og skript ---
+
+    @_command()
+    def get(self, url):
+        self._page.goto(url, wait_until="load", timeout=PAGE_LOAD_TIMEOUT_MS)
+
+    @property
+    def current_url(self):
+        return self._current_url()
+
+    @_command()
+    def _current_url(self):
+        # page.url oppdateres bare når sync-API-et behandler hendelser, ikke under time.sleep i en
+        # WebDriverWait: spør siden selv. Midt i en navigasjon er page.url fersk etter det feilede kallet.
+        page = self._page
+        try:
+            return page.evaluate("() => location.href")
+        except Exception:
+            return page.url
+
+    @property
+    def title(self):
+        return self._title()
+
+    @_command()
+    def _title(self):
+        return self._page.title()
+
+    def _unwrap(self, handle):
+        element = handle.as_element()
+        if element is not None:
+            return PlaywrightElement(self, element)
+        props = handle.get_properties()
+        items = [props[k] for k in sorted((k for k in props if k.isdigit()), key=int)]
+        return [PlaywrightElement(self, h.as_element()) if h.as_element() else h.json_value() for h in items]
+
+    @_command("JavascriptException")
+    def execute_script(self, script, *args):
+        page = self._page
+        result = page.evaluate(EXEC_JS, [script, list(args)])
+        if not result.get("handle"):
+            return result["value"]
+        self._qs_call_count += 1
+        return self._unwrap(page.evaluate_handle(TAKE_RESULT_JS))
+
+    @_command("JavascriptException")
+    def execute_async_script(self, script, *args):
+        return self._page.evaluate(EXEC_ASYNC_JS, [script, list(args), self._script_timeout_ms])
+
+    def set_script_timeout(self, seconds):
+        self._script_timeout_ms = int(seconds * 1000)
+
+    @_command()
+    def execute_cdp_cmd(self, cmd, cmd_args):
+        return self._targets[self._handle][1].send(cmd, cmd_args)
+
+    @_command("NoSuchElementException")
+    def find_element(self, by, value):
+        element = self._page.query_selector(f"{'xpath' if by == 'xpath' else 'css'}={value}")
+        if element is None:
+            from selenium.common.exceptions import NoSuchElementException
+            raise NoSuchElementException(f"{by}: {value}")
+        return PlaywrightElement(self, element)
+
+    @_command()
+    def find_elements(self, by, value):
+        elements = self._page.query_selector_all(f"{'xpath' if by == 'xpath' else 'css'}={value}")
+        return [PlaywrightElement(self, el) for el in elements]
+
+    # --- vindu, logg og avslutning ---
+
+    @_command()
+    def get_window_size(self):
+        return self._page.evaluate("() => ({width: window.outerWidth, height: window.outerHeight})")
+
+    @_command()
+    def fullscreen_window(self):
+        cdp = self._targets[self._handle][1]
+        window_id = cdp.send("Browser.getWindowForTarget")["windowId"]
+        cdp.send("Browser.setWindowBounds", {"windowId": window_id, "bounds": {"windowState": "fullscreen"}})
+
+    @property
+    def capabilities(self):
+        """Som chromedriver: DevTools-adressen (--remote-debugging-port=0 skriver porten i profilen)."""
+        try:
+            with open(os.path.join(self._profile_dir, "DevToolsActivePort")) as f:
+                port = f.readline().strip()
+        except (OSError, TypeError):
+            return {}
+        return {"goog:chromeOptions": {"debuggerAddress": f"127.0.0.1:{port}"}}
+
+    def get_log(self, log_type):
+        """Som chromedrivers performance-logg: hendelser siden forrige kall, deretter tømt."""
+        if log_type != "performance" or self._perf_log is None:
+            return []
+        entries, self._perf_log[:] = list(self._perf_log), []
+        return entries
+
+    def quit(self):
+        try:
+            self._context.close()
+        finally:
+            PLAYWRIGHT["users"] -= 1
+            if PLAYWRIGHT["users"] <= 0 and PLAYWRIGHT["pw"] is not None:
+                PLAYWRIGHT["pw"].stop()
+                PLAYWRIGHT.update(pw=None, pid=None, users=0)
+
+
+def _playwright():
+    """Start (eller gjenbruk) prosessens Playwright-instans. Importtiden telles som oppstartsfasen "imports"."""
+    if PLAYWRIGHT["pw"] is None:
+        t0 = time.time()
+        try:
+            from playwright.sync_api import sync_playwright
+        except ImportError:
+            print("❌ DRIVER_BACKEND=playwright krever Playwright: ~/quicksight-env/bin/pip install playwright")
+            sys.exit(2)
+        timed_phase("imports", t0)
+        before = _child_pids()
+        PLAYWRIGHT["pw"] = sync_playwright().start()
+        # Node-driveren Playwright starter er ny barneprosess; Chrome havner under den
+        PLAYWRIGHT["pid"] = next(iter(_child_pids() - before), None)
+    return PLAYWRIGHT["pw"]
+
+
+def start_playwright(chrome_exec, profile_dir, args, headless, performance_log=False):
+    """
+    Start Chrome med samme flagg som Selenium-varianten via Playwright (systemets Chrome, ingen
+    `playwright install`). Returnerer en PlaywrightDriver.
+    """
+    pw = _playwright()
+    context = pw.chromium.launch_persistent_context(
+        profile_dir,
+        executable_path=chrome_exec,
+        # Headless styres med samme --headless=new som Selenium-varianten
+        headless=False,
+        # Egen DevTools-port ved siden av Playwrights pipe, for nettverksfilteret (network.py)
+        args=list(args) + ["--remote-debugging-port=0"] + (["--headless=new"] if headless else []),
+        # Fjern "Chrome kontrolleres av programvare for automatisk testing"
+        ignore_default_args=["--enable-automation"],
+        no_viewport=True,
+    )
+    PLAYWRIGHT["users"] += 1
+    return PlaywrightDriver(context, performance_log=performance_log, driver_pid=PLAYWRIGHT["pid"],
+                            profile_dir=profile_dir)
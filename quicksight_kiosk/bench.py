@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark mot lokal mock-QuickSight (mockserver): innlogging, første render, helsesjekk og refresh,
+headless, mens antall visuals skaleres. Skriver p50/p95 og WebDriver-kall per operasjon til JSON, og kan
+sammenligne motorene (Selenium/Playwright) på samme arbeidsmengde med oppstartstid og minne.
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import shutil
+import platform
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from . import metrics, staleness
+from .auth import login_if_needed
+from .browser import setup_driver, webdriver_calls
+from .config import DRIVER_BACKEND, split_candidates
+from .dialogs import dismiss_dialogs
+from .health import check_dashboard_visible, wait_for_dashboard_visible
+from .metrics import chrome_rss_mb, process_tree_rss_mb
+from .mockserver import start_mock_server, signin_url, mock_dashboard_url
+from .refresh import refresh_dashboard
+
+BENCH_DIR = os.getenv("BENCH_DIR", "bench")
+BENCH_VISUALS = "10,50,100,250,500"
+
+
+def percentile(values, q):
+    """Nærmeste-rang-persentil (q i 0-100)."""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    return ordered[max(0, min(len(ordered) - 1, math.ceil(q / 100 * len(ordered)) - 1))]
+
+
+def _measure(samples, op, driver, fn):
+    """Kjør fn() og registrer varighet (ms) og antall WebDriver-kall under op. Returnerer fn sitt resultat."""
+    calls_before = webdriver_calls(driver)
+    t0 = time.perf_counter()
+    result = fn()
+    entry = samples.setdefault(op, {"ms": [], "calls": []})
+    entry["ms"].append((time.perf_counter() - t0) * 1000)
+    entry["calls"].append(webdriver_calls(driver) - calls_before)
+    return result
+
+
+def summarize(samples):
+    out = {}
+    for op, entry in samples.items():
+        ms, calls = entry["ms"], entry["calls"]
+        out[op] = {
+            "samples": len(ms),
+            "p50_ms": round(percentile(ms, 50), 1),
+            "p95_ms": round(percentile(ms, 95), 1),
+            "mean_ms": round(sum(ms) / len(ms), 1),
+            "calls_p50": percentile(calls, 50),
+            "calls_max": max(calls),
+        }
+    return out
+
+
+def bench_visuals(driver, base, visuals, repeats, probes):
+    """Én serie for et gitt antall visuals. Returnerer rå målinger per operasjon."""
+    samples = {}
+    url = mock_dashboard_url(base, visuals)
+    for _ in range(repeats):
+        # Full innlogging hver gang: uten session-cookie viser mock-serveren signin-siden
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        ok = _measure(samples, "login", driver,
+                      lambda: login_if_needed(driver, "bench", "bench@example.com", "bench", signin_url(base),
+                                              use_session=False, save=False))
+        if not ok:
+            raise RuntimeError("Innlogging mot mock-serveren feilet")
+
+        def first_render():
+            driver.get(url)
+            return wait_for_dashboard_visible(driver, timeout=60, poll_interval=0.5)
+
+        status = _measure(samples, "first_render", driver, first_render)
+        if not status["visible"]:
+            raise RuntimeError(f"Mock-dashboardet ble ikke synlig: {status['reason']}")
+        _measure(samples, "dialogs", driver, lambda: dismiss_dialogs(driver))
+
+        for probe in probes:
+            _measure(samples, f"health_check_{probe}", driver, lambda: check_dashboard_visible(driver, probe=probe))
+
+        # Bare selve refreshen: gjenoppretting og minnevokter kunne startet kioskens nettleser og profil
+        _measure(samples, "refresh", driver, lambda: refresh_dashboard(driver, url, recover=False))
+        _measure(samples, "fingerprint", driver,
+                 lambda: (staleness.data_fingerprint(driver), staleness.screen_fingerprint(driver)))
+    return samples
+
+
+def sample_footprint(driver):
+    """Minne etter en serie: driverprosessen med Chrome under seg, og hele prosesstreet inkludert Python."""
+    return {"driver_tree_rss_mb": chrome_rss_mb(driver), "total_rss_mb": process_tree_rss_mb(os.getpid())}
+
+
+def bench_backend(backend, base, visual_counts, repeats, probes):
+    """Samme arbeidsmengde med én motor. Returnerer (resultater per antall visuals, oppstart og minne)."""
+    profile_dir = tempfile.mkdtemp(prefix="qschrome-bench-")
+    results, footprint = {}, {}
+    driver = None
+    try:
+        t0 = time.perf_counter()
+        driver, _, _, _ = setup_driver(headless=True, profile_dir=profile_dir, session=False, backend=backend)
+        launch_ms = round((time.perf_counter() - t0) * 1000, 1)
+        for visuals in visual_counts:
+            print(f"🏁 [{backend}] {visuals} visuals × {repeats} …")
+            results[str(visuals)] = summarize(bench_visuals(driver, base, visuals, repeats, probes))
+            footprint[str(visuals)] = sample_footprint(driver)
+    finally:
+        if driver is not None:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        shutil.rmtree(profile_dir, ignore_errors=True)
+    return results, {"launch_ms": launch_ms, "memory": footprint}
+
+
+def run_bench(visual_counts, repeats=5, probes=("js", "webdriver"), out_dir=BENCH_DIR, latency_ms=150,
+              backends=("selenium",)):
+    """
+    Kjør hele benchmarken headless mot en mock-server og skriv resultatet som JSON til out_dir.
+    backends: motorene som måles etter tur på samme arbeidsmengde (selenium, playwright).
+    """
+    # Benchmark-tall skal ikke blandes inn i kioskens metrikkfil
+    metrics.METRICS_FILE = ""
+    server, base = start_mock_server(latency_ms=latency_ms)
+    started = time.time()
+    results, engines = {}, {}
+    try:
+        for backend in backends:
+            results[backend], engines[backend] = bench_backend(backend, base, visual_counts, repeats, probes)
+    finally:
+        server.shutdown()
+
+    report = {
+        "ts": datetime.now().isoformat(timespec="seconds"),
+        "host": {"machine": platform.machine(), "python": platform.python_version(), "system": platform.system()},
+        "repeats": repeats,
+        "latency_ms": latency_ms,
+        "total_seconds": round(time.time() - started, 1),
+        "backends": engines,
+        "results": results,
+    }
+    path = Path(out_dir) / f"bench-{datetime.now():%Y%m%d-%H%M%S}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1)
+
+    print(f"\n{'motor':<10} {'visuals':>7}  {'operasjon':<22} {'p50 ms':>9} {'p95 ms':>9} {'kall p50':>9}")
+    for backend, by_visuals in results.items():
+        for visuals, ops in by_visuals.items():
+            for op, s in ops.items():
+                print(f"{backend:<10} {visuals:>7}  {op:<22} {s['p50_ms']:9.1f} {s['p95_ms']:9.1f} {s['calls_p50']:9d}")
+    print(f"\n{'motor':<10} {'oppstart ms':>11} {'visuals':>7} {'driver+Chrome MB':>17} {'totalt MB':>10}")
+    for backend, engine in engines.items():
+        for visuals, mem in engine["memory"].items():
+            print(f"{backend:<10} {engine['launch_ms']:11.0f} {visuals:>7} "
+                  f"{_mb(mem['driver_tree_rss_mb']):>17} {_mb(mem['total_rss_mb']):>10}")
+    print(f"📝 Benchmark: {path}")
+    return report
+
+
+def _mb(value):
+    return "–" if value is None else f"{value:.0f}"
+
+
+def parse_bench_args(argv):
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmark mot lokal mock-QuickSight (headless).")
+    parser.add_argument("--bench", action="store_true")
+    parser.add_argument("--visuals", default=BENCH_VISUALS, help="Kommaseparert liste med antall visuals")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--probes", default="js,webdriver", help="Helseprober som måles (js, webdriver)")
+    parser.add_argument("--backend", default=DRIVER_BACKEND,
+                        help="Kommaseparert liste med motorer som sammenlignes (selenium, playwright)")
+    parser.add_argument("--latency-ms", type=int, default=150, help="Svartid for mock-datakallet")
+    parser.add_argument("--out", default=BENCH_DIR)
+    parser.add_argument("--serve", action="store_true",
+                        help="Start bare mock-serveren (for å se på sidene i en nettleser)")
+    args = parser.parse_args(argv)
+    args.visuals = [int(v) for v in split_candidates(args.visuals)]
+    args.probes = tuple(split_candidates(args.probes))
+    args.backend = tuple(b.lower() for b in split_candidates(args.backend))
+    return args
+
+
+def serve_forever(latency_ms=150):
+    _server, base = start_mock_server(port=8765, latency_ms=latency_ms)
+    print(f"🧪 Mock-QuickSight på {signin_url(base)}")
+    print(f"   Dashboard: {mock_dashboard_url(base, 40)}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        sys.exit(0)
@@ -0,0 +1,306 @@
+# -*- coding: utf-8 -*-
+"""Driver-fabrikk: Chrome-profilens livssyklus, kiosk-flagg og oppstart av WebDriver (Selenium eller Playwright)."""
+
+import os
+import sys
+import json
+import time
+import shutil
+from pathlib import Path
+
+from .config import (
+    HEADLESS, DRIVER_BACKEND, USER_PROFILE, PROFILE_MODE, PROFILE_MAX_MB, PROFILE_MAX_FAILED_STARTS,
+    PROFILE_FAIL_MARKER,
+)
+from .auth import credentials
+from .backend import start_playwright
+from .dialogs import install_dialog_dismisser
+from .env import timed_phase
+from .metrics import metric_timer
+from .network import NETWORK_BLOCKING, apply_request_filter
+from .session import restore_session
+
+PROFILE_STATE = "cold"
+
+
+def import_selenium():
+    """Importer Selenium første gang og registrer tiden som oppstartsfasen "imports"."""
+    if "selenium.webdriver" in sys.modules:
+        return
+    t0 = time.time()
+    from selenium import webdriver  # noqa: F401
+    from selenium.webdriver.chrome.options import Options  # noqa: F401
+    from selenium.webdriver.chrome.service import Service  # noqa: F401
+    from selenium.webdriver.support.ui import WebDriverWait  # noqa: F401
+    timed_phase("imports", t0)
+
+
+def install_call_counter(driver):
+    """
+    Teller alle WebDriver-kommandoer (HTTP-rundturer til chromedriver) på driveren.
+    WebElement-kall går også via driver.execute, så is_displayed()/size blir med.
+    """
+    if getattr(driver, "_qs_call_count", None) is not None:
+        return driver
+    driver._qs_call_count = 0
+    original_execute = driver.execute
+
+    def counting_execute(driver_command, params=None):
+        driver._qs_call_count += 1
+        return original_execute(driver_command, params)
+
+    driver.execute = counting_execute
+    return driver
+
+
+def webdriver_calls(driver):
+    """Antall WebDriver-kall hittil (0 hvis telleren ikke er installert)."""
+    return getattr(driver, "_qs_call_count", None) or 0
+
+
+def _dir_size_mb(path):
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total / (1024 * 1024)
+
+
+def _profile_corruption(profile):
+    """Returner en grunn hvis profilen ser ødelagt ut, ellers None."""
+    for rel in ("Local State", "Default/Preferences"):
+        f = profile / rel
+        if f.exists():
+            try:
+                with open(f) as fh:
+                    json.load(fh)
+            except Exception:
+                return f"{rel} er ikke gyldig JSON"
+
+    failed = profile / PROFILE_FAIL_MARKER
+    try:
+        count = int(failed.read_text().strip() or 0) if failed.exists() else 0
+    except Exception:
+        count = 0
+    if count >= PROFILE_MAX_FAILED_STARTS:
+        return f"{count} oppstarter på rad uten synlig dashboard"
+    return None
+
+
+def _write_password_prefs(profile):
+    """Slå av password manager i Default/Preferences uten å røre resten av profilen."""
+    prefs_file = profile / "Default" / "Preferences"
+    prefs_file.parent.mkdir(parents=True, exist_ok=True)
+    prefs = {}
+    if prefs_file.exists():
+        try:
+            with open(prefs_file) as f:
+                prefs = json.load(f)
+        except Exception:
+            prefs = {}
+
+    prefs.setdefault("profile", {}).update({
+        "password_manager_enabled": False,
+        "password_bubble_on_signin": False,
+    })
+    prefs["credentials_enable_service"] = False
+    prefs["passwords"] = {}
+    prefs.setdefault("autofill", {})["enabled"] = False
+
+    with open(prefs_file, 'w') as f:
+        json.dump(prefs, f)
+
+
+def prepare_profile():
+    """
+    Klargjør Chrome-profilen før oppstart.
+    - PROFILE_MODE=persistent (standard): behold cookies og HTTP-cache, oppdater kun password-prefs.
+      Full sletting bare hvis profilen ser ødelagt ut eller er større enn PROFILE_MAX_MB.
+    - PROFILE_MODE=wipe: slett hele profilen ved hver oppstart (gammel oppførsel).
+    Returnerer "warm" hvis en eksisterende profil ble gjenbrukt, ellers "cold".
+    """
+    global PROFILE_STATE
+    profile = Path(USER_PROFILE)
+
+    wipe_reason = None
+    if profile.exists():
+        if PROFILE_MODE == "wipe":
+            wipe_reason = "PROFILE_MODE=wipe"
+        else:
+            wipe_reason = _profile_corruption(profile)
+            if not wipe_reason:
+                size_mb = _dir_size_mb(profile)
+                if size_mb > PROFILE_MAX_MB:
+                    wipe_reason = f"profilen er {size_mb:.0f} MB (maks {PROFILE_MAX_MB} MB)"
+
+    try:
+        if wipe_reason:
+            shutil.rmtree(profile)
+            print(f"🧹 Slettet Chrome profil ({wipe_reason}): {USER_PROFILE}")
+        PROFILE_STATE = "warm" if (profile / "Default").exists() else "cold"
+    except Exception as e:
+        print(f"⚠️  Klarte ikke slette Chrome profil: {e}")
+        PROFILE_STATE = "cold"
+
+    try:
+        _write_password_prefs(profile)
+        print(f"✅ Chrome Preferences oppdatert med deaktivert password manager ({PROFILE_STATE} profil)")
+    except Exception as e:
+        print(f"⚠️  Klarte ikke oppdatere Chrome Preferences: {e}")
+
+    # Tell oppstarten som mislykket til mark_profile_healthy() kalles
+    try:
+        marker = profile / PROFILE_FAIL_MARKER
+        count = int(marker.read_text().strip() or 0) if marker.exists() else 0
+        marker.write_text(str(count + 1))
+    except Exception:
+        pass
+
+    return PROFILE_STATE
+
+
+def mark_profile_healthy():
+    """Nullstill teller for mislykkede oppstarter når dashboardet er bekreftet synlig."""
+    try:
+        (Path(USER_PROFILE) / PROFILE_FAIL_MARKER).unlink()
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"⚠️  Klarte ikke nullstille profil-status: {e}")
+
+
+# Kiosk- og stabilitetsflagg, felles for begge motorene (profil og headless legges til i setup_driver)
+CHROME_ARGS = (
+    "--window-position=0,0",
+    "--window-size=1920,1080",
+    "--disable-infobars",
+    "--disable-blink-features=AutomationControlled",
+    "--disable-dev-shm-usage",
+    "--no-sandbox",
+    "--disable-session-crashed-bubble",
+    "--overscroll-history-navigation=0",
+    "--hide-scrollbars",
+    # Fullskjerm/kiosk
+    "--start-maximized",
+    "--start-fullscreen",
+    "--kiosk",
+    # Stabilitet for Raspberry Pi 4/5
+    "--disable-gpu",
+    "--disable-software-rasterizer",
+    "--no-zygote",
+    "--single-process",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-client-side-phishing-detection",
+    "--disable-component-update",
+    "--disable-sync",
+    "--no-first-run",
+    "--disable-breakpad",
+    "--disable-hang-monitor",
+    "--disable-ipc-flooding-protection",
+    "--password-store=basic",
+    "--use-mock-keychain",
+    "--disable-save-password-bubble",
+    "--disable-password-generation",
+    "--disable-autofill",
+    "--disable-credentials-api",
+    "--disable-offer-store-unmasked-passwords",
+    "--disable-password-manager",
+    "--disable-password-manager-ui",
+    "--disable-password-manager-ui-for-signin",
+    "--disable-fillonaccount-select",
+    "--disable-ipcflooding-protection",
+    "--noerrdialogs",
+    "--disable-low-res-tiling",
+    "--disable-zero-copy",
+    "--enable-features=UseOzonePlatform",
+    "--ozone-platform=wayland",
+)
+DRIVER_BACKENDS = ("selenium", "playwright")
+
+
+def _start_selenium(chrome_exec, profile_dir, args, headless, performance_log=False):
+    """Start Chrome via chromedriver (Selenium WebDriver)."""
+    import_selenium()
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options as ChromeOptions
+    from selenium.webdriver.chrome.service import Service as ChromeService
+
+    # Finn/bruk chromedriver
+    driver_path = shutil.which("chromedriver")
+    service = ChromeService(executable_path=driver_path) if driver_path else ChromeService()
+
+    opts = ChromeOptions()
+    opts.binary_location = chrome_exec
+    opts.add_argument(f"--user-data-dir={profile_dir}")
+    for arg in args:
+        opts.add_argument(arg)
+    # Fjern "Chrome kontrolleres av programvare for automatisk testing"
+    opts.add_experimental_option("excludeSwitches", ["enable-automation"])
+    opts.add_experimental_option('useAutomationExtension', False)
+    if headless:
+        opts.add_argument("--headless=new")
+    if performance_log:
+        opts.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+    driver = webdriver.Chrome(service=service, options=opts)
+    return install_call_counter(driver)
+
+
+def setup_driver(headless=None, performance_log=False, profile_dir=None, session=True, backend=None):
+    """
+    Start Chrome med kiosk-flagg. headless=None bruker HEADLESS fra .env.
+    performance_log=True slår på CDP-performance-logg (Network-hendelser) for datauttrekk.
+    profile_dir: egen (midlertidig) profil, f.eks. for parallelle arbeidere. Standard USER_PROFILE.
+    session=True: sett inn lagret sesjon (session.py) før første navigasjon når profilen er kald;
+    en varm profil har egne, ferskere cookies og får lagret sesjon først hvis den havner på signin.
+    backend: "selenium" eller "playwright" (backend.py); None bruker DRIVER_BACKEND fra .env.
+    """
+    backend = (backend or DRIVER_BACKEND).lower()
+    if backend not in DRIVER_BACKENDS:
+        print(f"❌ Ukjent DRIVER_BACKEND={backend!r} (gyldige: {', '.join(DRIVER_BACKENDS)})")
+        sys.exit(2)
+
+    account, username, password = credentials()
+
+    with metric_timer("qs_phase_seconds", phase="profile"):
+        if profile_dir is None:
+            cold = prepare_profile() == "cold"
+        else:
+            # Før passord-innstillingene og Chrome selv oppretter Default/
+            cold = not (Path(profile_dir) / "Default").exists()
+            _write_password_prefs(Path(profile_dir))
+
+    # Finn Chrome/Chromium
+    chrome_exec = (
+        shutil.which("google-chrome") or
+        shutil.which("google-chrome-stable") or
+        shutil.which("/Applications/Google Chrome.app/Contents/MacOS/Google Chrome") or
+        shutil.which("chromium") or
+        shutil.which("chromium-browser")
+    )
+    if not chrome_exec:
+        print("❌ Fant ikke Chrome/Chromium. Installer Google Chrome (mac) eller chromium (Pi).")
+        sys.exit(2)
+
+    start = start_playwright if backend == "playwright" else _start_selenium
+    with metric_timer("qs_phase_seconds", phase="chrome_launch"):
+        driver = start(chrome_exec, profile_dir or USER_PROFILE, CHROME_ARGS,
+                       HEADLESS if headless is None else headless,
+                       performance_log=performance_log or NETWORK_BLOCKING != "off")
+    apply_request_filter(driver)
+    install_dialog_dismisser(driver)
+    if session and cold:
+        try:
+            restore_session(driver)
+        except Exception as e:
+            print(f"⚠️  Klarte ikke sette inn lagret sesjon: {e}")
+    try:
+        driver.fullscreen_window()  # ekstra sikkerhet
+    except Exception:
+        pass
+
+    return driver, account, username, password
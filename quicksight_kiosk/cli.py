@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""Kommandolinje: kiosk (standard), --extract, --bench eller --check-env. Felles for alle inngangspunktene."""
+
+import sys
+
+
+def run(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if "--check-env" in argv:
+        from .env import report_env_check
+        try:
+            from .browser import import_selenium
+            import_selenium()
+        except ImportError as exc:
+            print("❌ Miljøsjekk feilet, Selenium kan ikke importeres:", exc)
+            sys.exit(1)
+        report_env_check()
+        sys.exit(0)
+    try:
+        if "--bench" in argv:
+            from .bench import parse_bench_args, run_bench, serve_forever
+            args = parse_bench_args(argv)
+            if args.serve:
+                serve_forever(args.latency_ms)
+            run_bench(args.visuals, args.repeats, args.probes, args.out, args.latency_ms, args.backend)
+            sys.exit(0)
+        if "--extract" in argv:
+            from .extract import parse_extract_args, run_extract
+            args = parse_extract_args(argv)
+            run_extract(args.cities, args.mode, args.format, args.out, args.workers)
+            sys.exit(0)
+        from .kiosk import main
+        main()
+    except Exception as exc:
+        print("❌ Avsluttet med feil:", exc)
+        sys.exit(1)
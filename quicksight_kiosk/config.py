@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""Innstillinger fra miljøet/.env. Kun standardbiblioteket; byer og dashboard-URL-er ligger i urls."""
+
+import os
+
+try:
+    from dotenv import load_dotenv, dotenv_values
+except Exception:
+    load_dotenv = dotenv_values = None
+
+# Variabler satt i skallet/systemd vinner over .env, også når .env leses på nytt (SIGHUP).
+# Nøklene vi selv har lastet fra .env arves i QS_DOTENV_KEYS når prosessen starter seg selv på nytt.
+SHELL_ENV_KEYS = set(os.environ) - set(os.getenv("QS_DOTENV_KEYS", "").split(","))
+
+
+def reload_env():
+    """Les .env inn i os.environ (ved import og SIGHUP). Returnerer nøklene som fikk ny verdi."""
+    if dotenv_values is None:
+        return []
+    loaded, changed = [], []
+    for key, value in dotenv_values().items():
+        if key in SHELL_ENV_KEYS or value is None:
+            continue
+        loaded.append(key)
+        if os.environ.get(key) != value:
+            os.environ[key] = value
+            changed.append(key)
+    os.environ["QS_DOTENV_KEYS"] = ",".join(loaded)
+    return changed
+
+
+reload_env()
+
+DEFAULT_URL = (
+    "https://eu-central-1.quicksight.aws.amazon.com/sn/auth/signin"
+    "?redirect_uri=https%3A%2F%2Feu-central-1.quicksight.aws.amazon.com%2Fsn%2Fauth%2Fsignin%2C%3Fstate%3DhashArgs%2523%26isauthcode%3Dtrue"
+)
+
+USER_PROFILE = os.getenv("QS_USER_PROFILE", "/tmp/qschrome-profile")
+# "persistent" = behold innlogging og cache mellom oppstarter, "wipe" = slett profilen hver gang
+PROFILE_MODE = os.getenv("PROFILE_MODE", "persistent").lower()
+PROFILE_MAX_MB = int(os.getenv("PROFILE_MAX_MB", "1024"))
+PROFILE_MAX_FAILED_STARTS = int(os.getenv("PROFILE_MAX_FAILED_STARTS", "3"))
+PROFILE_FAIL_MARKER = "qs-failed-starts"
+REFRESH_SECS = int(os.getenv("REFRESH_SECS", "300"))
+# Adaptiv refresh: intervallet vokser med REFRESH_BACKOFF når dataene ikke endrer seg, og faller tilbake til
+# minimum så snart de gjør det. REFRESH_POLICY gir egne grenser per tidsrom, f.eks. "22:00-06:00=900-3600".
+REFRESH_ADAPTIVE = os.getenv("REFRESH_ADAPTIVE", "true").lower() in ("1", "true", "yes", "on")
+REFRESH_MIN_SECS = int(os.getenv("REFRESH_MIN_SECS", str(REFRESH_SECS)))
+REFRESH_MAX_SECS = int(os.getenv("REFRESH_MAX_SECS", "1800"))
+REFRESH_BACKOFF = float(os.getenv("REFRESH_BACKOFF", "1.5"))
+REFRESH_POLICY = os.getenv("REFRESH_POLICY", "").strip()
+HEADLESS = os.getenv("HEADLESS", "false").lower() in ("1", "true", "yes", "on")
+# Nettleserstyring: "selenium" (chromedriver, standard) eller "playwright" (Playwright for Python over
+# én vedvarende CDP-forbindelse, ingen chromedriver). Se backend.py.
+DRIVER_BACKEND = os.getenv("DRIVER_BACKEND", "selenium").strip().lower()
+DASHBOARD_MODE = os.getenv("DASHBOARD_MODE", "operations").lower()
+CITY = os.getenv("CITY", "bergen").lower()
+# Faste daglige restarter (HH:MM, kommaseparert). Tom som standard: temabytte skjer uten restart,
+# og minnevokteren (govern_memory) resirkulerer nettleseren når minnet faktisk krever det.
+RESTART_TIMES = tuple(t.strip() for t in os.getenv("RESTART_TIMES", "").split(",") if t.strip())
+# Minnevokter: myk grense gir billige tiltak (GC, tøm minnecache, ny fane), hard grense starter nettleseren på nytt
+MEMORY_SOFT_MB = int(os.getenv("MEMORY_SOFT_MB", "1500"))
+MEMORY_HARD_MB = int(os.getenv("MEMORY_HARD_MB", "2500"))
+MEMORY_HEAP_SOFT_MB = int(os.getenv("MEMORY_HEAP_SOFT_MB", "600"))
+# Temabytte: maks tid for forhåndslasting, og hvor lenge bakgrunnsfanen får rendre før byttet (sekunder)
+THEME_PRELOAD_TIMEOUT = int(os.getenv("THEME_PRELOAD_TIMEOUT", "90"))
+THEME_PRELOAD_SETTLE = int(os.getenv("THEME_PRELOAD_SETTLE", "8"))
+# Rotasjon: kommaseparert liste "modus[:by[:dwell]]". Tom = vis kun DASHBOARD_MODE/CITY.
+ROTATION = os.getenv("ROTATION", "").strip()
+ROTATION_DWELL_SECS = int(os.getenv("ROTATION_DWELL_SECS", "60"))
+
+
+def getenv_bool(name: str, default: bool) -> bool:
+    v = os.getenv(name)
+    return default if v is None else v.lower() in ("1", "true", "yes", "y", "on")
+
+
+def split_candidates(csl: str):
+    return [s.strip() for s in csl.split(",") if s.strip()]
+
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+Dialoglukker i siden: et skript registrert med Page.addScriptToEvaluateOnNewDocument følger DOM-en med en
+MutationObserver og klikker "Show me more", "Aldri"/"Never" og lignende knapper i det de dukker opp.
+Python venter aldri på dialoger; det leser bare telleren for lukkede dialoger.
+"""
+
+import os
+import json
+
+from .config import split_candidates
+from .metrics import metric_incr
+
+# Knappetekster (uten store/små bokstaver, delstreng) som lukkes straks de vises
+DIALOG_TEXTS = tuple(t.lower() for t in split_candidates(os.getenv("DIALOG_TEXTS", "Show me more,Aldri,Never")))
+
+# Kjøres før sidens egne skript i hvert nytt dokument i fanen (og én gang i dokumentet som vises nå).
+# Bare nye noder sjekkes, samlet opp i 50 ms, så en stor QuickSight-render ikke gir en skanning per mutasjon.
+DISMISSER_JS = """
+(() => {
+    if (window.__qsDialogs) return;
+    const texts = %s;
+    const state = window.__qsDialogs = {count: 0, reported: 0, last: null};
+    const clicked = new WeakSet();
+    const pending = new Set();
+    let timer = null;
+
+    function matches(btn) {
+        if (clicked.has(btn)) return null;
+        const text = (btn.textContent || '').trim();
+        if (!text || text.length > 60) return null;
+        const lower = text.toLowerCase();
+        return texts.some(t => lower.includes(t)) ? text : null;
+    }
+    function flush() {
+        timer = null;
+        const roots = Array.from(pending);
+        pending.clear();
+        for (const root of roots) {
+            if (!root.isConnected) continue;
+            const own = root.closest('button');
+            for (const btn of own ? [own] : root.querySelectorAll('button')) {
+                const text = matches(btn);
+                if (!text) continue;
+                clicked.add(btn);
+                btn.click();
+                state.count++;
+                state.last = text;
+            }
+        }
+    }
+    function queue(node) {
+        const el = node.nodeType === 1 ? node : node.parentElement;
+        if (!el) return;
+        pending.add(el);
+        if (timer === null) timer = setTimeout(flush, 50);
+    }
+    new MutationObserver(mutations => {
+        for (const m of mutations) m.addedNodes.forEach(queue);
+    }).observe(document, {childList: true, subtree: true});
+    if (document.documentElement) queue(document.documentElement);
+})();
+"""
+# Lukket siden forrige lesing, og teksten på siste knapp. null: lukkeren kjører ikke i dette dokumentet.
+READ_COUNTER_JS = """
+const d = window.__qsDialogs;
+if (!d) return null;
+const n = d.count - d.reported;
+d.reported = d.count;
+return [n, d.last];
+"""
+
+
+def install_dialog_dismisser(driver):
+    """Registrer dialoglukkeren i fanen som er aktiv (gjelder per target, som nettverksfilteret)."""
+    if not DIALOG_TEXTS:
+        return
+    source = DISMISSER_JS % json.dumps(DIALOG_TEXTS)
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": source})
+        driver.execute_script(source)
+    except Exception as e:
+        print(f"⚠️  Klarte ikke installere dialoglukker: {e}")
+
+
+def dismiss_dialogs(driver):
+    """
+    Les hvor mange dialoger lukkeren har lukket siden sist (én execute_script, ingen venting).
+    En fane uten lukker (f.eks. forhåndslastet via Target.createTarget) får den installert her.
+    """
+    try:
+        result = driver.execute_script(READ_COUNTER_JS)
+    except Exception:
+        return 0
+    if result is None:
+        install_dialog_dismisser(driver)
+        return 0
+    closed, last = result
+    if closed:
+        metric_incr("qs_dialogs_closed_total", closed, source="observer")
+        print(f"✅ Lukket {closed} dialog(er) (siste: '{last}').")
+    return closed
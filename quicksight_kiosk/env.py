@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""Auto-oppsett av venv + pakker, og tid per oppstartsfase. ensure_env() kalles kun fra inngangspunktene."""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import subprocess
+from pathlib import Path
+
+PROCESS_START = time.time()
+
+# Auto-oppsett av venv + pakker (selenium, python-dotenv, cryptography for lagret sesjon)
+VENV_PATH = Path.home() / "quicksight-env"
+REQS = ["selenium", "python-dotenv", "cryptography"]
+# Fingeravtrykk av REQS + Python-versjon lagres i venv; når det stemmer hoppes pip over
+ENV_STAMP = VENV_PATH / ".qs-env-fingerprint"
+# Tider per oppstartsfase (sekunder), videreført gjennom os.execv via miljøvariabel
+ENV_TIMINGS = json.loads(os.environ.pop("QS_ENV_TIMINGS", "{}"))
+# Oppstartstid fra første prosess (før exec inn i venv)
+PROCESS_START = ENV_TIMINGS.pop("started_at", PROCESS_START)
+
+
+def env_fingerprint():
+    key = "|".join(sorted(REQS) + [sys.version.split()[0]])
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def timed_phase(phase, t0):
+    ENV_TIMINGS[phase] = round(ENV_TIMINGS.get(phase, 0) + time.time() - t0, 3)
+
+
+def relaunch_argv(python):
+    """Argumenter for å starte samme kommando på nytt, både for `python scraper.py` og `python -m pakke`."""
+    spec = getattr(sys.modules.get("__main__"), "__spec__", None)
+    if spec is not None and spec.name.endswith(".__main__"):
+        return [python, "-m", spec.name.rsplit(".", 1)[0]] + sys.argv[1:]
+    return [python] + sys.argv
+
+
+def ensure_env():
+    try:
+        t0 = time.time()
+        fingerprint = env_fingerprint()
+        satisfied = ENV_STAMP.exists() and ENV_STAMP.read_text().strip() == fingerprint
+        timed_phase("fingerprint", t0)
+
+        if not satisfied:
+            t0 = time.time()
+            if not (VENV_PATH / "bin" / "activate").exists():
+                print(f"⚙️  Oppretter virtuelt miljø på {VENV_PATH} …")
+                subprocess.run([sys.executable, "-m", "venv", str(VENV_PATH)], check=True)
+            timed_phase("venv", t0)
+
+            t0 = time.time()
+            pip = VENV_PATH / "bin" / "pip"
+            try:
+                subprocess.run([str(pip), "install", "-q"] + REQS, check=True)
+                ENV_STAMP.write_text(fingerprint)
+            except Exception as e:
+                # Flaky nett: bruk eksisterende venv hvis den finnes, prøv pip igjen neste oppstart
+                print("⚠️ pip install feilet, bruker eksisterende venv:", e)
+            timed_phase("pip", t0)
+
+        if not sys.prefix.startswith(str(VENV_PATH)):
+            py = VENV_PATH / "bin" / "python3"
+            if py.exists():
+                print(f"🔁 Restarter i miljø: {py}")
+                ENV_TIMINGS["exec_at"] = time.time()
+                ENV_TIMINGS["started_at"] = PROCESS_START
+                os.environ["QS_ENV_TIMINGS"] = json.dumps(ENV_TIMINGS)
+                os.execv(str(py), relaunch_argv(str(py)))
+    except Exception as e:
+        print("⚠️ Klarte ikke auto-oppsett av venv:", e)
+
+    exec_at = ENV_TIMINGS.pop("exec_at", None)
+    if exec_at:
+        ENV_TIMINGS["exec"] = round(time.time() - exec_at, 3)
+
+
+def report_env_check():
+    """--check-env: skriv ut tid per oppstartsfase og om pip ble hoppet over."""
+    skipped = "pip" not in ENV_TIMINGS
+    print("🩺 Miljøsjekk")
+    print(f"   venv:         {VENV_PATH}")
+    print(f"   fingeravtrykk: {env_fingerprint()[:12]} ({'stemmer, pip hoppet over' if skipped else 'oppdatert'})")
+    for phase in ("fingerprint", "venv", "pip", "exec", "imports"):
+        if phase in ENV_TIMINGS:
+            print(f"   {phase:<13} {ENV_TIMINGS[phase] * 1000:8.1f} ms")
+    print(f"   totalt        {(time.time() - PROCESS_START) * 1000:8.1f} ms")
@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+"""
+Datauttrekk: leser tallene ut av det rendrede dashboardet (KPI-er, tabeller, grafer) i én rundtur per by,
+med flere headless nettlesere som deler én innlogging.
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import shutil
+import tempfile
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from .auth import login_if_needed
+from .browser import setup_driver
+from .config import DEFAULT_URL, DASHBOARD_MODE, DRIVER_BACKEND, CITY, split_candidates
+from .health import VISUAL_CONTAINER_SELECTORS, VISUAL_SELECTORS, wait_for_dashboard_visible
+from .metrics import metric_observe
+from .network import export_cookies, import_cookies
+from .schedule import get_current_theme
+from .urls import CITIES, MODES, dashboard_url, validate
+from .waits import reload_and_wait
+
+EXTRACT_DIR = os.getenv("EXTRACT_DIR", "extract")
+EXTRACT_MAX_ROWS = int(os.getenv("EXTRACT_MAX_ROWS", "500"))
+EXTRACT_WORKERS = int(os.getenv("EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+# URL-er for QuickSight-svar som inneholder visual-data (fanges fra CDP Network-hendelser)
+EXTRACT_NETWORK_PATTERN = os.getenv("EXTRACT_NETWORK_PATTERN", r"(visual|getdata|query|dataset)")
+
+# Finner visual-containere (samme oppdagelse som helsesjekken) og leser data fra DOM-en.
+EXTRACT_JS = """
+const [containerSels, visualSels, maxRows] = arguments;
+function shown(el) {
+    const r = el.getBoundingClientRect();
+    return r.width > 0 && r.height > 0;
+}
+function text(el) { return (el.innerText || el.textContent || '').trim(); }
+let containers = [];
+for (const sel of containerSels.concat(visualSels)) {
+    try { containers = containers.concat(Array.from(document.querySelectorAll(sel))); } catch (e) {}
+    if (containers.length) break;
+}
+// Kun ytterste container per visual
+containers = containers.filter(el => shown(el) && !containers.some(o => o !== el && o.contains(el)));
+return containers.map((el, i) => {
+    const titleEl = el.querySelector("[class*='title'], [data-automation-id*='title'], h1, h2, h3, h4");
+    const rec = {
+        index: i,
+        id: el.getAttribute('data-automation-id') || el.id || null,
+        title: titleEl ? text(titleEl) : null,
+        type: 'unknown',
+    };
+    const rows = el.querySelectorAll("[role='row'], tr");
+    if (rows.length) {
+        rec.type = 'table';
+        rec.rows = Array.from(rows).slice(0, maxRows).map(r =>
+            Array.from(r.querySelectorAll("[role='gridcell'], [role='columnheader'], [role='cell'], td, th")).map(text)
+        ).filter(r => r.length);
+    } else if ((el.className + '').toLowerCase().includes('kpi') || el.querySelector("[class*='kpi']")) {
+        rec.type = 'kpi';
+        rec.values = text(el).split('\\n').map(s => s.trim()).filter(Boolean);
+    } else if (el.querySelector('svg, canvas')) {
+        rec.type = 'chart';
+        rec.labels = Array.from(el.querySelectorAll('[aria-label]')).map(n => n.getAttribute('aria-label'))
+            .filter(Boolean).slice(0, maxRows);
+        rec.axis = Array.from(el.querySelectorAll('svg text')).map(text).filter(Boolean).slice(0, maxRows);
+    } else {
+        rec.values = text(el).split('\\n').map(s => s.trim()).filter(Boolean);
+    }
+    return rec;
+});
+"""
+
+
+def extract_visuals(driver):
+    """Les alle visuals i fanen som vises. Returnerer liste med én dict per visual."""
+    return driver.execute_script(
+        EXTRACT_JS, VISUAL_CONTAINER_SELECTORS, VISUAL_SELECTORS, EXTRACT_MAX_ROWS
+    ) or []
+
+
+def collect_network_payloads(driver, pattern=EXTRACT_NETWORK_PATTERN):
+    """
+    Hent JSON-svar fra QuickSight-kall siden forrige kall (krever performance-logg fra setup_driver).
+    Returnerer liste med {'url', 'status', 'body'}.
+    """
+    import re
+    rx = re.compile(pattern, re.IGNORECASE)
+    payloads = []
+    try:
+        entries = driver.get_log("performance")
+    except Exception:
+        return payloads
+    for entry in entries:
+        try:
+            msg = json.loads(entry["message"])["message"]
+        except Exception:
+            continue
+        if msg.get("method") != "Network.responseReceived":
+            continue
+        resp = msg["params"]["response"]
+        if "json" not in resp.get("mimeType", "") or not rx.search(resp.get("url", "")):
+            continue
+        try:
+            body = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": msg["params"]["requestId"]})
+            data = json.loads(body.get("body") or "null")
+        except Exception:
+            continue
+        payloads.append({"url": resp["url"], "status": resp.get("status"), "body": data})
+    return payloads
+
+
+def write_records(records, path, fmt="jsonl"):
+    """Skriv records som jsonl, csv (én linje per verdi-rad) eller parquet (krever pyarrow)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if fmt == "jsonl":
+        with open(path, "w", encoding="utf-8") as f:
+            for rec in records:
+                f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        return path
+
+    flat = []
+    for rec in records:
+        values = rec.get("rows") or [[v] for v in rec.get("values") or rec.get("labels") or []] or [[]]
+        for i, row in enumerate(values):
+            flat.append({
+                "ts": rec["ts"], "city": rec["city"], "mode": rec["mode"], "theme": rec["theme"],
+                "source": rec["source"], "visual": rec.get("index"), "title": rec.get("title"),
+                "type": rec.get("type"), "row": i, "values": " | ".join(str(v) for v in row),
+            })
+
+    if fmt == "csv":
+        import csv
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=list(flat[0].keys()) if flat else ["ts"])
+            writer.writeheader()
+            writer.writerows(flat)
+    elif fmt == "parquet":
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            print("❌ Parquet krever pyarrow: pip install pyarrow")
+            sys.exit(2)
+        pq.write_table(pa.Table.from_pylist(flat), str(path))
+    else:
+        raise ValueError(f"Ukjent format: {fmt}")
+    return path
+
+
+def navigate_fresh(driver, url):
+    """driver.get som alltid laster siden på nytt, også når bare #p.City= er endret."""
+    if driver.current_url.split("#")[0] == url.split("#")[0]:
+        driver.get(url)
+        reload_and_wait(driver)
+    else:
+        driver.get(url)
+
+
+def extract_city(driver, theme, mode, city):
+    """Last dashboardet for én by og returner records fra DOM og nettverk."""
+    url = dashboard_url(theme, mode, city)
+    collect_network_payloads(driver)  # tøm loggen fra forrige by
+    navigate_fresh(driver, url)
+    status = wait_for_dashboard_visible(driver, timeout=60, poll_interval=2)
+    if not status['visible']:
+        print(f"⚠️  {city}: dashboard ikke synlig ({status['reason']}) – hopper over")
+        return []
+
+    ts = datetime.now().isoformat(timespec="seconds")
+    base = {"ts": ts, "city": city, "mode": mode, "theme": theme}
+    records = [dict(base, source="dom", **v) for v in extract_visuals(driver)]
+    records += [dict(base, source="network", index=i, type="payload", **p)
+                for i, p in enumerate(collect_network_payloads(driver))]
+    return records
+
+
+def _extract_worker(worker_id, driver, jobs, theme, mode, fmt, out_dir, stamp, report):
+    while True:
+        try:
+            city = jobs.get_nowait()
+        except queue.Empty:
+            return
+        t0 = time.time()
+        row = {"city": city, "worker": worker_id, "records": 0, "status": "ok"}
+        try:
+            records = extract_city(driver, theme, mode, city)
+            if records:
+                path = write_records(records, Path(out_dir) / f"{mode}-{city.replace(' ', '_')}-{stamp}.{fmt}", fmt)
+                row["records"] = len(records)
+                row["file"] = str(path)
+            else:
+                row["status"] = "not_visible"
+        except Exception as e:
+            row["status"] = f"error: {e}"
+        row["seconds"] = round(time.time() - t0, 2)
+        metric_observe("qs_extract_city_seconds", row["seconds"], mode=mode, status=row["status"].split(":")[0])
+        print(f"📦 [{worker_id}] {city}: {row['records']} records på {row['seconds']:.1f}s ({row['status']})")
+        report.append(row)
+
+
+def run_extract(cities, mode=DASHBOARD_MODE, fmt="jsonl", out_dir=EXTRACT_DIR, workers=1):
+    """
+    Datauttrekk med én innlogging. Med workers > 1 startes flere headless nettlesere som får
+    cookies fra den første (ingen ny UI-innlogging), og byene fordeles fra en felles kø.
+    Alle bruker midlertidige profiler, ikke kioskens USER_PROFILE.
+    Til slutt skrives en latensrapport per by til out_dir.
+    """
+    theme = get_current_theme()
+    workers = max(1, min(workers, len(cities)))
+    if workers > 1 and DRIVER_BACKEND == "playwright":
+        # Playwrights sync-objekter hører til tråden de ble laget i (én delt sync_playwright per prosess)
+        print("ℹ️  DRIVER_BACKEND=playwright: datauttrekket kjører med én arbeider.")
+        workers = 1
+    started = time.time()
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    drivers, temp_profiles = [], []
+
+    try:
+        # Egen profil: kioskens USER_PROFILE er låst mens kiosken kjører, og feilede starter her skal ikke
+        # telle mot den. Innloggingen kommer fra den delte sesjonen (kald profil) eller skjemaet.
+        profile_dir = tempfile.mkdtemp(prefix="qschrome-extract-")
+        temp_profiles.append(profile_dir)
+        driver, account, username, password = setup_driver(headless=True, performance_log=True,
+                                                           profile_dir=profile_dir)
+        drivers.append(driver)
+        driver.execute_cdp_cmd("Network.enable", {})
+        if username and password:
+            login_if_needed(driver, account, username, password, DEFAULT_URL)
+
+        if workers > 1:
+            cookies = export_cookies(driver)
+            print(f"👥 Starter {workers - 1} ekstra arbeidere med delt innlogging ({len(cookies)} cookies) …")
+            for _ in range(workers - 1):
+                profile_dir = tempfile.mkdtemp(prefix="qschrome-worker-")
+                temp_profiles.append(profile_dir)
+                extra, _, _, _ = setup_driver(headless=True, performance_log=True, profile_dir=profile_dir)
+                drivers.append(extra)
+                extra.execute_cdp_cmd("Network.enable", {})
+                import_cookies(extra, cookies)
+
+        jobs = queue.Queue()
+        for city in cities:
+            jobs.put(city)
+        report = []
+        if len(drivers) == 1:
+            _extract_worker(0, driver, jobs, theme, mode, fmt, out_dir, stamp, report)
+        else:
+            threads = [
+                threading.Thread(target=_extract_worker,
+                                 args=(i, d, jobs, theme, mode, fmt, out_dir, stamp, report), daemon=True)
+                for i, d in enumerate(drivers)
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+    finally:
+        for d in drivers:
+            try:
+                d.quit()
+            except Exception:
+                pass
+        for p in temp_profiles:
+            shutil.rmtree(p, ignore_errors=True)
+
+    total = time.time() - started
+    report.sort(key=lambda r: -r["seconds"])
+    report_path = Path(out_dir) / f"latency-{mode}-{stamp}.json"
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump({"workers": workers, "cities": len(cities), "total_seconds": round(total, 2),
+                   "per_city": report}, f, indent=1, ensure_ascii=False)
+
+    print(f"\n⏱️  {len(cities)} byer med {workers} arbeider(e) på {total:.1f}s")
+    for r in report:
+        print(f"   {r['city']:<14} {r['seconds']:7.1f}s  {r['records']:5d} records  {r['status']}")
+    print(f"📝 Latensrapport: {report_path}")
+
+
+def parse_extract_args(argv):
+    import argparse
+    parser = argparse.ArgumentParser(description="Hent data ut av QuickSight-dashboardet (headless).")
+    parser.add_argument("--extract", action="store_true")
+    parser.add_argument("--cities", default=CITY,
+                        help="Kommaseparert liste, eller 'all' for alle byer i CITY_MAPPING")
+    parser.add_argument("--mode", default=DASHBOARD_MODE, choices=MODES)
+    parser.add_argument("--format", default="jsonl", choices=("jsonl", "csv", "parquet"))
+    parser.add_argument("--out", default=EXTRACT_DIR)
+    parser.add_argument("--workers", type=int, default=EXTRACT_WORKERS,
+                        help="Antall parallelle nettlesere som deler én innlogging")
+    args = parser.parse_args(argv)
+    args.cities = list(CITIES) if args.cities == "all" else [c.lower() for c in split_candidates(args.cities)]
+    errors = [e for city in args.cities for e in validate(city=city)]
+    if errors:
+        parser.error("; ".join(errors))
+    return args
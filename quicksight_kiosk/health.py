@@ -0,0 +1,408 @@
+# -*- coding: utf-8 -*-
+"""Helsesjekk av dashboardet: én JS-probe per sjekk og hendelsesdrevet venting (dialoger: se dialogs)."""
+
+import os
+import time
+
+from .browser import webdriver_calls
+from .lastgood import capture_last_good, hide_last_good
+from .metrics import metric_incr, metric_gauge, metric_observe
+
+# Selektorer brukt av helsesjekken (delt mellom JS-proben og WebDriver-varianten)
+ERROR_XPATHS = [
+    "//div[contains(@class, 'error')]//h1",
+    "//div[contains(text(), 'Something went wrong')]",
+    "//div[contains(text(), 'Access denied')]",
+    "//div[contains(text(), 'not found')]",
+]
+DASHBOARD_SELECTORS = [
+    "[class*='dashboard']",
+    "[class*='Dashboard']",
+    "[data-testid='dashboard']",
+    ".quicksight-embedding-iframe",
+    "[class*='visual-container']",
+    "[class*='sheet-container']",
+]
+VISUAL_SELECTORS = [
+    "[class*='visual']",
+    "[class*='chart']",
+    "[class*='kpi']",
+    "[class*='table']",
+    "svg[class*='chart']",
+    "canvas",
+    "[class*='insight']",
+]
+# Én container per visual (uttrekket og data-fingeravtrykket i staleness)
+VISUAL_CONTAINER_SELECTORS = [
+    "[class*='visual-container']",
+    "[data-automation-id*='visual']",
+]
+SPINNER_SELECTORS = [
+    "[class*='loading']",
+    "[class*='spinner']",
+    "[class*='Loading']",
+    "[class*='Spinner']",
+    "[role='progressbar']",
+]
+
+# "js" = én execute_script per sjekk, "webdriver" = gammel variant med ett kall per selektor/element
+HEALTH_PROBE = os.getenv("HEALTH_PROBE", "js").lower()
+# Helseprobe mellom refreshene i kiosken (sekunder, 0 = bare etter refresh)
+HEALTH_CHECK_SECS = int(os.getenv("HEALTH_CHECK_SECS", "120"))
+# En probe som ikke ser dashboardet (f.eks. midt i QuickSights egen lasting) venter så lenge før gjenoppretting
+HEALTH_GRACE_SECS = int(os.getenv("HEALTH_GRACE_SECS", "20"))
+
+# Kjøres i siden og regner ut alle fem sjekkene i én WebDriver-rundtur.
+HEALTH_PROBE_FN = """
+function qsProbe(errorXPaths, dashSels, visualSels, spinnerSels) {
+    function shown(el) {
+        if (el.checkVisibility) {
+            if (!el.checkVisibility({checkOpacity: true, checkVisibilityCSS: true})) return false;
+        } else {
+            const st = getComputedStyle(el);
+            if (st.display === 'none' || st.visibility === 'hidden' || st.opacity === '0') return false;
+        }
+        const r = el.getBoundingClientRect();
+        return r.width > 0 && r.height > 0;
+    }
+    function first(sel) {
+        try { return document.querySelector(sel); } catch (e) { return null; }
+    }
+    function all(sel) {
+        try { return document.querySelectorAll(sel); } catch (e) { return []; }
+    }
+    const checks = {
+        not_on_signin: !location.href.toLowerCase().includes('signin'),
+        no_error_page: false,
+        dashboard_container: false,
+        visuals_loaded: false,
+        no_loading_spinner: false,
+    };
+    if (!checks.not_on_signin) return {checks: checks, visuals_found: 0};
+    checks.no_error_page = !errorXPaths.some(xp => {
+        const el = document.evaluate(xp, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        return el && shown(el);
+    });
+    if (!checks.no_error_page) return {checks: checks, visuals_found: 0};
+    for (const sel of dashSels) {
+        const el = first(sel);
+        if (el && shown(el)) { checks.dashboard_container = true; break; }
+    }
+    let visuals = 0;
+    for (const sel of visualSels) {
+        for (const el of all(sel)) { if (shown(el)) visuals++; }
+    }
+    checks.visuals_loaded = visuals >= 1;
+    checks.no_loading_spinner = !spinnerSels.some(sel => Array.from(all(sel)).some(shown));
+    return {checks: checks, visuals_found: visuals};
+}
+"""
+HEALTH_PROBE_JS = HEALTH_PROBE_FN + "return qsProbe.apply(null, arguments);"
+
+# "observer" = vent hendelsesdrevet i siden (MutationObserver), "poll" = sjekk hvert poll_interval
+READINESS_MODE = os.getenv("READINESS_MODE", "observer").lower()
+# Hvor lenge dashboardet må være klart uten avbrudd før vi regner det som ferdig (ms)
+READY_QUIET_MS = int(os.getenv("READY_QUIET_MS", "100"))
+
+# Installerer MutationObserver + PerformanceObserver og kaller tilbake når siden er "settled":
+# proben er grønn og har holdt seg grønn i quietMs, eller når timeoutMs er nådd.
+READINESS_OBSERVER_JS = HEALTH_PROBE_FN + """
+const [errorXPaths, dashSels, visualSels, spinnerSels, timeoutMs, quietMs] = arguments;
+const done = arguments[arguments.length - 1];
+const t0 = performance.now();
+let result = null, settleTimer = null, pending = false, finished = false, events = 0;
+let mo = null, po = null;
+
+function ready(r) {
+    const c = r.checks;
+    return c.not_on_signin && c.no_error_page &&
+        (c.dashboard_container || c.visuals_loaded) && c.no_loading_spinner;
+}
+function finish(settled) {
+    if (finished) return;
+    finished = true;
+    if (mo) mo.disconnect();
+    if (po) po.disconnect();
+    clearTimeout(settleTimer);
+    clearTimeout(deadline);
+    result = result || qsProbe(errorXPaths, dashSels, visualSels, spinnerSels);
+    done(Object.assign({}, result, {
+        settled: settled, elapsed_ms: Math.round(performance.now() - t0), events: events
+    }));
+}
+function evaluate() {
+    pending = false;
+    if (finished) return;
+    result = qsProbe(errorXPaths, dashSels, visualSels, spinnerSels);
+    if (ready(result)) {
+        if (!settleTimer) settleTimer = setTimeout(() => finish(true), quietMs);
+    } else if (settleTimer) {
+        clearTimeout(settleTimer);
+        settleTimer = null;
+    }
+}
+function schedule() {
+    events++;
+    // setTimeout i stedet for requestAnimationFrame: fungerer også i bakgrunnsfaner
+    if (!pending) { pending = true; setTimeout(evaluate, 16); }
+}
+
+const deadline = setTimeout(() => finish(false), timeoutMs);
+mo = new MutationObserver(schedule);
+mo.observe(document.documentElement, {
+    childList: true, subtree: true, attributes: true, attributeFilter: ['class', 'style', 'hidden']
+});
+try {
+    po = new PerformanceObserver(schedule);
+    po.observe({entryTypes: ['resource', 'paint']});
+} catch (e) { po = null; }
+evaluate();
+"""
+
+
+def _summarize_checks(checks, visuals_found):
+    """Felles evaluering av de fem sjekkene -> (visible, reason)."""
+    if not checks['not_on_signin']:
+        return False, 'Stuck on signin page'
+    if not checks['no_error_page']:
+        return False, 'Error page detected'
+
+    # Dashboard er synlig hvis vi har container ELLER visuals, og ingen spinner
+    is_visible = (
+        (checks['dashboard_container'] or checks['visuals_loaded']) and
+        checks['no_loading_spinner']
+    )
+
+    if is_visible:
+        reason = f"Dashboard visible ({visuals_found} visuals found)"
+    elif not checks['no_loading_spinner']:
+        reason = "Dashboard still loading"
+    elif not checks['dashboard_container'] and not checks['visuals_loaded']:
+        reason = "No dashboard elements found"
+    else:
+        reason = "Dashboard state unclear"
+    return is_visible, reason
+
+
+def _probe_js(driver, checks):
+    """Alle sjekker i én execute_script-rundtur."""
+    result = driver.execute_script(
+        HEALTH_PROBE_JS, ERROR_XPATHS, DASHBOARD_SELECTORS, VISUAL_SELECTORS, SPINNER_SELECTORS
+    ) or {}
+    checks.update(result.get('checks', {}))
+    return int(result.get('visuals_found', 0))
+
+
+def _probe_webdriver(driver, checks):
+    """Opprinnelig variant: ett WebDriver-kall per selektor og per funnet element."""
+    from selenium.webdriver.common.by import By
+    from selenium.common.exceptions import NoSuchElementException
+
+    current_url = driver.current_url.lower()
+
+    # 1. Sjekk at vi ikke er på innloggingssiden
+    checks['not_on_signin'] = 'signin' not in current_url
+    if not checks['not_on_signin']:
+        return 0
+
+    # 2. Sjekk for feilsider
+    has_error = False
+    for xpath in ERROR_XPATHS:
+        try:
+            el = driver.find_element(By.XPATH, xpath)
+            if el.is_displayed():
+                has_error = True
+                break
+        except NoSuchElementException:
+            pass
+    checks['no_error_page'] = not has_error
+    if not checks['no_error_page']:
+        return 0
+
+    # 3. Sjekk at dashboard-container finnes
+    for selector in DASHBOARD_SELECTORS:
+        try:
+            el = driver.find_element(By.CSS_SELECTOR, selector)
+            if el.is_displayed():
+                checks['dashboard_container'] = True
+                break
+        except NoSuchElementException:
+            pass
+
+    # 4. Sjekk at visuals (grafer, tabeller) er lastet
+    visuals_found = 0
+    for selector in VISUAL_SELECTORS:
+        try:
+            elements = driver.find_elements(By.CSS_SELECTOR, selector)
+            visuals_found += sum(1 for el in elements if el.is_displayed())
+        except Exception:
+            pass
+    checks['visuals_loaded'] = visuals_found >= 1
+
+    # 5. Sjekk at det ikke er loading spinner synlig
+    spinner_visible = False
+    for selector in SPINNER_SELECTORS:
+        try:
+            elements = driver.find_elements(By.CSS_SELECTOR, selector)
+            for el in elements:
+                if el.is_displayed():
+                    # Dobbeltsjekk at det faktisk er en spinner (ikke bare et element med loading i navnet)
+                    size = el.size
+                    if size['width'] > 0 and size['height'] > 0:
+                        spinner_visible = True
+                        break
+        except Exception:
+            pass
+        if spinner_visible:
+            break
+    checks['no_loading_spinner'] = not spinner_visible
+    return visuals_found
+
+
+def check_dashboard_visible(driver, timeout=30, probe=None):
+    """
+    Sjekker om QuickSight-dashboardet er synlig og lastet korrekt.
+
+    probe: "js" (standard, én execute_script) eller "webdriver" (ett kall per selektor).
+           Hvis ikke gitt brukes HEALTH_PROBE fra .env.
+
+    Returnerer:
+        dict med status:
+        - 'visible': True hvis dashboardet er synlig
+        - 'reason': Beskrivelse av status
+        - 'checks': Dict med individuelle sjekker
+        - 'webdriver_calls': Antall WebDriver-kall sjekken brukte
+    """
+    checks = {
+        'not_on_signin': False,
+        'no_error_page': False,
+        'dashboard_container': False,
+        'visuals_loaded': False,
+        'no_loading_spinner': False,
+    }
+    probe = (probe or HEALTH_PROBE).lower()
+    calls_before = webdriver_calls(driver)
+    t0 = time.time()
+
+    try:
+        if probe == "webdriver":
+            visuals_found = _probe_webdriver(driver, checks)
+        else:
+            visuals_found = _probe_js(driver, checks)
+        is_visible, reason = _summarize_checks(checks, visuals_found)
+    except Exception as e:
+        is_visible, reason = False, f"Check failed: {e}"
+
+    calls = webdriver_calls(driver) - calls_before
+    metric_observe("qs_health_check_seconds", time.time() - t0, probe=probe)
+    metric_incr("qs_webdriver_calls_total", calls, op="health_check")
+    metric_gauge("qs_health_check_webdriver_calls", calls, probe=probe)
+    return {
+        'visible': is_visible,
+        'reason': reason,
+        'checks': checks,
+        'webdriver_calls': calls,
+    }
+
+
+def _wait_observer(driver, timeout):
+    """
+    Blokkerer på execute_async_script til siden melder "settled" eller timeout.
+    Returnerer status-dict, eller None hvis siden navigerte bort underveis (JS-konteksten forsvant).
+    """
+    calls_before = webdriver_calls(driver)
+    checks = {
+        'not_on_signin': False,
+        'no_error_page': False,
+        'dashboard_container': False,
+        'visuals_loaded': False,
+        'no_loading_spinner': False,
+    }
+    try:
+        driver.set_script_timeout(timeout + 5)
+        result = driver.execute_async_script(
+            READINESS_OBSERVER_JS, ERROR_XPATHS, DASHBOARD_SELECTORS, VISUAL_SELECTORS,
+            SPINNER_SELECTORS, int(timeout * 1000), READY_QUIET_MS
+        ) or {}
+    except Exception:
+        return None
+
+    checks.update(result.get('checks', {}))
+    is_visible, reason = _summarize_checks(checks, int(result.get('visuals_found', 0)))
+    return {
+        'visible': is_visible and bool(result.get('settled')),
+        'reason': reason,
+        'checks': checks,
+        'webdriver_calls': webdriver_calls(driver) - calls_before,
+        'settle_ms': result.get('elapsed_ms'),
+        'events': result.get('events', 0),
+    }
+
+
+def wait_for_dashboard_visible(driver, timeout=60, poll_interval=2, mode=None):
+    """
+    Venter til dashboardet er synlig, med timeout.
+
+    Args:
+        driver: Selenium WebDriver
+        timeout: Maks ventetid i sekunder
+        poll_interval: Hvor ofte vi sjekker (sekunder) i "poll"-modus
+        mode: "observer" (hendelsesdrevet i siden) eller "poll". Standard fra READINESS_MODE.
+
+    Returns:
+        dict med status fra check_dashboard_visible, eller timeout-feil
+    """
+    mode = (mode or READINESS_MODE).lower()
+    start_time = time.time()
+    last_status = None
+    checks_run = 0
+    total_calls = 0
+
+    while (time.time() - start_time) < timeout:
+        if mode == "observer":
+            remaining = timeout - (time.time() - start_time)
+            status = _wait_observer(driver, remaining)
+            if status is None:
+                # Siden navigerte (f.eks. redirect) mens observeren kjørte – prøv igjen i ny kontekst
+                time.sleep(0.2)
+                continue
+        else:
+            status = check_dashboard_visible(driver)
+        last_status = status
+        checks_run += 1
+        total_calls += status.get('webdriver_calls', 0)
+
+        if status['visible']:
+            elapsed = time.time() - start_time
+            print(f"✅ Dashboard synlig etter {elapsed:.1f}s: {status['reason']}")
+            print(f"    WebDriver-kall: {status['webdriver_calls']} siste sjekk, "
+                  f"{total_calls} totalt over {checks_run} sjekk(er) [{mode}/{HEALTH_PROBE}]")
+            metric_observe("qs_wait_visible_seconds", elapsed, mode=mode, result="visible")
+            # Bytt tilbake fra siste gode bilde, og ta vare på dette som det nye
+            hide_last_good(driver)
+            capture_last_good(driver)
+            return status
+
+        if mode != "observer":
+            time.sleep(poll_interval)
+
+    elapsed = time.time() - start_time
+    print(f"⚠️  Timeout etter {elapsed:.1f}s: {last_status['reason'] if last_status else 'Unknown'}")
+    metric_observe("qs_wait_visible_seconds", elapsed, mode=mode, result="timeout")
+    return last_status or {
+        'visible': False,
+        'reason': f'Timeout after {timeout}s',
+        'checks': {}
+    }
+
+
+def probe_dashboard(driver):
+    """
+    Helseprobe mellom refreshene: ett øyeblikksbilde, og bare hvis det ikke er synlig, en kort venting
+    (HEALTH_GRACE_SECS) før dommen. En spinner under QuickSights egen lasting skal ikke gi full reload.
+    """
+    status = check_dashboard_visible(driver)
+    if status['visible'] or not HEALTH_GRACE_SECS:
+        return status
+    print(f"⏳ Helseprobe: {status['reason']} – venter opptil {HEALTH_GRACE_SECS}s før gjenoppretting …")
+    return wait_for_dashboard_visible(driver, timeout=HEALTH_GRACE_SECS, poll_interval=2)
@@ -0,0 +1,513 @@
+# -*- coding: utf-8 -*-
+"""Visningsløkkene: ett dashboard med refresh og temabytte, eller rotasjon mellom flere faner, drevet av scheduler."""
+
+import os
+import sys
+import time
+from datetime import datetime
+
+from . import browser
+from .auth import login_if_needed
+from .config import (
+    DEFAULT_URL, DASHBOARD_MODE, CITY, REFRESH_SECS, REFRESH_ADAPTIVE, REFRESH_POLICY, RESTART_TIMES,
+    THEME_PRELOAD_TIMEOUT, THEME_PRELOAD_SETTLE, ROTATION, ROTATION_DWELL_SECS, PROFILE_MODE, reload_env,
+    DRIVER_BACKEND, split_candidates,
+)
+from .dialogs import dismiss_dialogs, install_dialog_dismisser
+from .env import ENV_TIMINGS, PROCESS_START
+from .health import HEALTH_CHECK_SECS, probe_dashboard, wait_for_dashboard_visible
+from .lastgood import LAST_GOOD_STATE, show_last_good
+from .metrics import metric_incr, metric_gauge, start_metrics_server
+from .network import apply_request_filter
+from .preload import preload_in_background, preload_ready, swap_to_preloaded, discard_preload, _navigate_theme
+from .reauth import REAUTH_RETRY_SECS, reauth_due_in, reauth_in_background
+from .recovery import recover_dashboard, restart_process
+from .refresh import refresh_dashboard
+from .schedule import (
+    get_current_theme, next_restart_at, next_theme_change, print_restart_policy, parse_refresh_policy,
+    refresh_bounds, next_policy_boundary, next_refresh_interval,
+)
+from .scheduler import (
+    TASK_RETRY_SECS, new_scheduler, schedule, reschedule, seconds_until, install_signal_handlers, run_scheduler,
+)
+from .staleness import data_changed
+from .urls import dashboard_url, require_valid, validate
+
+# Hvor ofte en forhåndslastet fane sjekkes mens den laster (bare under bytte)
+PRELOAD_POLL_SECS = 2.0
+
+
+def _reload_config(driver, live=()):
+    """
+    SIGHUP: les .env på nytt. Nøkler i live tas i bruk i den kjørende visningen; andre endringer gir ny prosess,
+    siden innstillingene leses ved import (profilen beholdes, så innloggingen overlever). Returnerer endrede nøkler.
+    """
+    changed = reload_env()
+    if not changed:
+        print("📄 SIGHUP: ingen endringer i .env.")
+        return []
+    print(f"📄 SIGHUP: endret i .env: {', '.join(changed)}")
+    rest = [key for key in changed if key not in live]
+    if rest:
+        restart_process(driver, f"SIGHUP: {', '.join(rest)} endret")
+    return changed
+
+
+def keep_open_and_reload(driver, operations_url, theme=None, mode=DASHBOARD_MODE, city=CITY, policies=()):
+    """
+    Holder ett dashboard i gang. Refresh, planlagt restart, temabytte, fornyelse av innlogging og helseprobe er
+    oppgaver i planleggeren, som sover til neste frist. SIGUSR1 gir refresh nå; SIGHUP leser .env på nytt
+    (THEME, CITY og DASHBOARD_MODE byttes i den kjørende nettleseren). Dialoger lukkes i siden (dialogs).
+    """
+    print("🖥️ Dashboardet er åpent. Holder visning i gang.")
+    view = {
+        'driver': driver, 'url': operations_url, 'theme': theme or get_current_theme(), 'mode': mode, 'city': city,
+        'preload': None, 'interval': next_refresh_interval(REFRESH_SECS, None, policies),
+        'last_reload': time.time(), 'avoided': 0, 'restart_at': next_restart_at(RESTART_TIMES),
+    }
+    if REFRESH_ADAPTIVE:
+        lo, hi = refresh_bounds(policies)
+        print(f"🔄 Adaptiv refresh uten ny innlogging: {lo}-{hi}s nå, lengre når dataene står stille.")
+    else:
+        print(f"🔄 Reloader hver {REFRESH_SECS}s uten ny innlogging.")
+    print_restart_policy()
+    sched = new_scheduler()
+
+    def after_load():
+        # Ny innlasting: helseproben regnes fra nå
+        reschedule(sched, "health", HEALTH_CHECK_SECS)
+
+    def refresh():
+        elapsed = time.time() - view['last_reload']
+        print(f"🔄 Refresh (etter {elapsed:.0f}s) …")
+        view['driver'] = refresh_dashboard(view['driver'], view['url'])
+        view['last_reload'] = time.time()
+        # Refresher en fast REFRESH_SECS-plan ville gjort i mellomtiden
+        skipped = max(0, int(elapsed // REFRESH_SECS) - 1)
+        if skipped:
+            view['avoided'] += skipped
+            metric_incr("qs_refresh_avoided_total", skipped)
+        changed = data_changed(view['url'])
+        view['interval'] = next_refresh_interval(view['interval'], changed, policies)
+        metric_gauge("qs_refresh_interval_seconds", view['interval'])
+        if REFRESH_ADAPTIVE:
+            state = {True: "nye data", False: "uendret", None: "ukjent"}[changed]
+            print(f"⏭️  {state} – neste refresh om {view['interval']}s "
+                  f"({skipped} spart nå, {view['avoided']} totalt).")
+        after_load()
+        return view['interval']
+
+    def policy():
+        # Et nytt tidsrom med lavere maks (f.eks. natt -> dag) skal slå inn med en gang
+        _lo, hi = refresh_bounds(policies)
+        if view['interval'] > hi:
+            view['interval'] = hi
+            reschedule(sched, "refresh", hi - (time.time() - view['last_reload']))
+        boundary = next_policy_boundary(policies)
+        return seconds_until(boundary) if boundary else None
+
+    def restart():
+        now = datetime.now()
+        if now < view['restart_at']:
+            return seconds_until(view['restart_at'])
+        restart_process(view['driver'], f"Daglig planlagt restart kl. {now:%H:%M}")
+
+    def reauth():
+        # Forny før utløp; fanen som vises får bare nye cookies
+        if not reauth_in_background(view['driver']):
+            return REAUTH_RETRY_SECS
+        return max(REAUTH_RETRY_SECS, reauth_due_in())
+
+    def health():
+        status = probe_dashboard(view['driver'])
+        if not status['visible']:
+            print(f"⚠️  Helseprobe: dashboard ikke synlig: {status['reason']}")
+            view['driver'] = recover_dashboard(view['driver'], view['url'], f"Helseprobe: {status['reason']}")
+            view['last_reload'] = time.time()
+            after_load()
+        # Dialoglukkeren i siden har tatt dialogene; her telles de bare
+        dismiss_dialogs(view['driver'])
+        return HEALTH_CHECK_SECS
+
+    def switch_view():
+        # Temabytte (eller ny by/modus etter SIGHUP): forhåndslast i bakgrunnsfane, bytt når helseproben er grønn
+        wanted = get_current_theme()
+        url = dashboard_url(wanted, view['mode'], view['city'])
+        preload = view['preload']
+        if preload is not None and preload['url'] != url:
+            discard_preload(view['driver'], preload)
+            preload = view['preload'] = None
+        if preload is None and url != view['url']:
+            if wanted != view['theme']:
+                print(f"🎨 Temabytte {view['theme']} → {wanted}: forhåndslaster i bakgrunnen …")
+            else:
+                print(f"🗺️  Ny visning {view['mode']}/{view['city']}: forhåndslaster i bakgrunnen …")
+            view['preload'] = preload_in_background(view['driver'], url)
+            view['preload']['theme'] = wanted
+            schedule(sched, "preload", poll_preload, PRELOAD_POLL_SECS)
+        change = next_theme_change()
+        return seconds_until(change) if change else None
+
+    def poll_preload():
+        preload = view['preload']
+        if preload is None:
+            return None
+        driver = view['driver']
+        if preload_ready(driver, preload) and swap_to_preloaded(driver, driver.current_window_handle, preload):
+            metric_incr("qs_theme_switch_total", method="preload")
+            print(f"✅ Byttet til {preload['theme'].upper()} uten restart "
+                  f"({time.time() - preload['started']:.1f}s forhåndslasting).")
+        elif time.time() - preload['started'] > THEME_PRELOAD_TIMEOUT:
+            print(f"⚠️  Forhåndslasting ble ikke klar på {THEME_PRELOAD_TIMEOUT}s – navigerer direkte.")
+            discard_preload(driver, preload)
+            view['driver'] = _navigate_theme(driver, preload['url'])
+            metric_incr("qs_theme_switch_total", method="navigate")
+        else:
+            # Ikke klar: sov til fanen har fått satt seg, eller til neste forsøk
+            wait_for = [preload['next_try']]
+            if preload['ready_at'] is not None:
+                wait_for.append(preload['ready_at'] + THEME_PRELOAD_SETTLE)
+            return max(PRELOAD_POLL_SECS, max(wait_for) - time.time())
+        view['theme'], view['url'], view['preload'] = preload['theme'], preload['url'], None
+        view['last_reload'] = time.time()
+        reschedule(sched, "refresh", view['interval'])
+        after_load()
+        return None
+
+    def on_error(name, exc):
+        # En WebDriver-feil i en oppgave (f.eks. en forhåndslastet fane som forsvant) skal ikke ta ned kiosken
+        if name == "preload":
+            preload, view['preload'] = view['preload'], None
+            if preload is not None:
+                try:
+                    discard_preload(view['driver'], preload)
+                except Exception:
+                    pass
+            reschedule(sched, "theme", TASK_RETRY_SECS)
+        view['driver'] = recover_dashboard(view['driver'], view['url'], f"Oppgaven '{name}' feilet: {exc}")
+        view['last_reload'] = time.time()
+        after_load()
+        return {"refresh": view['interval'], "preload": None}.get(name, TASK_RETRY_SECS)
+
+    def on_signal(name):
+        if name == "SIGUSR1":
+            print("📶 SIGUSR1: refresh nå.")
+            reschedule(sched, "refresh", 0)
+        elif name == "SIGHUP":
+            if not _reload_config(view['driver'], live=("THEME", "CITY", "DASHBOARD_MODE")):
+                return
+            new_mode = os.getenv("DASHBOARD_MODE", "operations").lower()
+            new_city = os.getenv("CITY", "bergen").lower()
+            errors = validate(os.getenv("THEME", "").lower().strip(), new_mode, new_city)
+            for error in errors:
+                print(f"❌ {error} (.env) – beholder {view['mode']}/{view['city']}")
+            if not errors:
+                view['mode'], view['city'] = new_mode, new_city
+                schedule(sched, "theme", switch_view, 0)
+
+    schedule(sched, "refresh", refresh, view['interval'])
+    schedule(sched, "theme", switch_view, 0)
+    if HEALTH_CHECK_SECS:
+        schedule(sched, "health", health, HEALTH_CHECK_SECS)
+    if RESTART_TIMES:
+        schedule(sched, "restart", restart, seconds_until(view['restart_at']))
+    if policies:
+        schedule(sched, "policy", policy, seconds_until(next_policy_boundary(policies)))
+    schedule(sched, "reauth", reauth, reauth_due_in())
+    install_signal_handlers(sched)
+    print(f"📶 Signaler: kill -USR1 {os.getpid()} = refresh nå, kill -HUP {os.getpid()} = les .env på nytt.")
+
+    try:
+        run_scheduler(sched, on_signal, on_error)
+    except KeyboardInterrupt:
+        print("\n⛔ Avslutter på brukerkommando …")
+        try:
+            view['driver'].quit()
+        except Exception:
+            pass
+
+
+# Installeres i hver rotasjonsfane via CDP og overlever reload: fanen laster seg selv
+# på nytt mens den er skjult og dataene er eldre enn refreshMs, slik at byttet blir øyeblikkelig.
+HIDDEN_TAB_REFRESH_JS = """
+(() => {
+    const refreshMs = %d;
+    const loadedAt = Date.now();
+    setInterval(() => {
+        if (document.hidden && Date.now() - loadedAt >= refreshMs) location.reload();
+    }, 5000);
+})();
+"""
+
+
+def parse_rotation(spec, theme):
+    """
+    Parse ROTATION, f.eks. "operations:bergen:60, mechanics:bergen:30, operations:oslo".
+    Format per innslag: modus[:by[:dwell-sekunder]]. By og dwell faller tilbake til CITY og ROTATION_DWELL_SECS.
+    """
+    entries = []
+    for item in split_candidates(spec):
+        parts = [p.strip() for p in item.split(":")]
+        mode = (parts[0] or DASHBOARD_MODE).lower()
+        city = (parts[1] if len(parts) > 1 and parts[1] else CITY).lower()
+        dwell = int(parts[2]) if len(parts) > 2 and parts[2] else ROTATION_DWELL_SECS
+        require_valid(mode=mode, city=city, source=f"ROTATION '{item}'")
+        entries.append({
+            'mode': mode,
+            'city': city,
+            'dwell': dwell,
+            'url': dashboard_url(theme, mode, city),
+            'handle': None,
+        })
+    return entries
+
+
+def _install_hidden_refresh(driver):
+    apply_request_filter(driver)
+    install_dialog_dismisser(driver)
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument",
+                               {"source": HIDDEN_TAB_REFRESH_JS % (REFRESH_SECS * 1000)})
+    except Exception as e:
+        print(f"⚠️  Klarte ikke installere bakgrunns-refresh i fane: {e}")
+
+
+def _rotation_recovered(driver, entry, current):
+    """Etter gjenoppretting: oppdater fane-handle (new_tab-trinnet bytter fane). True hvis nettleseren er ny."""
+    if driver is not current:
+        return True
+    if driver.current_window_handle != entry['handle']:
+        entry['handle'] = driver.current_window_handle
+        _install_hidden_refresh(driver)
+    return False
+
+
+def open_rotation_tabs(driver, entries):
+    """Åpner hvert innslag i sin egen fane i samme innloggede nettleser og venter til alle er lastet."""
+    for i, entry in enumerate(entries):
+        if i > 0:
+            driver.switch_to.new_window("tab")
+            show_last_good(driver, entry['url'], "oppstart")
+        entry['handle'] = driver.current_window_handle
+        _install_hidden_refresh(driver)
+        print(f"🗂️  Fane {i + 1}/{len(entries)}: {entry['mode'].upper()} | {entry['city'].upper()} ({entry['dwell']}s)")
+        driver.get(entry['url'])
+        status = wait_for_dashboard_visible(driver, timeout=60, poll_interval=3)
+        if not status['visible']:
+            current = driver
+            driver = recover_dashboard(driver, entry['url'],
+                                       f"Fane {i + 1} ikke synlig: {status['reason']}",
+                                       start_tier="navigate")
+            if _rotation_recovered(driver, entry, current):
+                return open_rotation_tabs(driver, entries)
+    driver.switch_to.window(entries[0]['handle'])
+    return driver
+
+
+def _rotation_theme_swap(driver, entry, previous_handle):
+    """Bytter innslaget til forhåndslastet fane med nytt tema når den er klar. Returnerer driveren."""
+    preload = entry['preload']
+    if preload_ready(driver, preload) and swap_to_preloaded(driver, previous_handle, preload,
+                                                            close_handle=entry['handle']):
+        entry['handle'], entry['url'] = preload['handle'], preload['url']
+        entry['preload'] = None
+        _install_hidden_refresh(driver)
+        print(f"✅ {entry['mode']}/{entry['city']} byttet til {preload['theme'].upper()}.")
+    elif time.time() - preload['started'] > THEME_PRELOAD_TIMEOUT:
+        discard_preload(driver, preload)
+        entry['url'] = preload['url']
+        entry['preload'] = None
+        driver.switch_to.window(entry['handle'])
+        driver = _navigate_theme(driver, entry['url'])
+        entry['handle'] = driver.current_window_handle
+    return driver
+
+
+def keep_rotating(driver, entries, theme=None):
+    """
+    Viser innslagene i tur og orden med switch_to.window. Skjulte faner oppdaterer seg selv
+    i bakgrunnen (HIDDEN_TAB_REFRESH_JS); fanen som vises refreshes av Python som vanlig.
+    Ved temabytte forhåndslastes hvert innslag i en bakgrunnsfane og byttes inn på sin tur.
+    Bytte, refresh, restart, temabytte og fornyelse av innlogging er oppgaver i planleggeren;
+    SIGUSR1 refresher fanen som vises, SIGHUP leser .env på nytt (THEME byttes i den kjørende nettleseren).
+    """
+    print(f"🔁 Rotasjon med {len(entries)} dashboards i samme nettleser.")
+    print_restart_policy()
+    state = {'driver': driver, 'theme': theme or get_current_theme(), 'index': 0, 'shown': None,
+             'restart_at': next_restart_at(RESTART_TIMES)}
+    sched = new_scheduler()
+
+    def show_next():
+        driver = state['driver']
+        entry = entries[state['index']]
+        if entry.get('preload'):
+            driver = _rotation_theme_swap(driver, entry, driver.current_window_handle)
+        driver.switch_to.window(entry['handle'])
+
+        # Fanen har lastet seg selv i bakgrunnen – sjekk at den er frisk før den blir stående
+        status = probe_dashboard(driver)
+        if not status['visible']:
+            current = driver
+            driver = recover_dashboard(driver, entry['url'],
+                                       f"{entry['mode']}/{entry['city']} ikke synlig: {status['reason']}",
+                                       start_tier="navigate")
+            if _rotation_recovered(driver, entry, current):
+                # Nettleseren ble startet på nytt – alle fanene må åpnes igjen, og samme innslag vises
+                state['driver'] = open_rotation_tabs(driver, entries)
+                return 0
+        state['driver'], state['shown'] = driver, entry
+        loaded_at = driver.execute_script("return performance.timeOrigin;") / 1000
+        schedule(sched, "refresh", refresh_visible, REFRESH_SECS - (time.time() - loaded_at))
+        state['index'] = (state['index'] + 1) % len(entries)
+        return entry['dwell']
+
+    def refresh_visible():
+        entry = state['shown']
+        print(f"🔄 Refresh av synlig fane {entry['mode']}/{entry['city']} …")
+        current = state['driver']
+        state['driver'] = refresh_dashboard(current, entry['url'])
+        if _rotation_recovered(state['driver'], entry, current):
+            state['driver'] = open_rotation_tabs(state['driver'], entries)
+            reschedule(sched, "rotate", 0)
+            return None
+        return REFRESH_SECS
+
+    def restart():
+        now = datetime.now()
+        if now < state['restart_at']:
+            return seconds_until(state['restart_at'])
+        restart_process(state['driver'], f"Daglig planlagt restart kl. {now:%H:%M}")
+
+    def reauth():
+        if not reauth_in_background(state['driver']):
+            return REAUTH_RETRY_SECS
+        return max(REAUTH_RETRY_SECS, reauth_due_in())
+
+    def switch_theme():
+        wanted = get_current_theme()
+        if wanted != state['theme']:
+            print(f"🎨 Temabytte {state['theme']} → {wanted}: forhåndslaster {len(entries)} faner i bakgrunnen …")
+            for e in entries:
+                if e.get('preload'):
+                    discard_preload(state['driver'], e['preload'])
+                e['preload'] = preload_in_background(state['driver'], dashboard_url(wanted, e['mode'], e['city']))
+                e['preload']['theme'] = wanted
+            state['theme'] = wanted
+        change = next_theme_change()
+        return seconds_until(change) if change else None
+
+    def on_error(name, exc):
+        # Fanene kan ha forsvunnet under oss: få nettleseren frisk, åpne alle fanene på nytt og vis innslaget igjen
+        entry = entries[state['index']] if name == "rotate" or state['shown'] is None else state['shown']
+        current = state['driver']
+        driver = recover_dashboard(current, entry['url'], f"Oppgaven '{name}' feilet: {exc}")
+        try:
+            if driver is current:
+                for handle in driver.window_handles:
+                    if handle != driver.current_window_handle:
+                        driver.switch_to.window(handle)
+                        driver.close()
+                driver.switch_to.window(driver.window_handles[0])
+            for e in entries:
+                # Forhåndslastede faner er lukket: åpne det nye temaet direkte
+                if e.get('preload'):
+                    e['url'], e['preload'] = e['preload']['url'], None
+            state['driver'] = open_rotation_tabs(driver, entries)
+        except Exception as e:
+            restart_process(driver, f"Rotasjonsfanene kunne ikke åpnes igjen: {e}")
+        reschedule(sched, "rotate", 0)
+        return None if name in ("rotate", "refresh") else TASK_RETRY_SECS
+
+    def on_signal(name):
+        if name == "SIGUSR1":
+            print("📶 SIGUSR1: refresh av fanen som vises nå.")
+            reschedule(sched, "refresh", 0)
+        elif name == "SIGHUP" and _reload_config(state['driver'], live=("THEME",)):
+            schedule(sched, "theme", switch_theme, 0)
+
+    schedule(sched, "rotate", show_next, 0)
+    schedule(sched, "theme", switch_theme, 0)
+    schedule(sched, "reauth", reauth, reauth_due_in())
+    if RESTART_TIMES:
+        schedule(sched, "restart", restart, seconds_until(state['restart_at']))
+    install_signal_handlers(sched)
+    print(f"📶 Signaler: kill -USR1 {os.getpid()} = refresh nå, kill -HUP {os.getpid()} = les .env på nytt.")
+
+    try:
+        run_scheduler(sched, on_signal, on_error)
+    except KeyboardInterrupt:
+        print("\n⛔ Avslutter på brukerkommando …")
+        try:
+            state['driver'].quit()
+        except Exception:
+            pass
+
+
+def main():
+    # Stopp før nettleseren startes hvis by/modus/tema er feilstavet (ellers ville vi vist alle byer)
+    require_valid(theme=os.getenv("THEME", "").lower().strip(), mode=DASHBOARD_MODE, city=CITY)
+
+    # Slå opp dashboard-URL basert på tema (tidsbasert), modus og by
+    theme = get_current_theme()
+    operations_url = dashboard_url(theme, DASHBOARD_MODE, CITY)
+    rotation = parse_rotation(ROTATION, theme) if ROTATION else []
+    try:
+        refresh_policies = parse_refresh_policy(REFRESH_POLICY)
+    except ValueError as e:
+        print(f"❌ {e} (.env)")
+        sys.exit(2)
+
+    print(f"🚀 Starter visning ({DRIVER_BACKEND}) …")
+    browser.import_selenium()
+    start_metrics_server()
+    for phase, seconds in ENV_TIMINGS.items():
+        metric_gauge("qs_startup_phase_seconds", seconds, phase=phase)
+    print(f"📊 Konfig: {theme.upper()} | {DASHBOARD_MODE.upper()} | {CITY.upper()}")
+    LAST_GOOD_STATE["enabled"] = True
+    driver, account, username, password = browser.setup_driver()
+    # Etter en restart: vis forrige økts siste gode bilde over startsiden og innloggingen
+    show_last_good(driver, rotation[0]['url'] if rotation else operations_url, "oppstart")
+
+    if not username or not password:
+        print("ℹ️  USERNAME/PASSWORD mangler – forsøker å bruke lagret profil direkte …")
+    else:
+        login_if_needed(driver, account, username, password, DEFAULT_URL)
+
+    if rotation:
+        driver = open_rotation_tabs(driver, rotation)
+        browser.mark_profile_healthy()
+        metric_gauge("qs_start_to_visible_seconds", round(time.time() - PROCESS_START, 2), profile=browser.PROFILE_STATE)
+        print(f"⏱️  Oppstart til synlige dashboards: {time.time() - PROCESS_START:.1f}s "
+              f"({browser.PROFILE_STATE} profil, PROFILE_MODE={PROFILE_MODE})")
+        keep_rotating(driver, rotation, theme)
+        return
+
+    # Hvis allerede innlogget, eller login gikk bra:
+    print("🌐 Åpner dashboardet …")
+    driver.get(operations_url)
+
+    # Skriv ut litt status
+    # (Vi venter ikke på spesifikk by i tittel siden den varierer basert på CITY)
+    try:
+        print("📄 Tittel:", driver.title)
+        print("🔗 URL:", driver.current_url)
+    except Exception:
+        pass
+
+    # Verifiser at dashboardet er synlig før vi starter refresh-loopen
+    print("🔍 Verifiserer at dashboardet er synlig …")
+    status = wait_for_dashboard_visible(driver, timeout=60, poll_interval=3)
+    if status['visible']:
+        print(f"✅ Dashboard bekreftet synlig: {status['reason']}")
+        browser.mark_profile_healthy()
+        metric_gauge("qs_start_to_visible_seconds", round(time.time() - PROCESS_START, 2), profile=browser.PROFILE_STATE)
+        print(f"⏱️  Oppstart til synlig dashboard: {time.time() - PROCESS_START:.1f}s "
+              f"({browser.PROFILE_STATE} profil, PROFILE_MODE={PROFILE_MODE})")
+    else:
+        print(f"⚠️  Dashboard ikke synlig: {status['reason']}")
+        print(f"    Checks: {status['checks']}")
+        driver = recover_dashboard(driver, operations_url,
+                                   f"Dashboard ikke synlig ved oppstart: {status['reason']}",
+                                   start_tier="navigate")
+
+    keep_open_and_reload(driver, operations_url, theme, policies=refresh_policies)
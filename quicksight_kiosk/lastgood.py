@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+Siste gode bilde: skjermbildet fra siste beståtte helsesjekk vises i fullskjerm, med "Oppdatert hh:mm", mens en
+reload, gjenoppretting eller restart med ny innlogging pågår. Det lagres ett bilde per dashboard-URL, så en fane
+aldri får et annet dashboards tall over seg (rotasjon, ny by eller nytt tema). Bildet ligger som overlegg over hver ny side i
+fanen (Page.addScriptToEvaluateOnNewDocument), så blank side, signin og Chrome-startsiden aldri syns, og
+fjernes når wait_for_dashboard_visible består.
+"""
+
+import os
+import json
+import time
+import base64
+import hashlib
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from .metrics import metric_incr, metric_observe
+
+# Tom LAST_GOOD_FILE slår funksjonen av. Hver dashboard-URL får sin egen fil: <navn>-<url-hash>.jpg
+LAST_GOOD_FILE = os.getenv("LAST_GOOD_FILE", str(Path.home() / ".qs-last-good.jpg"))
+# Nytt bilde tas høyst så ofte (sekunder); et eldre bilde enn LAST_GOOD_MAX_AGE_SECS vises ikke
+LAST_GOOD_EVERY_SECS = int(os.getenv("LAST_GOOD_EVERY_SECS", "300"))
+LAST_GOOD_MAX_AGE_SECS = int(os.getenv("LAST_GOOD_MAX_AGE_SECS", str(6 * 3600)))
+LAST_GOOD_QUALITY = 70
+# enabled: bare kiosken tar og viser bilder (ikke --extract/--bench). saved_at: url-nøkkel -> tid for siste bilde.
+# scripts: fane-handle -> (url-nøkkel, script-id) for overlegget.
+LAST_GOOD_STATE = {"enabled": False, "saved_at": {}, "scripts": {}, "shown_at": None}
+
+# pointer-events:none: innloggingen under overlegget kan fortsatt klikke og skrive i skjemaet
+LAST_GOOD_JS = """
+(() => {
+    const src = %s, badge = %s;
+    const show = () => {
+        if (document.getElementById('qs-last-good')) return;
+        const root = document.createElement('div');
+        root.id = 'qs-last-good';
+        root.style.cssText = 'position:fixed;inset:0;z-index:2147483647;pointer-events:none;'
+            + 'background:#000 center/100%% 100%% no-repeat url(' + JSON.stringify(src) + ')';
+        const tag = document.createElement('div');
+        tag.textContent = badge;
+        tag.style.cssText = 'position:absolute;right:16px;bottom:16px;padding:4px 12px;border-radius:12px;'
+            + 'font:14px sans-serif;color:#fff;background:rgba(0,0,0,.55)';
+        root.appendChild(tag);
+        (document.body || document.documentElement).appendChild(root);
+    };
+    if (document.documentElement) show(); else document.addEventListener('readystatechange', show, {once: true});
+})();
+"""
+HIDE_JS = "const el = document.getElementById('qs-last-good'); if (el) el.remove();"
+
+
+def _url_key(url):
+    """Dashboardet en URL viser: vert, sti og fragment (by-filteret), uten query-parametre QuickSight kan legge til."""
+    parts = urlsplit(url)
+    return hashlib.sha1(f"{parts.netloc}{parts.path}#{parts.fragment}".encode()).hexdigest()[:12]
+
+
+def last_good_file(url):
+    """Bildefilen for dashboardet url viser."""
+    path = Path(LAST_GOOD_FILE)
+    return str(path.with_name(f"{path.stem}-{_url_key(url)}{path.suffix}"))
+
+
+def capture_last_good(driver):
+    """
+    Lagre skjermbildet av fanen som vises (etter bestått helsesjekk) for URL-en fanen står på,
+    høyst hvert LAST_GOOD_EVERY_SECS per URL.
+    """
+    now = time.time()
+    if not LAST_GOOD_FILE or not LAST_GOOD_STATE["enabled"]:
+        return False
+    try:
+        url = driver.current_url
+        key = _url_key(url)
+        if now - LAST_GOOD_STATE["saved_at"].get(key, 0.0) < LAST_GOOD_EVERY_SECS:
+            return False
+        shot = driver.execute_cdp_cmd("Page.captureScreenshot", {"format": "jpeg", "quality": LAST_GOOD_QUALITY})
+        path = last_good_file(url)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(base64.b64decode(shot["data"]))
+        os.replace(tmp, path)
+    except Exception as e:
+        print(f"⚠️  Klarte ikke lagre siste gode bilde: {e}")
+        return False
+    LAST_GOOD_STATE["saved_at"][key] = now
+    metric_incr("qs_last_good_total", action="saved")
+    return True
+
+
+def _badge(saved_at):
+    when = datetime.fromtimestamp(saved_at)
+    fmt = "%H:%M" if when.date() == datetime.now().date() else "%d.%m %H:%M"
+    return f"Oppdatert {when.strftime(fmt)}"
+
+
+def show_last_good(driver, operations_url, reason=""):
+    """
+    Vis siste gode bilde av operations_url over fanen som vises, nå og på hver ny side i fanen, til hide_last_good().
+    Ingen effekt uten bilde av akkurat dette dashboardet, eller hvis bildet er eldre enn LAST_GOOD_MAX_AGE_SECS.
+    True hvis det vises.
+    """
+    if not LAST_GOOD_FILE or not LAST_GOOD_STATE["enabled"]:
+        return False
+    try:
+        handle = driver.current_window_handle
+        key = _url_key(operations_url)
+        shown = LAST_GOOD_STATE["scripts"].get(handle)
+        if shown is not None and shown[0] == key:
+            return True
+        if shown is not None:
+            # Fanen har fått et annet dashboard: det gamle bildet skal ikke ligge over det
+            del LAST_GOOD_STATE["scripts"][handle]
+            driver.execute_cdp_cmd("Page.removeScriptToEvaluateOnNewDocument", {"identifier": shown[1]})
+            driver.execute_script(HIDE_JS)
+        path = last_good_file(operations_url)
+        saved_at = os.path.getmtime(path)
+        if time.time() - saved_at > LAST_GOOD_MAX_AGE_SECS:
+            return False
+        with open(path, "rb") as f:
+            src = "data:image/jpeg;base64," + base64.b64encode(f.read()).decode()
+        source = LAST_GOOD_JS % (json.dumps(src), json.dumps(_badge(saved_at)))
+        result = driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": source})
+        LAST_GOOD_STATE["scripts"][handle] = (key, result.get("identifier"))
+        driver.execute_script(source)
+    except FileNotFoundError:
+        return False
+    except Exception as e:
+        print(f"⚠️  Klarte ikke vise siste gode bilde: {e}")
+        return False
+    if LAST_GOOD_STATE["shown_at"] is None:
+        LAST_GOOD_STATE["shown_at"] = time.time()
+    metric_incr("qs_last_good_total", action="shown")
+    suffix = f" under {reason}" if reason else ""
+    print(f"🖼️  Viser siste gode bilde ({_badge(saved_at).lower()}){suffix}.")
+    return True
+
+
+def hide_last_good(driver):
+    """Dashboardet er synlig igjen: fjern overlegget i fanen som vises og slutt å legge det på nye sider."""
+    scripts = LAST_GOOD_STATE["scripts"]
+    if not scripts and LAST_GOOD_STATE["shown_at"] is None:
+        return
+    try:
+        _, script_id = scripts.pop(driver.current_window_handle, (None, None))
+        if script_id:
+            driver.execute_cdp_cmd("Page.removeScriptToEvaluateOnNewDocument", {"identifier": script_id})
+        driver.execute_script(HIDE_JS)
+        # Faner som er lukket underveis (ny fane, ny nettleser i gjenopprettingen)
+        for handle in set(scripts) - set(driver.window_handles):
+            del scripts[handle]
+    except Exception:
+        pass
+    if not scripts and LAST_GOOD_STATE["shown_at"] is not None:
+        metric_observe("qs_last_good_shown_seconds", time.time() - LAST_GOOD_STATE["shown_at"])
+        LAST_GOOD_STATE["shown_at"] = None
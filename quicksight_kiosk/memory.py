@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""Minnevokter: måler Chrome-RSS og JS-heap etter hver refresh og eskalerer kun når grensene krysses."""
+
+from .config import MEMORY_SOFT_MB, MEMORY_HARD_MB, MEMORY_HEAP_SOFT_MB
+from .metrics import metric_incr, metric_event, metric_gauge, chrome_rss_mb
+from .recovery import recover_dashboard
+
+# Billige tiltak i rekkefølge; ett nytt trinn per refresh så lenge minnet ligger over myk grense
+MEMORY_MITIGATIONS = ("gc", "purge", "new_tab")
+MEMORY_STATE = {"level": 0, "last": None}
+
+
+def sample_memory(driver):
+    """Returner {'rss_mb', 'heap_mb'} for prosesstreet og JS-heapen i fanen som vises (None hvis ukjent)."""
+    heap_mb = None
+    try:
+        used = driver.execute_script("return performance.memory ? performance.memory.usedJSHeapSize : null;")
+        if used is None:
+            driver.execute_cdp_cmd("Performance.enable", {})
+            metrics = driver.execute_cdp_cmd("Performance.getMetrics", {}).get("metrics", [])
+            used = next((m["value"] for m in metrics if m["name"] == "JSHeapUsedSize"), None)
+        heap_mb = round(used / (1024 * 1024), 1) if used is not None else None
+    except Exception:
+        pass
+    return {"rss_mb": chrome_rss_mb(driver), "heap_mb": heap_mb}
+
+
+def _mitigate_memory(driver, operations_url, action):
+    if action == "gc":
+        driver.execute_cdp_cmd("HeapProfiler.collectGarbage", {})
+    elif action == "purge":
+        # Ber Chrome frigjøre minnecacher (bilder, fonter, dekodet data) som ved lite minne
+        driver.execute_cdp_cmd("Memory.simulatePressureNotification", {"level": "critical"})
+        driver.execute_cdp_cmd("HeapProfiler.collectGarbage", {})
+    elif action == "new_tab":
+        driver = recover_dashboard(driver, operations_url, "Minnevokter: ny fane", start_tier="new_tab")
+    return driver
+
+
+def govern_memory(driver, operations_url):
+    """
+    Kalles etter hver refresh. Måler minne og eskalerer kun når grensene krysses:
+    over MEMORY_SOFT_MB (eller JS-heap over MEMORY_HEAP_SOFT_MB) -> gc, så purge, så ny fane;
+    over MEMORY_HARD_MB -> ny nettleser i samme prosess (recover_dashboard "relaunch").
+    Returnerer driveren som skal brukes videre.
+    """
+    sample = sample_memory(driver)
+    MEMORY_STATE["last"] = sample
+    rss, heap = sample["rss_mb"], sample["heap_mb"]
+    metric_gauge("qs_chrome_rss_mb", rss)
+    metric_gauge("qs_js_heap_mb", heap)
+
+    if rss is not None and rss >= MEMORY_HARD_MB:
+        print(f"🧠 Minne {rss:.0f} MB over hard grense {MEMORY_HARD_MB} MB – starter nettleseren på nytt.")
+        metric_incr("qs_memory_action_total", action="relaunch")
+        MEMORY_STATE["level"] = 0
+        return recover_dashboard(driver, operations_url, "Minnevokter: hard grense", start_tier="relaunch")
+
+    over_soft = (rss is not None and rss >= MEMORY_SOFT_MB) or (heap is not None and heap >= MEMORY_HEAP_SOFT_MB)
+    if not over_soft:
+        MEMORY_STATE["level"] = 0
+        return driver
+
+    action = MEMORY_MITIGATIONS[min(MEMORY_STATE["level"], len(MEMORY_MITIGATIONS) - 1)]
+    MEMORY_STATE["level"] += 1
+    try:
+        driver = _mitigate_memory(driver, operations_url, action)
+    except Exception as e:
+        print(f"⚠️  Minnetiltak '{action}' feilet: {e}")
+    after = sample_memory(driver)
+    print(f"🧠 Minnetiltak '{action}': RSS {rss} → {after['rss_mb']} MB, JS-heap {heap} → {after['heap_mb']} MB")
+    metric_incr("qs_memory_action_total", action=action)
+    metric_event("qs_memory_action", action=action, before=sample, after=after)
+    if action == "new_tab":
+        # Ny fane er siste billige tiltak; neste gang over myk grense starter vi på gc igjen
+        MEMORY_STATE["level"] = 0
+    return driver
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""Strukturerte målinger: én JSON-linje per hendelse, og valgfritt Prometheus-tekst på localhost."""
+
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+from . import config  # noqa: F401  (laster .env før innstillingene under leses)
+
+METRICS_FILE = os.getenv("METRICS_FILE", str(Path.home() / "qs-metrics.jsonl"))
+METRICS_MAX_MB = int(os.getenv("METRICS_MAX_MB", "20"))
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+
+_metrics_lock = threading.Lock()
+_metrics_fh = None
+_metrics_writes = 0
+METRICS = {"counter": {}, "gauge": {}, "summary": {}}
+
+
+def _metrics_file():
+    """Åpner (og roterer ved behov) JSON-lines-filen. Sjekker størrelse hver 500. skriving."""
+    global _metrics_fh, _metrics_writes
+    _metrics_writes += 1
+    if _metrics_fh is not None and _metrics_writes % 500:
+        return _metrics_fh
+    try:
+        if os.path.getsize(METRICS_FILE) > METRICS_MAX_MB * 1024 * 1024:
+            if _metrics_fh is not None:
+                _metrics_fh.close()
+                _metrics_fh = None
+            os.replace(METRICS_FILE, METRICS_FILE + ".1")
+    except OSError:
+        pass
+    if _metrics_fh is None:
+        _metrics_fh = open(METRICS_FILE, "a", buffering=1, encoding="utf-8")
+    return _metrics_fh
+
+
+def metric_event(name, **fields):
+    """Skriv en fri hendelse (f.eks. restart med årsak) til JSON-lines-filen."""
+    if not METRICS_FILE:
+        return
+    record = {"ts": round(time.time(), 3), "name": name}
+    record.update(fields)
+    try:
+        with _metrics_lock:
+            _metrics_file().write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+    except Exception:
+        pass
+
+
+def _metric_key(name, labels):
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def metric_incr(name, n=1, **labels):
+    key = _metric_key(name, labels)
+    with _metrics_lock:
+        METRICS["counter"][key] = METRICS["counter"].get(key, 0) + n
+    metric_event(name, kind="counter", value=n, **labels)
+
+
+def metric_gauge(name, value, **labels):
+    if value is None:
+        return
+    with _metrics_lock:
+        METRICS["gauge"][_metric_key(name, labels)] = value
+    metric_event(name, kind="gauge", value=value, **labels)
+
+
+def metric_observe(name, seconds, **labels):
+    """Registrer en varighet (sekunder): count/sum/max per label-sett."""
+    key = _metric_key(name, labels)
+    with _metrics_lock:
+        s = METRICS["summary"].setdefault(key, {"count": 0, "sum": 0.0, "max": 0.0})
+        s["count"] += 1
+        s["sum"] += seconds
+        s["max"] = max(s["max"], seconds)
+    metric_event(name, kind="duration", value=round(seconds, 4), **labels)
+
+
+@contextmanager
+def metric_timer(name, **labels):
+    """with metric_timer("qs_phase_seconds", phase="login"): …  – labels kan endres underveis."""
+    t0 = time.time()
+    try:
+        yield labels
+    finally:
+        metric_observe(name, time.time() - t0, **labels)
+
+
+def _prom_labels(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{str(v).replace(chr(34), chr(39))}"' for k, v in items) + "}"
+
+
+def prometheus_text():
+    lines = []
+    with _metrics_lock:
+        for (name, labels), value in sorted(METRICS["counter"].items()):
+            lines.append(f"{name}{_prom_labels(labels)} {value}")
+        for (name, labels), value in sorted(METRICS["gauge"].items()):
+            lines.append(f"{name}{_prom_labels(labels)} {value}")
+        for (name, labels), s in sorted(METRICS["summary"].items()):
+            lines.append(f"{name}_count{_prom_labels(labels)} {s['count']}")
+            lines.append(f"{name}_sum{_prom_labels(labels)} {s['sum']:.4f}")
+            lines.append(f"{name}_max{_prom_labels(labels)} {s['max']:.4f}")
+    return "\n".join(lines) + "\n"
+
+
+def start_metrics_server(port=METRICS_PORT):
+    """Starter /metrics på 127.0.0.1:port i en bakgrunnstråd (port 0 = av)."""
+    if not port:
+        return None
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = prometheus_text().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    try:
+        server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    except OSError as e:
+        print(f"⚠️  Klarte ikke starte metrics-endepunkt på port {port}: {e}")
+        return None
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"📈 Prometheus-metrikker på http://127.0.0.1:{port}/metrics")
+    return server
+
+
+def process_tree_rss_mb(pid):
+    """Sum RSS (MB) for en prosess og alle etterkommere via /proc. None hvis ikke tilgjengelig (macOS)."""
+    total_kb = 0
+    stack, seen = [pid], set()
+    while stack:
+        p = stack.pop()
+        if p in seen:
+            continue
+        seen.add(p)
+        try:
+            with open(f"/proc/{p}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+                        break
+            for task in os.listdir(f"/proc/{p}/task"):
+                with open(f"/proc/{p}/task/{task}/children") as f:
+                    stack.extend(int(c) for c in f.read().split())
+        except (OSError, ValueError):
+            if p == pid:
+                return None
+    return round(total_kb / 1024, 1)
+
+
+def chrome_rss_mb(driver):
+    """RSS for driverprosessen (chromedriver, eller Playwrights node-driver) og alle Chrome-prosessene under den."""
+    try:
+        return process_tree_rss_mb(driver.service.process.pid)
+    except Exception:
+        return None
+
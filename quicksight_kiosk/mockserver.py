@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+Lokal stand-in for QuickSight til benchmarks: innloggingsside med samme felter som ekte signin
+(#account-name-input, awsui-inputs, Next/Sign in), og et dashboard med spinner, "Show me more"-dialog,
+refresh-knapp og N syntetiske visuals (KPI, tabell, graf) som rendres i puljer som i appen.
+"""
+
+import json
+import time
+import random
+import threading
+from urllib.parse import urlparse, parse_qs
+
+SESSION_COOKIE = "qs_mock_session"
+
+SIGNIN_HTML = """<!doctype html>
+<html><head><meta charset="utf-8"><title>Sign in</title>
+<style>
+  body { font-family: sans-serif; background: #f2f3f3; }
+  .step { display: none; margin: 120px auto; width: 360px; padding: 24px; background: #fff; }
+  .step.active { display: block; }
+  input { display: block; width: 100%%; margin: 12px 0; padding: 8px; }
+</style></head>
+<body>
+<div class="step active" id="step-account">
+  <label>Account name<input id="account-name-input" autocomplete="off"></label>
+  <button type="button" onclick="go('step-email')">Next</button>
+</div>
+<div class="step" id="step-email">
+  <label>Email<input id="username-input" type="email"></label>
+  <button type="button" onclick="go('step-password')">Next</button>
+</div>
+<div class="step" id="step-password">
+  <label>Password<input id="awsui-input-0" class="awsui-input-type-password" type="password"></label>
+  <button type="button" onclick="signIn()">Sign in</button>
+</div>
+<script>
+function go(id) {
+  document.querySelectorAll('.step').forEach(s => s.classList.remove('active'));
+  setTimeout(() => document.getElementById(id).classList.add('active'), %(step_ms)d);
+}
+function signIn() {
+  if (!document.getElementById('awsui-input-0').value) return;
+  document.cookie = '%(cookie)s=' + Date.now() + '; path=/';
+  setTimeout(() => { location.href = '/sn/start'; }, %(step_ms)d);
+}
+</script>
+</body></html>
+"""
+
+DASHBOARD_HTML = """<!doctype html>
+<html><head><meta charset="utf-8"><title>Mock dashboard</title>
+<style>
+  body { margin: 0; font-family: sans-serif; background: #1b1f27; color: #eee; }
+  .dashboard-root { display: flex; flex-wrap: wrap; gap: 4px; padding: 4px; }
+  .visual-container { width: 180px; height: 90px; overflow: hidden; padding: 4px; box-sizing: border-box; }
+  .visual-title { font-size: 11px; }
+  .kpi-value { font-size: 28px; font-weight: bold; }
+  table { font-size: 10px; border-collapse: collapse; }
+  #spinner { position: fixed; top: 45%%; left: 48%%; width: 40px; height: 40px; background: #888; }
+  #show-more { position: fixed; bottom: 20px; right: 20px; }
+  #refresh { position: fixed; top: 4px; right: 4px; }
+</style></head>
+<body>
+<div role="progressbar" id="spinner" class="loading-spinner"></div>
+<button id="refresh" data-automation-id="sheet-refresh" aria-label="Refresh">⟳</button>
+<div class="dashboard-root sheet-container" id="sheet"></div>
+<script>
+const N = %(visuals)d, BATCH = 25;
+const sheet = document.getElementById('sheet'), spinner = document.getElementById('spinner');
+
+function visualHtml(i, v) {
+  const kind = i %% 3;
+  const bg = 'hsl(' + (v * 37 %% 360) + ',45%%,35%%)';
+  let body;
+  if (kind === 0) {
+    body = "<div class='kpi-value'>" + v + "</div>";
+  } else if (kind === 1) {
+    body = "<table>" + [0, 1, 2].map(r =>
+      "<tr role='row'><td role='gridcell'>Rad " + r + "</td><td role='gridcell'>" + (v + r) + "</td></tr>").join('') +
+      "</table>";
+  } else {
+    body = "<svg class='chart-svg' width='160' height='50'><rect aria-label='Verdi " + v + "' x='0' y='" +
+      (50 - v %% 50) + "' width='40' height='" + (v %% 50) + "' fill='#ccc'></rect><text x='50' y='40'>" + v +
+      "</text></svg>";
+  }
+  const cls = kind === 0 ? 'visual-container kpi' : 'visual-container';
+  return "<div class='" + cls + "' data-automation-id='visual-" + i + "' style='background:" + bg + "'>" +
+    "<div class='visual-title'>Visual " + i + "</div>" + body + "</div>";
+}
+
+function render(values) {
+  // Rendres i puljer med en pause mellom, slik QuickSight fyller arket gradvis
+  sheet.innerHTML = '';
+  let i = 0;
+  (function batch() {
+    const html = [];
+    for (const end = Math.min(i + BATCH, N); i < end; i++) html.push(visualHtml(i, values[i]));
+    sheet.insertAdjacentHTML('beforeend', html.join(''));
+    if (i < N) setTimeout(batch, 10);
+    else spinner.style.display = 'none';
+  })();
+}
+
+function load() {
+  spinner.style.display = 'block';
+  fetch('/sn/api/visual-data?visuals=' + N).then(r => r.json()).then(d => render(d.values));
+}
+
+document.getElementById('refresh').addEventListener('click', load);
+setTimeout(() => {
+  const dlg = document.createElement('div');
+  dlg.id = 'show-more';
+  dlg.innerHTML = "<button onclick='this.parentNode.remove()'>Show me more</button>";
+  document.body.appendChild(dlg);
+}, %(dialog_ms)d);
+load();
+</script>
+</body></html>
+"""
+
+
+def _handler_class(latency_ms, step_ms, dialog_ms):
+    from http.server import BaseHTTPRequestHandler
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status, body=b"", content_type="text/html; charset=utf-8", headers=()):
+            self.send_response(status)
+            for key, value in headers:
+                self.send_header(key, value)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Cache-Control", "no-store")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _logged_in(self):
+            return f"{SESSION_COOKIE}=" in (self.headers.get("Cookie") or "")
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            if url.path == "/sn/auth/signin":
+                if self._logged_in():
+                    return self._send(302, headers=[("Location", "/sn/start")])
+                page = SIGNIN_HTML % {"cookie": SESSION_COOKIE, "step_ms": step_ms}
+                return self._send(200, page.encode())
+            if url.path == "/sn/start":
+                return self._send(200, b"<!doctype html><title>Start</title><p>QuickSight start</p>")
+            if "/dashboards/" in url.path:
+                if not self._logged_in():
+                    return self._send(302, headers=[("Location", "/sn/auth/signin")])
+                visuals = int(query.get("visuals", ["40"])[0])
+                page = DASHBOARD_HTML % {"visuals": visuals, "dialog_ms": dialog_ms}
+                return self._send(200, page.encode())
+            if url.path == "/sn/api/visual-data":
+                visuals = int(query.get("visuals", ["40"])[0])
+                # Serverkost: fast latens + litt per visual
+                time.sleep((latency_ms + visuals * 0.2) / 1000)
+                body = json.dumps({"values": [random.randint(0, 999) for _ in range(visuals)]}).encode()
+                return self._send(200, body, "application/json")
+            return self._send(404, b"")
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def start_mock_server(port=0, latency_ms=150, step_ms=50, dialog_ms=300):
+    """
+    Starter mock-serveren på 127.0.0.1 i en bakgrunnstråd (port 0 = ledig port).
+    latency_ms: svartid for datakallet, step_ms: forsinkelse mellom innloggingstrinn,
+    dialog_ms: når "Show me more" dukker opp etter lasting.
+    Returnerer (server, base-URL).
+    """
+    from http.server import ThreadingHTTPServer
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), _handler_class(latency_ms, step_ms, dialog_ms))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def signin_url(base):
+    return f"{base}/sn/auth/signin"
+
+
+def mock_dashboard_url(base, visuals):
+    return f"{base}/sn/account/ryde-tech/dashboards/mock/sheets/mock_sheet?visuals={visuals}#p.City=bergen"
@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+"""Nettverksfilter og cookie-deling via CDP."""
+
+import os
+import json
+import functools
+import itertools
+import threading
+from fnmatch import fnmatchcase
+from pathlib import Path
+
+from .config import split_candidates
+from .metrics import metric_gauge
+
+# Blokkerer telemetri, analytics, fonter og hjelpeinnhold kiosken aldri trenger.
+# Mønstre bruker * som jokertegn og matcher hele URL-en. Allowlist sjekkes per request før blokkmønstrene:
+# en request som matcher et blokkmønster holdes igjen (CDP Fetch) og slippes gjennom hvis URL-en er på allowlist.
+NETWORK_BLOCKING = os.getenv("NETWORK_BLOCKING", "block").lower()  # block | measure | off
+DEFAULT_BLOCKLIST = [
+    "*panorama*",
+    "*analytics.console.aws.a2z.com*",
+    "*client-telemetry*",
+    "*clientlog*",
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*fonts.googleapis.com*",
+    "*fonts.gstatic.com*",
+    "*docs.aws.amazon.com*",
+    "*/help/*",
+    "*whats-new*",
+]
+DEFAULT_ALLOWLIST = [
+    "*quicksight.aws.amazon.com/sn/api/*",
+    "*quicksight.aws.amazon.com/sn/dashboards/*",
+    "*signin.aws.amazon.com*",
+]
+NETWORK_BLOCKLIST = split_candidates(os.getenv("NETWORK_BLOCKLIST", ",".join(DEFAULT_BLOCKLIST))) + \
+    split_candidates(os.getenv("NETWORK_BLOCK_EXTRA", ""))
+NETWORK_ALLOWLIST = split_candidates(os.getenv("NETWORK_ALLOWLIST", ",".join(DEFAULT_ALLOWLIST)))
+# Snittstørrelse per blokkmønster, målt med NETWORK_BLOCKING=measure, gir anslått spart KB i block-modus
+NETWORK_SIZES_FILE = os.getenv("NETWORK_SIZES_FILE", str(Path.home() / ".qs-blocked-sizes.json"))
+# debuggerAddress -> {'blocked': {mønster: antall}, 'allowed'}: ett filter (én tråd) per nettleser
+REQUEST_FILTERS = {}
+
+
+def url_allowed(url):
+    return any(fnmatchcase(url, pattern) for pattern in NETWORK_ALLOWLIST)
+
+
+def block_pattern(url):
+    """Blokkmønsteret som stopper url, eller None (ingen treff, eller URL-en er på allowlist)."""
+    if url_allowed(url):
+        return None
+    return next((pattern for pattern in NETWORK_BLOCKLIST if fnmatchcase(url, pattern)), None)
+
+
+def globs_overlap(a, b):
+    """True hvis en URL kan matche begge *-mønstrene (ikke-tomt snitt)."""
+    @functools.lru_cache(maxsize=None)
+    def overlap(i, j):
+        if i == len(a) and j == len(b):
+            return True
+        if i < len(a) and a[i] == "*":
+            return overlap(i + 1, j) or (j < len(b) and overlap(i, j + 1))
+        if j < len(b) and b[j] == "*":
+            return overlap(i, j + 1) or (i < len(a) and overlap(i + 1, j))
+        return i < len(a) and j < len(b) and a[i] == b[j] and overlap(i + 1, j + 1)
+    return overlap(0, 0)
+
+
+def safe_blocklist():
+    """Blokkmønstre som ikke kan treffe noen URL på allowlist (for Network.setBlockedURLs uten Fetch-filteret)."""
+    kept = [p for p in NETWORK_BLOCKLIST if not any(globs_overlap(a, p) for a in NETWORK_ALLOWLIST)]
+    if len(kept) < len(NETWORK_BLOCKLIST):
+        print(f"⚠️  {len(NETWORK_BLOCKLIST) - len(kept)} av {len(NETWORK_BLOCKLIST)} blokkmønstre kan treffe "
+              f"allowlist og brukes ikke uten Fetch-filteret")
+    return kept
+
+
+def _debugger_address(driver):
+    """host:port for nettleserens DevTools (chromedriver og Playwright-motoren oppgir den likt)."""
+    return (getattr(driver, "capabilities", None) or {}).get("goog:chromeOptions", {}).get("debuggerAddress")
+
+
+def _filter_loop(ws, state):
+    """
+    Kjører i egen tråd på nettleserens DevTools-websocket. Target.setAutoAttach kobler til hver fane (også nye
+    faner, forhåndslasting og faner som laster seg selv) før første request, og Fetch holder bare igjen requests
+    som matcher et blokkmønster. Lukkes forbindelsen, slipper Chrome alle tilbakeholdte requests.
+    """
+    ids = itertools.count(1)
+
+    def send(method, params=None, session=None):
+        msg = {"id": next(ids), "method": method, "params": params or {}}
+        if session:
+            msg["sessionId"] = session
+        ws.send(json.dumps(msg))
+
+    patterns = [{"urlPattern": pattern} for pattern in NETWORK_BLOCKLIST]
+    send("Target.setAutoAttach", {"autoAttach": True, "waitForDebuggerOnStart": True, "flatten": True})
+    while True:
+        msg = json.loads(ws.recv())
+        method, params, session = msg.get("method"), msg.get("params", {}), msg.get("sessionId")
+        if method == "Target.attachedToTarget":
+            child = params["sessionId"]
+            if params["targetInfo"]["type"] == "page":
+                send("Fetch.enable", {"patterns": patterns}, child)
+            if params.get("waitingForDebugger"):
+                send("Runtime.runIfWaitingForDebugger", session=child)
+        elif method == "Fetch.requestPaused":
+            pattern = block_pattern(params["request"]["url"])
+            if pattern is None:
+                state["allowed"] += 1
+                send("Fetch.continueRequest", {"requestId": params["requestId"]}, session)
+            else:
+                state["blocked"][pattern] = state["blocked"].get(pattern, 0) + 1
+                send("Fetch.failRequest", {"requestId": params["requestId"], "errorReason": "BlockedByClient"}, session)
+
+
+def _start_filter(address):
+    import websocket
+    from urllib.request import urlopen
+    with urlopen(f"http://{address}/json/version", timeout=5) as resp:
+        ws_url = json.load(resp)["webSocketDebuggerUrl"]
+    # Uten Origin-header: Chrome avviser ellers websocketen uten --remote-allow-origins
+    ws = websocket.create_connection(ws_url, timeout=None, suppress_origin=True)
+    state = REQUEST_FILTERS[address] = {"blocked": {}, "allowed": 0}
+
+    def run():
+        try:
+            _filter_loop(ws, state)
+        except Exception:
+            pass  # Nettleseren er lukket
+        finally:
+            REQUEST_FILTERS.pop(address, None)
+
+    threading.Thread(target=run, name=f"qs-request-filter-{address}", daemon=True).start()
+
+
+def apply_request_filter(driver):
+    """
+    Slå på filteret i nettleseren. Trygt å kalle for hver ny fane: filteret kobler seg selv til alle faner.
+    Uten DevTools-adresse brukes Network.setBlockedURLs i fanen som er aktiv, bare med mønstre som ikke kan
+    treffe allowlist.
+    """
+    if NETWORK_BLOCKING != "block" or not NETWORK_BLOCKLIST:
+        return
+    address = _debugger_address(driver)
+    try:
+        if address and address not in REQUEST_FILTERS:
+            _start_filter(address)
+        if address:
+            return
+    except Exception as e:
+        print(f"⚠️  Klarte ikke starte nettverksfilteret på {address}: {e} – bruker setBlockedURLs")
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": safe_blocklist()})
+    except Exception as e:
+        print(f"⚠️  Klarte ikke aktivere nettverksfilter: {e}")
+
+
+def _load_sizes():
+    try:
+        with open(NETWORK_SIZES_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_sizes(measured):
+    """Legg målte (antall, bytes) per blokkmønster til i NETWORK_SIZES_FILE."""
+    sizes = _load_sizes()
+    for pattern, (count, size) in measured.items():
+        old_count, old_size = sizes.get(pattern, (0, 0))
+        sizes[pattern] = (old_count + count, old_size + size)
+    try:
+        tmp = f"{NETWORK_SIZES_FILE}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(sizes, f)
+        os.replace(tmp, NETWORK_SIZES_FILE)
+    except OSError:
+        pass
+
+
+def estimate_blocked_bytes(blocked, sizes):
+    """Anslått spart bytes for {mønster: antall blokkert}, fra snittstørrelser målt i measure-modus (eller None)."""
+    known = [(n, sizes[p]) for p, n in blocked.items() if sizes.get(p) and sizes[p][0]]
+    if not known:
+        return None
+    return int(sum(n * size / count for n, (count, size) in known))
+
+
+def network_budget(driver):
+    """
+    Oppsummer nettverk siden forrige kall fra performance-loggen:
+    requests/bytes lastet, og requests blokkert (block) eller som ville blitt blokkert (measure), med bytes.
+    I block-modus er bytes et anslag: requesten ble aldri sendt, så størrelsen er snittet målt i measure-modus.
+    """
+    urls, sizes, failed = {}, {}, set()
+    try:
+        entries = driver.get_log("performance")
+    except Exception:
+        return None
+    for entry in entries:
+        try:
+            msg = json.loads(entry["message"])["message"]
+        except Exception:
+            continue
+        method, params = msg.get("method"), msg.get("params", {})
+        if method == "Network.requestWillBeSent":
+            urls[params["requestId"]] = params["request"]["url"]
+        elif method == "Network.loadingFinished":
+            sizes[params["requestId"]] = params.get("encodedDataLength", 0)
+        elif method == "Network.loadingFailed" and params.get("blockedReason"):
+            failed.add(params["requestId"])
+
+    budget = {"requests": len(sizes), "bytes": sum(sizes.values())}
+    if NETWORK_BLOCKING == "measure":
+        measured = {}
+        for rid, url in urls.items():
+            pattern = block_pattern(url)
+            if pattern is not None:
+                count, size = measured.get(pattern, (0, 0))
+                measured[pattern] = (count + 1, size + sizes.get(rid, 0))
+        if measured:
+            _save_sizes(measured)
+        budget["blocked_requests"] = sum(count for count, _ in measured.values())
+        budget["blocked_bytes"] = sum(size for _, size in measured.values())
+        return budget
+
+    state = REQUEST_FILTERS.get(_debugger_address(driver)) or {"blocked": {}}
+    # Tellerne nullstilles ved lesing; filtertråden skriver bare til sin egen ordbok
+    blocked, state["blocked"] = state["blocked"], {}
+    budget["blocked_requests"] = sum(blocked.values()) + len(failed)
+    budget["blocked_bytes"] = estimate_blocked_bytes(blocked, _load_sizes())
+    return budget
+
+
+def report_network_budget(driver):
+    if NETWORK_BLOCKING == "off":
+        return
+    budget = network_budget(driver)
+    if not budget:
+        return
+    if NETWORK_BLOCKING == "measure":
+        verb, saved = "ville blokkert", f", {budget['blocked_bytes'] / 1024:.0f} KB"
+    elif budget["blocked_bytes"] is None:
+        verb, saved = "blokkert", ", spart KB ukjent (mål én gang med NETWORK_BLOCKING=measure)"
+    else:
+        verb, saved = "blokkert", f", ca. {budget['blocked_bytes'] / 1024:.0f} KB spart"
+    print(f"  🌐 {budget['requests']} requests / {budget['bytes'] / 1024:.0f} KB lastet, "
+          f"{budget['blocked_requests']} {verb}{saved}")
+    for key, value in budget.items():
+        metric_gauge(f"qs_refresh_network_{key}", value, mode=NETWORK_BLOCKING)
+
+
+# Felter Network.setCookies godtar (getAllCookies returnerer flere)
+COOKIE_PARAM_KEYS = ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite", "expires")
+
+
+def export_cookies(driver):
+    """Alle cookies i nettleseren (alle domener, også signin) via CDP."""
+    cookies = driver.execute_cdp_cmd("Network.getAllCookies", {}).get("cookies", [])
+    out = []
+    for c in cookies:
+        param = {k: c[k] for k in COOKIE_PARAM_KEYS if k in c}
+        if c.get("session") or param.get("expires", -1) < 0:
+            param.pop("expires", None)
+        out.append(param)
+    return out
+
+
+def import_cookies(driver, cookies):
+    """Sett cookies fra en annen nettleser før første navigasjon."""
+    driver.execute_cdp_cmd("Network.setCookies", {"cookies": cookies})
+
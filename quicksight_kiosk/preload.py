@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""Temabytte uten blank skjerm: nytt tema lastes i en bakgrunnsfane (CDP) og byttes inn når det er klart."""
+
+import time
+
+from .config import THEME_PRELOAD_SETTLE
+from .dialogs import dismiss_dialogs
+from .health import check_dashboard_visible, wait_for_dashboard_visible
+from .network import apply_request_filter
+from .recovery import recover_dashboard
+
+
+def _target_id(handle):
+    # Eldre chromedriver-versjoner prefikser handle med "CDwindow-"
+    return handle[len("CDwindow-"):] if handle.startswith("CDwindow-") else handle
+
+
+def preload_in_background(driver, url):
+    """
+    Åpner url i en ny fane via CDP Target.createTarget uten å aktivere den,
+    slik at veggen fortsatt viser dashboardet som er fremme mens den nye fanen laster.
+    """
+    target_id = driver.execute_cdp_cmd("Target.createTarget", {"url": url, "background": True})["targetId"]
+    handle = next((h for h in driver.window_handles if _target_id(h) == target_id), target_id)
+    return {'handle': handle, 'url': url, 'started': time.time(), 'ready_at': None, 'next_try': 0.0}
+
+
+def preload_ready(driver, preload):
+    """True når bakgrunnsfanen har forlatt signin, står på dashboardet og har fått THEME_PRELOAD_SETTLE sekunder."""
+    info = driver.execute_cdp_cmd("Target.getTargetInfo", {"targetId": _target_id(preload['handle'])})
+    url = info.get('targetInfo', {}).get('url', '').lower()
+    if 'signin' in url or '/dashboards/' not in url:
+        preload['ready_at'] = None
+        return False
+    if preload['ready_at'] is None:
+        preload['ready_at'] = time.time()
+    return time.time() >= max(preload['ready_at'] + THEME_PRELOAD_SETTLE, preload['next_try'])
+
+
+def swap_to_preloaded(driver, back_handle, preload, close_handle=None):
+    """
+    Bytter til den forhåndslastede fanen og kjører helseproben med en gang.
+    Er den ikke klar, byttes det straks tilbake til back_handle og nytt forsøk gjøres senere.
+    Ved suksess lukkes close_handle (standard back_handle) via CDP, uten å aktivere den.
+    """
+    driver.switch_to.window(preload['handle'])
+    status = check_dashboard_visible(driver)
+    if not status['visible']:
+        driver.switch_to.window(back_handle)
+        preload['next_try'] = time.time() + 10
+        print(f"  ⏳ Forhåndslastet fane ikke klar ennå: {status['reason']}")
+        return False
+
+    apply_request_filter(driver)
+    # Fanen ble åpnet via CDP uten dialoglukker: installeres her og tar dialoger som allerede vises
+    dismiss_dialogs(driver)
+    discard_preload(driver, {'handle': close_handle or back_handle})
+    return True
+
+
+def discard_preload(driver, preload):
+    try:
+        driver.execute_cdp_cmd("Target.closeTarget", {"targetId": _target_id(preload['handle'])})
+    except Exception:
+        pass
+
+
+def _navigate_theme(driver, url):
+    """Fallback når forhåndslasting ikke ble klar: naviger synlig fane direkte."""
+    driver.get(url)
+    status = wait_for_dashboard_visible(driver, timeout=60, poll_interval=2)
+    if not status['visible']:
+        driver = recover_dashboard(driver, url, f"Temabytte feilet: {status['reason']}", start_tier="navigate")
+    return driver
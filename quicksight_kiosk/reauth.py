@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Fornyer innloggingen før QuickSight-sesjonen utløper. Innloggingen (login_if_needed) kjøres i en skjult,
+kortlevd headless nettleser med egen profil; bare de nye cookiene byttes inn i kiosk-nettleseren,
+så fanen som vises aldri havner på signin.
+"""
+
+import os
+import json
+import time
+import shutil
+import tempfile
+from pathlib import Path
+
+from . import browser
+from .auth import credentials, login_if_needed
+from .config import DEFAULT_URL
+from .metrics import metric_incr, metric_observe
+from .network import export_cookies, import_cookies
+from .session import SESSION_STATE, SESSION_MAX_AGE_SECS, load_session
+
+# Forny så mange sekunder før forventet utløp
+REAUTH_MARGIN_SECS = int(os.getenv("REAUTH_MARGIN_SECS", "900"))
+REAUTH_RETRY_SECS = int(os.getenv("REAUTH_RETRY_SECS", "300"))
+# Observerte sesjonslengder (sekunder fra innlogging til signin), de siste SESSION_LIFETIME_SAMPLES
+SESSION_LIFETIME_FILE = Path(os.getenv("SESSION_LIFETIME_FILE", str(Path.home() / ".qs-session-lifetime.json")))
+SESSION_LIFETIME_SAMPLES = 5
+
+
+def _observed_lifetimes():
+    try:
+        with open(SESSION_LIFETIME_FILE) as f:
+            return [float(s) for s in json.load(f)]
+    except Exception:
+        return []
+
+
+def session_lifetime():
+    """Forventet sesjonslengde: korteste observerte utløp, ellers SESSION_MAX_AGE_SECS."""
+    return min(_observed_lifetimes() + [SESSION_MAX_AGE_SECS])
+
+
+def session_age():
+    at = SESSION_STATE.get("authenticated_at")
+    return None if at is None else time.time() - at
+
+
+def reauth_due_in():
+    """Sekunder til innloggingen bør fornyes (0 = nå)."""
+    age = session_age()
+    if age is None:
+        return max(0.0, session_lifetime() - REAUTH_MARGIN_SECS)
+    return max(0.0, session_lifetime() - REAUTH_MARGIN_SECS - age)
+
+
+def note_session_expired():
+    """Fanen havnet på signin: registrer hvor lenge sesjonen faktisk varte."""
+    age = session_age()
+    metric_incr("qs_session_expired_total")
+    if age is None or age < 60:
+        return
+    samples = (_observed_lifetimes() + [round(age)])[-SESSION_LIFETIME_SAMPLES:]
+    try:
+        with open(SESSION_LIFETIME_FILE, "w") as f:
+            json.dump(samples, f)
+    except Exception:
+        pass
+    print(f"🔑 Sesjonen utløp etter {age / 3600:.1f}t – fornyer {REAUTH_MARGIN_SECS // 60} min før "
+          f"{session_lifetime() / 3600:.1f}t fra nå av.")
+
+
+def reauth_in_background(driver):
+    """
+    Forny innloggingen uten å røre fanen som vises. Bruker først en ferskere delt sesjon fra en annen
+    prosess; ellers logges det inn i en skjult headless nettleser. Cookiene settes inn i driver.
+    Returnerer True ved suksess.
+    """
+    t0 = time.time()
+    shared = load_session()
+    authenticated_at = SESSION_STATE.get("authenticated_at") or 0
+    if shared and shared["saved_at"] > authenticated_at + 60:
+        import_cookies(driver, shared["cookies"])
+        SESSION_STATE["authenticated_at"] = shared["saved_at"]
+        metric_incr("qs_reauth_total", method="shared", result="ok")
+        print(f"🔑 Byttet inn ferskere delt sesjon ({(time.time() - shared['saved_at']) / 60:.0f} min gammel).")
+        return True
+
+    account, username, password = credentials()
+    if not username or not password:
+        print("ℹ️  USERNAME/PASSWORD mangler – kan ikke fornye innloggingen i bakgrunnen.")
+        metric_incr("qs_reauth_total", method="hidden", result="no_credentials")
+        return False
+
+    print("🔑 Fornyer innloggingen i en skjult nettleser …")
+    profile_dir = tempfile.mkdtemp(prefix="qschrome-reauth-")
+    hidden = None
+    ok = False
+    try:
+        hidden, _, _, _ = browser.setup_driver(headless=True, profile_dir=profile_dir, session=False)
+        if login_if_needed(hidden, account, username, password, DEFAULT_URL, use_session=False):
+            cookies = export_cookies(hidden)
+            import_cookies(driver, cookies)
+            SESSION_STATE["authenticated_at"] = time.time()
+            ok = True
+            print(f"✅ Innlogging fornyet, {len(cookies)} cookies byttet inn ({time.time() - t0:.1f}s).")
+    except Exception as e:
+        print(f"⚠️  Fornyelse av innlogging feilet: {e}")
+    finally:
+        if hidden is not None:
+            try:
+                hidden.quit()
+            except Exception:
+                pass
+        shutil.rmtree(profile_dir, ignore_errors=True)
+    metric_incr("qs_reauth_total", method="hidden", result="ok" if ok else "failed")
+    metric_observe("qs_reauth_seconds", time.time() - t0, result="ok" if ok else "failed")
+    return ok
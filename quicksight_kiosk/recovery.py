@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""Gjenoppretting i samme prosess (billigste tiltak først) og restart av prosessen som siste utvei."""
+
+import os
+import sys
+import time
+
+from . import browser
+from .auth import login_if_needed
+from .config import DEFAULT_URL
+from .env import PROCESS_START, relaunch_argv
+from .dialogs import install_dialog_dismisser
+from .health import wait_for_dashboard_visible
+from .lastgood import show_last_good
+from .metrics import metric_incr, metric_event, metric_observe, chrome_rss_mb
+from .network import apply_request_filter
+from .reauth import note_session_expired, reauth_in_background
+from .waits import reload_and_wait
+
+
+def restart_process(driver=None, reason="Unknown"):
+    """Restarter prosessen. Lukker driver først hvis gitt."""
+    print(f"\n🔄 Restarter prosessen: {reason}")
+    metric_incr("qs_restarts_total")
+    metric_event("qs_restart", reason=reason, uptime_s=round(time.time() - PROCESS_START, 1),
+                 chrome_rss_mb=chrome_rss_mb(driver) if driver else None)
+    if driver:
+        try:
+            driver.quit()
+        except Exception:
+            pass
+    time.sleep(2)  # Kort pause før restart
+    os.execv(sys.executable, relaunch_argv(sys.executable))
+
+
+# Hvert trinn har egen timeout (sekunder) for wait_for_dashboard_visible.
+RECOVERY_TIERS = ("reload", "navigate", "new_tab", "relaunch")
+RECOVERY_TIMEOUTS = {
+    "reload": int(os.getenv("RECOVERY_RELOAD_TIMEOUT", "30")),
+    "navigate": int(os.getenv("RECOVERY_NAVIGATE_TIMEOUT", "45")),
+    "new_tab": int(os.getenv("RECOVERY_NEW_TAB_TIMEOUT", "45")),
+    "relaunch": int(os.getenv("RECOVERY_RELAUNCH_TIMEOUT", "90")),
+}
+# Per trinn: antall forsøk, antall vellykkede og total tid brukt på vellykkede forsøk
+RECOVERY_STATS = {tier: {"attempts": 0, "successes": 0, "seconds": 0.0} for tier in RECOVERY_TIERS}
+
+
+def _recover_reload(driver, operations_url):
+    reload_and_wait(driver)
+    return driver
+
+
+def _recover_navigate(driver, operations_url):
+    driver.get(operations_url)
+    return driver
+
+
+def _recover_new_tab(driver, operations_url):
+    # Samme nettleser og cookies, men en ny renderer-kontekst for siden
+    old_handle = driver.current_window_handle
+    driver.switch_to.new_window("tab")
+    new_handle = driver.current_window_handle
+    apply_request_filter(driver)
+    install_dialog_dismisser(driver)
+    show_last_good(driver, operations_url, "gjenoppretting")
+    driver.get(operations_url)
+    try:
+        driver.switch_to.window(old_handle)
+        driver.close()
+    except Exception:
+        pass
+    driver.switch_to.window(new_handle)
+    return driver
+
+
+def _recover_relaunch(driver, operations_url):
+    try:
+        driver.quit()
+    except Exception:
+        pass
+    driver, account, username, password = browser.setup_driver()
+    show_last_good(driver, operations_url, "gjenoppretting")
+    if username and password:
+        login_if_needed(driver, account, username, password, DEFAULT_URL)
+    driver.get(operations_url)
+    return driver
+
+
+RECOVERY_ACTIONS = {
+    "reload": _recover_reload,
+    "navigate": _recover_navigate,
+    "new_tab": _recover_new_tab,
+    "relaunch": _recover_relaunch,
+}
+
+
+def recover_dashboard(driver, operations_url, reason, start_tier="reload"):
+    """
+    Prøver å få dashboardet synlig igjen uten å restarte prosessen.
+    Trinn: reload -> navigate -> new_tab -> relaunch, og restart_process() hvis alt feiler.
+
+    Returnerer driveren som skal brukes videre (kan være en ny instans etter "relaunch").
+    """
+    print(f"🩹 Gjenoppretter dashboard: {reason}")
+    show_last_good(driver, operations_url, "gjenoppretting")
+    try:
+        on_signin = "signin" in driver.current_url.lower()
+    except Exception:
+        on_signin = False
+    if on_signin:
+        # Sesjonen utløp før den ble fornyet: logg inn i bakgrunnen og naviger med nye cookies
+        note_session_expired()
+        if reauth_in_background(driver) and start_tier == "reload":
+            start_tier = "navigate"
+    tiers = RECOVERY_TIERS[RECOVERY_TIERS.index(start_tier):]
+
+    for tier in tiers:
+        stats = RECOVERY_STATS[tier]
+        stats["attempts"] += 1
+        t0 = time.time()
+        print(f"  ↻ Trinn '{tier}' (timeout {RECOVERY_TIMEOUTS[tier]}s) …")
+        try:
+            driver = RECOVERY_ACTIONS[tier](driver, operations_url)
+            status = wait_for_dashboard_visible(driver, timeout=RECOVERY_TIMEOUTS[tier], poll_interval=2)
+        except Exception as e:
+            status = {'visible': False, 'reason': f"{type(e).__name__}: {e}", 'checks': {}}
+
+        elapsed = time.time() - t0
+        result = "ok" if status['visible'] else "failed"
+        metric_incr("qs_recovery_total", tier=tier, result=result)
+        metric_observe("qs_recovery_seconds", elapsed, tier=tier, result=result)
+        if status['visible']:
+            stats["successes"] += 1
+            stats["seconds"] += elapsed
+            browser.mark_profile_healthy()
+            print(f"✅ Gjenopprettet med '{tier}' på {elapsed:.1f}s "
+                  f"({stats['successes']}/{stats['attempts']} vellykket for dette trinnet)")
+            return driver
+
+        print(f"  ✗ '{tier}' feilet etter {elapsed:.1f}s: {status['reason']}")
+
+    summary = ", ".join(f"{t}={s['successes']}/{s['attempts']}" for t, s in RECOVERY_STATS.items())
+    print(f"⚠️  Alle gjenopprettingstrinn feilet ({summary})")
+    restart_process(driver, f"Gjenoppretting feilet: {reason}")
+
+
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""Refresh av fanen som vises: data-refresh i appen, full reload som fallback, helsesjekk etterpå."""
+
+import os
+import time
+
+from .health import wait_for_dashboard_visible
+from .lastgood import show_last_good
+from .memory import govern_memory
+from .metrics import metric_incr, metric_observe
+from .network import report_network_budget
+from .recovery import recover_dashboard
+from .staleness import check_staleness
+from .waits import reload_and_wait
+
+# "data" = oppdater kun data i den kjørende appen (full reload kun som fallback), "reload" = location.reload()
+REFRESH_STRATEGY = os.getenv("REFRESH_STRATEGY", "data").lower()
+# Hvor lenge vi venter på at data-refreshen faktisk henter nye data (ms)
+DATA_REFRESH_TIMEOUT_MS = int(os.getenv("DATA_REFRESH_TIMEOUT_MS", "8000"))
+# Kandidater for QuickSights egen refresh-knapp
+REFRESH_CONTROL_SELECTORS = [
+    "[data-automation-id*='refresh' i]",
+    "button[aria-label*='refresh' i]",
+    "button[title*='refresh' i]",
+]
+
+# Trigger en data-refresh uten å laste siden på nytt og vent til appen faktisk henter data (fetch/XHR).
+# 1) QuickSights egen refresh-knapp hvis den finnes, ellers 2) bruk #p.City= på nytt via hashchange.
+# fetch og XMLHttpRequest telles i siden (én gang per dokument): løpenummer per kall og kallene som pågår.
+DATA_REFRESH_JS = """
+const [controlSels, timeoutMs] = arguments;
+const done = arguments[arguments.length - 1];
+if (!window.__qsNet) {
+    const net = window.__qsNet = {seq: 0, pending: new Set(), last: 0};
+    const start = () => { const id = ++net.seq; net.pending.add(id); net.last = Date.now(); return id; };
+    const end = id => { net.pending.delete(id); net.last = Date.now(); };
+    const fetch = window.fetch;
+    window.fetch = function () {
+        const id = start();
+        try { return fetch.apply(this, arguments).finally(() => end(id)); } catch (e) { end(id); throw e; }
+    };
+    const send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        const id = start();
+        this.addEventListener('loadend', () => end(id), {once: true});
+        try { return send.apply(this, arguments); } catch (e) { end(id); throw e; }
+    };
+}
+const net = window.__qsNet;
+const before = net.seq;
+let method = null, finished = false;
+function finish() {
+    if (finished) return;
+    finished = true;
+    done({method: method, requests: net.seq - before});
+}
+for (const sel of controlSels) {
+    let el = null;
+    try { el = document.querySelector(sel); } catch (e) {}
+    if (el && !el.disabled && el.getBoundingClientRect().width > 0) { el.click(); method = 'control'; break; }
+}
+if (!method && location.hash) {
+    const hash = location.hash;
+    history.replaceState(null, '', location.pathname + location.search);
+    location.hash = hash;
+    method = 'hash';
+}
+if (!method) { finish(); return; }
+// Ferdig når refreshen har startet minst ett datakall, ingen av dem pågår lenger og siste kall
+// ble ferdig for over 500 ms siden (stille), eller ved timeout
+const started = Date.now();
+const timer = setInterval(() => {
+    const busy = Array.from(net.pending).some(id => id > before);
+    if (net.seq > before && !busy && Date.now() - net.last > 500) { clearInterval(timer); finish(); }
+    if (Date.now() - started > timeoutMs) { clearInterval(timer); finish(); }
+}, 100);
+"""
+
+
+def data_refresh(driver):
+    """
+    Oppdater visuals uten full reload. Returnerer (ok, beskrivelse).
+    ok er False hvis ingen metode fantes eller appen ikke hentet nye data.
+    """
+    driver.set_script_timeout(DATA_REFRESH_TIMEOUT_MS / 1000 + 5)
+    result = driver.execute_async_script(DATA_REFRESH_JS, REFRESH_CONTROL_SELECTORS, DATA_REFRESH_TIMEOUT_MS) or {}
+    method, requests = result.get("method"), result.get("requests", 0)
+    if not method:
+        return False, "ingen refresh-metode tilgjengelig"
+    if not requests:
+        return False, f"{method}: ingen datakall innen {DATA_REFRESH_TIMEOUT_MS} ms"
+    return True, f"{method}: {requests} datakall"
+
+
+def _full_reload(driver, operations_url):
+    # Gentle refresh med JavaScript F5 istedenfor driver.get(); veggen viser siste gode bilde imens
+    show_last_good(driver, operations_url, "reload")
+    reload_and_wait(driver)
+    print("  ✓ location.reload() kjørt")
+
+
+def refresh_dashboard(driver, operations_url, strategy=None, recover=True):
+    """
+    Refresh av fanen som vises nå, med helsesjekk og gjenoppretting.
+    strategy "data" (standard fra REFRESH_STRATEGY): oppdater kun data i appen; full reload bare
+    hvis data-refreshen ikke henter data eller helsesjekken feiler etterpå. "reload": location.reload().
+    recover=False (benchmarken): bare selve refreshen, uten gjenoppretting, frys-sjekk og minnevokter;
+    et dashboard som ikke blir synlig gir RuntimeError.
+    Returnerer driveren som skal brukes videre.
+    """
+    strategy = (strategy or REFRESH_STRATEGY).lower()
+    t0 = time.time()
+    result = "ok"
+    try:
+        method = "reload"
+        if strategy == "data":
+            ok, detail = data_refresh(driver)
+            if ok:
+                status = wait_for_dashboard_visible(driver, timeout=30, poll_interval=2)
+                if status['visible']:
+                    method = "data"
+                    print(f"  ✓ data-refresh uten reload ({detail})")
+                else:
+                    print(f"  ✗ data-refresh feilet helsesjekk: {status['reason']} – full reload")
+            else:
+                print(f"  ✗ data-refresh ikke mulig ({detail}) – full reload")
+
+        if method == "reload":
+            _full_reload(driver, operations_url)
+
+            # Verifiser at dashboardet er synlig etter refresh
+            status = wait_for_dashboard_visible(driver, timeout=30, poll_interval=2)
+            if not status['visible']:
+                if not recover:
+                    raise RuntimeError(f"Dashboard ikke synlig etter refresh: {status['reason']}")
+                result = "recovered"
+                print(f"⚠️  Dashboard ikke synlig etter refresh: {status['reason']}")
+                print(f"    Checks: {status['checks']}")
+                # Selve reloaden er allerede prøvd – start på neste trinn
+                driver = recover_dashboard(driver, operations_url,
+                                           f"Dashboard ikke synlig: {status['reason']}",
+                                           start_tier="navigate")
+        metric_incr("qs_refresh_method_total", method=method)
+        report_network_budget(driver)
+        if recover:
+            driver = check_staleness(driver, operations_url)
+        print("✅ Refresh ferdig.")
+    except Exception as e:
+        if not recover:
+            raise
+        print("⚠️  Feil under refresh:", e)
+        import traceback
+        traceback.print_exc()
+        result = "error"
+        driver = recover_dashboard(driver, operations_url, f"Feil under refresh: {e}")
+    metric_observe("qs_refresh_to_visible_seconds", time.time() - t0, result=result)
+    metric_incr("qs_refreshes_total", result=result)
+    return govern_memory(driver, operations_url) if recover else driver
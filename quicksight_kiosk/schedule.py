@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""Tidsstyring: tema etter klokkeslett, faste restarter og adaptivt refresh-intervall. Rene funksjoner, ingen nettleser."""
+
+import os
+from datetime import datetime, timedelta
+
+from .config import (
+    RESTART_TIMES, MEMORY_SOFT_MB, MEMORY_HARD_MB, REFRESH_SECS, REFRESH_ADAPTIVE, REFRESH_MIN_SECS,
+    REFRESH_MAX_SECS, REFRESH_BACKOFF, split_candidates,
+)
+
+
+def get_current_theme(now=None):
+    """
+    Returner tema basert på .env THEME (hvis satt), ellers tidsbasert tema.
+    - Hvis THEME er satt i .env: bruk den alltid
+    - Hvis THEME ikke er satt: 'light' hvis tiden er mellom 06:30 og 22:30, ellers 'midnight'
+    now: tidspunkt å regne ut for (standard nå)
+    """
+    theme_env = os.getenv("THEME", "").lower().strip()
+    if theme_env in ("light", "midnight"):
+        return theme_env
+
+    # Hvis ikke satt eller ugyldig, bruk tidsbasert tema
+    now = (now or datetime.now()).time()
+    light_start = datetime.strptime("06:30", "%H:%M").time()
+    light_end = datetime.strptime("22:30", "%H:%M").time()
+
+    if light_start <= now < light_end:
+        return "light"
+    else:
+        return "midnight"
+
+
+def next_theme_change(now=None):
+    """Neste tidspunkt get_current_theme() gir et annet svar, eller None når THEME er låst i .env."""
+    if os.getenv("THEME", "").lower().strip() in ("light", "midnight"):
+        return None
+    return next_restart_at(("06:30", "22:30"), now)
+
+
+def next_restart_at(times=("06:00", "22:00"), now=None):
+    """
+    Returner neste restart-tidspunkt i dag/ i morgen gitt faste klokkeslett (lokal tid).
+    times: tuple/list av klokkeslett på format HH:MM
+    """
+    now = now or datetime.now()
+    candidates = []
+    for t in times:
+        hh, mm = map(int, t.split(":"))
+        cand = now.replace(hour=hh, minute=mm, second=0, microsecond=0)
+        if cand <= now:
+            cand += timedelta(days=1)
+        candidates.append(cand)
+    # Ingen faste tider: aldri planlagt restart
+    return min(candidates) if candidates else datetime.max
+
+
+def _minutes(hhmm):
+    hh, mm = map(int, hhmm.strip().split(":"))
+    if not (0 <= hh < 24 and 0 <= mm < 60):
+        raise ValueError(hhmm)
+    return hh * 60 + mm
+
+
+def parse_refresh_policy(spec):
+    """
+    Parse REFRESH_POLICY, f.eks. "07:00-18:00=120-600, 22:00-06:00=900-3600".
+    Format per innslag: HH:MM-HH:MM=min-maks (sekunder). Tidsrommet kan gå over midnatt.
+    Returnerer liste med (start_minutt, slutt_minutt, min_secs, max_secs).
+    """
+    policies = []
+    for item in split_candidates(spec):
+        try:
+            window, bounds = item.split("=")
+            start, end = (_minutes(t) for t in window.split("-"))
+            lo, hi = (int(b) for b in bounds.split("-"))
+        except ValueError:
+            raise ValueError(f"Ugyldig REFRESH_POLICY-innslag '{item}' (forventet HH:MM-HH:MM=min-maks)") from None
+        if lo <= 0 or hi < lo:
+            raise ValueError(f"Ugyldige grenser i REFRESH_POLICY-innslag '{item}' (0 < min <= maks)")
+        policies.append((start, end, lo, hi))
+    return policies
+
+
+def refresh_bounds(policies=(), now=None):
+    """
+    (min, maks) sekunder mellom refresher på tidspunktet now: første REFRESH_POLICY-tidsrom som treffer,
+    ellers REFRESH_MIN_SECS/REFRESH_MAX_SECS.
+    """
+    now = now or datetime.now()
+    minute = now.hour * 60 + now.minute
+    for start, end, lo, hi in policies:
+        inside = start <= minute < end if start <= end else (minute >= start or minute < end)
+        if inside:
+            return lo, hi
+    return REFRESH_MIN_SECS, max(REFRESH_MIN_SECS, REFRESH_MAX_SECS)
+
+
+def next_policy_boundary(policies=(), now=None):
+    """Neste start eller slutt på et REFRESH_POLICY-tidsrom (da kan grensene endre seg), eller None uten tidsrom."""
+    times = sorted({f"{m // 60:02d}:{m % 60:02d}" for start, end, _lo, _hi in policies for m in (start, end)})
+    return next_restart_at(times, now) if times else None
+
+
+def next_refresh_interval(current, changed, policies=(), now=None):
+    """
+    Intervall til neste refresh, gitt utfallet av den forrige.
+    changed: True/None (nye eller ukjente data) -> minimum, False (uendret) -> current × REFRESH_BACKOFF.
+    Holdes alltid innenfor grensene for tidspunktet. Med REFRESH_ADAPTIVE av: alltid REFRESH_SECS.
+    """
+    if not REFRESH_ADAPTIVE:
+        return REFRESH_SECS
+    lo, hi = refresh_bounds(policies, now)
+    interval = current * REFRESH_BACKOFF if changed is False else lo
+    return int(min(hi, max(lo, interval)))
+
+
+def print_restart_policy():
+    if RESTART_TIMES:
+        print(f"⏰ Restarter prosessen automatisk hver dag kl. {', '.join(RESTART_TIMES)}.")
+    print(f"🧠 Minnevokter: tiltak over {MEMORY_SOFT_MB} MB, ny nettleser over {MEMORY_HARD_MB} MB.")
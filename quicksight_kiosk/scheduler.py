@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+Hendelsesstyrt planlegger for visningsløkkene: refresh, restart, temabytte, helseprober og dialogsveip er
+oppgaver med frister i en heap. Løkken sover til neste frist eller til et signal kommer
+(SIGHUP = les .env på nytt, SIGUSR1 = refresh nå), uten faste oppvåkninger.
+"""
+
+import os
+import time
+import heapq
+from datetime import datetime
+
+from .metrics import metric_incr, metric_observe
+
+# Oppgaver som følger klokka (restart, tema, tidsrom) sjekker klokka igjen minst så ofte, så en Pi som
+# får riktig tid fra NTP etter oppstart, eller en sommertid-overgang, ikke bommer med timer
+WALL_RECHECK_SECS = int(os.getenv("WALL_RECHECK_SECS", "3600"))
+# En oppgave som feilet (etter on_error) prøves igjen om så mange sekunder, med mindre on_error sier noe annet
+TASK_RETRY_SECS = int(os.getenv("TASK_RETRY_SECS", "60"))
+SIGNAL_NAMES = ("SIGHUP", "SIGUSR1")
+
+
+def new_scheduler():
+    return {"heap": [], "due": {}, "tasks": {}, "signals": [], "seq": 0, "wakeup_fd": None}
+
+
+def schedule(sched, name, fn, delay):
+    """
+    Sett (eller flytt) fristen for oppgaven name til om delay sekunder.
+    fn() kjøres ved fristen og returnerer sekunder til neste kjøring, eller None for å stoppe.
+    """
+    sched["seq"] += 1
+    due = time.monotonic() + max(0.0, delay)
+    sched["tasks"][name] = fn
+    sched["due"][name] = (due, sched["seq"])
+    heapq.heappush(sched["heap"], (due, sched["seq"], name))
+
+
+def reschedule(sched, name, delay):
+    """Flytt fristen for en registrert oppgave (f.eks. refresh nå ved SIGUSR1). Ukjente navn ignoreres."""
+    if name in sched["tasks"]:
+        schedule(sched, name, sched["tasks"][name], delay)
+
+
+def cancel(sched, name):
+    sched["tasks"].pop(name, None)
+    sched["due"].pop(name, None)
+
+
+def due_in(sched, name):
+    """Sekunder til oppgaven name skal kjøres, eller None hvis den ikke er planlagt."""
+    entry = sched["due"].get(name)
+    return None if entry is None else max(0.0, entry[0] - time.monotonic())
+
+
+def seconds_until(when, now=None):
+    """Sekunder til klokkeslettet when, begrenset til WALL_RECHECK_SECS (oppgaven sjekker klokka selv)."""
+    remaining = (when - (now or datetime.now())).total_seconds()
+    return max(0.0, min(remaining, WALL_RECHECK_SECS))
+
+
+def install_signal_handlers(sched):
+    """
+    SIGHUP/SIGUSR1 legges i sched['signals'] og vekker løkken via signal.set_wakeup_fd,
+    slik at select() returnerer med en gang i stedet for å sove ut fristen.
+    """
+    import signal
+    r, w = os.pipe()
+    os.set_blocking(r, False)
+    os.set_blocking(w, False)
+    signal.set_wakeup_fd(w)
+    sched["wakeup_fd"] = r
+
+    def handler(signum, _frame):
+        sched["signals"].append(signal.Signals(signum).name)
+
+    for name in SIGNAL_NAMES:
+        if hasattr(signal, name):
+            signal.signal(getattr(signal, name), handler)
+
+
+def _sleep(sched, timeout):
+    import select
+    fd = sched["wakeup_fd"]
+    if fd is None:
+        time.sleep(WALL_RECHECK_SECS if timeout is None else timeout)
+        return
+    ready, _, _ = select.select([fd], [], [], timeout)
+    if ready:
+        try:
+            while os.read(fd, 512):
+                pass
+        except BlockingIOError:
+            pass
+
+
+def _next_due(sched):
+    """Første gyldige (frist, navn) i heapen; utdaterte innslag (flyttet eller avbrutt) kastes."""
+    heap = sched["heap"]
+    while heap:
+        due, seq, name = heap[0]
+        if sched["due"].get(name) == (due, seq):
+            return due, name
+        heapq.heappop(heap)
+    return None, None
+
+
+def run_scheduler(sched, on_signal, on_error=None):
+    """
+    Kjør oppgavene til evig tid. on_signal(navn) kalles for hvert mottatt signal ("SIGHUP"/"SIGUSR1")
+    og kan flytte eller legge til oppgaver. En oppgave som kaster et unntak gir on_error(navn, unntak), som
+    gjenoppretter og returnerer sekunder til oppgaven prøves igjen (None: ikke igjen).
+    Uten on_error slipper unntaket gjennom, som KeyboardInterrupt alltid gjør.
+    """
+    while True:
+        due, name = _next_due(sched)
+        if not sched["signals"]:
+            timeout = None if due is None else due - time.monotonic()
+            if timeout is None or timeout > 0:
+                _sleep(sched, timeout)
+        while sched["signals"]:
+            signame = sched["signals"].pop(0)
+            metric_incr("qs_signals_total", signal=signame)
+            on_signal(signame)
+
+        due, name = _next_due(sched)
+        now = time.monotonic()
+        if due is None or due > now:
+            continue
+        heapq.heappop(sched["heap"])
+        del sched["due"][name]
+        fn = sched["tasks"][name]
+        metric_observe("qs_task_lateness_seconds", now - due, task=name)
+        metric_incr("qs_task_runs_total", task=name)
+        try:
+            delay = fn()
+        except Exception as e:
+            metric_incr("qs_task_errors_total", task=name)
+            print(f"⚠️  Oppgaven '{name}' feilet: {type(e).__name__}: {e}")
+            if on_error is None:
+                raise
+            delay = on_error(name, e)
+        # Oppgaven kan selv ha flyttet eller avbrutt seg (eller andre) mens den kjørte
+        if delay is not None and name not in sched["due"] and sched["tasks"].get(name) is fn:
+            schedule(sched, name, fn, delay)
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+Delt innlogget sesjon: cookies og localStorage fra én vellykket innlogging lagres kryptert (AES-256-GCM)
+med utløpstid, og settes inn i nye nettlesere før første navigasjon. Samme fil og nøkkel leses av
+Playwright-scraperen (src/session.js). Bare en utløpt eller avvist sesjon går gjennom innloggingsskjemaet.
+"""
+
+import os
+import json
+import time
+import base64
+from pathlib import Path
+
+from .config import getenv_bool
+from .metrics import metric_incr
+from .network import export_cookies, import_cookies
+
+SESSION_STORE = getenv_bool("SESSION_STORE", True)
+SESSION_STORE_FILE = Path(os.getenv("SESSION_STORE_FILE", str(Path.home() / ".qs-session.enc")))
+# 32 tilfeldige byte, lages ved første bruk (0600). SESSION_STORE_KEY (base64) i miljøet overstyrer filen.
+SESSION_KEY_FILE = Path(os.getenv("SESSION_KEY_FILE", str(Path.home() / ".qs-session.key")))
+SESSION_MAX_AGE_SECS = int(os.getenv("SESSION_MAX_AGE_SECS", str(8 * 3600)))
+SESSION_AAD = b"qs-session-v1"
+# Hva denne prosessen har gjort med lagret sesjon: script-id for localStorage, om den ble brukt,
+# og når innloggingen som er i bruk ble gjort (epoch, grunnlag for proaktiv fornyelse i reauth)
+SESSION_STATE = {"restored": False, "script_id": None, "saved_at": None, "authenticated_at": None}
+
+# Settes inn før sidens egne skript: fyller localStorage for riktig origin, men overskriver ikke appens verdier
+LOCAL_STORAGE_JS = """
+(() => {
+    const stored = %s;
+    const items = stored[location.origin];
+    if (!items) return;
+    try {
+        for (const [k, v] of Object.entries(items)) {
+            if (localStorage.getItem(k) === null) localStorage.setItem(k, v);
+        }
+    } catch (e) {}
+})();
+"""
+
+
+def _aesgcm():
+    """AESGCM-objekt med delt nøkkel, eller None uten cryptography-pakken."""
+    try:
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+    except Exception:
+        return None
+    env_key = os.getenv("SESSION_STORE_KEY", "").strip()
+    if env_key:
+        return AESGCM(base64.b64decode(env_key))
+    try:
+        key = SESSION_KEY_FILE.read_bytes()
+    except FileNotFoundError:
+        key = os.urandom(32)
+        try:
+            fd = os.open(SESSION_KEY_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with os.fdopen(fd, "wb") as f:
+                f.write(key)
+        except FileExistsError:
+            # En annen prosess rakk å lage nøkkelen først
+            key = SESSION_KEY_FILE.read_bytes()
+    return AESGCM(key)
+
+
+def load_session():
+    """Dekrypter lagret sesjon. None hvis den mangler, er utløpt eller ikke kan leses."""
+    if not SESSION_STORE or not SESSION_STORE_FILE.exists():
+        return None
+    aes = _aesgcm()
+    if aes is None:
+        print("ℹ️  cryptography mangler – lagret sesjon brukes ikke.")
+        return None
+    try:
+        envelope = json.loads(SESSION_STORE_FILE.read_text())
+        plain = aes.decrypt(base64.b64decode(envelope["nonce"]), base64.b64decode(envelope["data"]), SESSION_AAD)
+        session = json.loads(plain)
+    except Exception as e:
+        print(f"⚠️  Kunne ikke lese lagret sesjon ({type(e).__name__}) – logger inn på vanlig måte.")
+        return None
+    if time.time() >= session.get("expires_at", 0):
+        print("ℹ️  Lagret sesjon er utløpt.")
+        metric_incr("qs_session_store_total", result="expired")
+        return None
+    return session
+
+
+def save_session(driver):
+    """Krypter og lagre cookies og localStorage fra nettleseren (etter vellykket innlogging)."""
+    if not SESSION_STORE:
+        return False
+    aes = _aesgcm()
+    if aes is None:
+        return False
+    now = time.time()
+    origin, storage = driver.execute_script(
+        "return [location.origin, Object.fromEntries(Object.entries(localStorage))];")
+    session = {
+        "saved_at": now,
+        "expires_at": now + SESSION_MAX_AGE_SECS,
+        "cookies": export_cookies(driver),
+        "local_storage": {origin: storage} if storage else {},
+    }
+    nonce = os.urandom(12)
+    envelope = {
+        "v": 1,
+        "alg": "AES-256-GCM",
+        "nonce": base64.b64encode(nonce).decode(),
+        "data": base64.b64encode(aes.encrypt(nonce, json.dumps(session).encode(), SESSION_AAD)).decode(),
+    }
+    # Atomisk bytte: andre prosesser leser aldri en halvskrevet fil
+    tmp = SESSION_STORE_FILE.with_name(f"{SESSION_STORE_FILE.name}.{os.getpid()}.tmp")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        json.dump(envelope, f)
+    os.replace(tmp, SESSION_STORE_FILE)
+    SESSION_STATE["saved_at"] = now
+    metric_incr("qs_session_store_total", result="saved")
+    print(f"🔑 Sesjon lagret ({len(session['cookies'])} cookies), gyldig i {SESSION_MAX_AGE_SECS // 3600}t.")
+    return True
+
+
+def restore_session(driver):
+    """Sett inn lagret sesjon før første navigasjon. True hvis en gyldig sesjon ble satt inn."""
+    session = load_session()
+    if session is None:
+        return False
+    now = time.time()
+    cookies = [c for c in session["cookies"] if c.get("expires", now + 1) > now]
+    import_cookies(driver, cookies)
+    if session.get("local_storage"):
+        result = driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument",
+                                        {"source": LOCAL_STORAGE_JS % json.dumps(session["local_storage"])})
+        SESSION_STATE["script_id"] = result.get("identifier")
+    SESSION_STATE["restored"] = True
+    SESSION_STATE["authenticated_at"] = session["saved_at"]
+    metric_incr("qs_session_store_total", result="restored")
+    age_min = (now - session["saved_at"]) / 60
+    print(f"🔑 Lagret sesjon satt inn ({len(cookies)} cookies, {age_min:.0f} min gammel).")
+    return True
+
+
+def session_accepted(driver):
+    """Sesjonen førte forbi signin: fjern localStorage-skriptet (appen eier verdiene herfra)."""
+    script_id, SESSION_STATE["script_id"] = SESSION_STATE["script_id"], None
+    if script_id:
+        try:
+            driver.execute_cdp_cmd("Page.removeScriptToEvaluateOnNewDocument", {"identifier": script_id})
+        except Exception:
+            pass
+
+
+def discard_session():
+    """Lagret sesjon ble avvist av QuickSight: slett den så ingen andre prosesser prøver den igjen."""
+    SESSION_STATE["restored"] = False
+    metric_incr("qs_session_store_total", result="rejected")
+    try:
+        SESSION_STORE_FILE.unlink()
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+"""
+Frys- og staleness-deteksjon fra et lite visuelt fingeravtrykk etter hver refresh: skjermbildet skaleres
+ned i nettleseren (CDP clip.scale), dekodes til gråtoner og reduseres til et rutenett.
+I tillegg et billig data-fingeravtrykk (hash av teksten i visualene) som styrer det adaptive refresh-intervallet,
+og en eksakt hash av et større skjermbilde som skiller "ingen nye data" fra "nye data, men skjermen står stille".
+"""
+
+import os
+import time
+import hashlib
+
+from .config import REFRESH_MAX_SECS, REFRESH_MIN_SECS
+from .health import VISUAL_CONTAINER_SELECTORS, VISUAL_SELECTORS
+from .metrics import metric_incr, metric_observe
+from .recovery import recover_dashboard
+
+FINGERPRINT_GRID = (16, 9)
+FINGERPRINT_HISTORY = int(os.getenv("FINGERPRINT_HISTORY", "12"))
+# Antall refresher på rad med identisk bilde før vi regner data som frosset
+FREEZE_REFRESHES = int(os.getenv("FREEZE_REFRESHES", "6"))
+# Standardavvik (0-255) under dette regnes som blank/ensfarget skjerm
+BLANK_STDDEV = float(os.getenv("BLANK_STDDEV", "4"))
+# Gjennomsnittlig forskjell per rute (0-255) under dette regnes som "uendret"
+UNCHANGED_TILE_DELTA = float(os.getenv("UNCHANGED_TILE_DELTA", "1.5"))
+FINGERPRINTS = {}  # url -> deque med fingeravtrykk
+# Skala for den eksakte bilde-hashen: stor nok til at et endret tall alltid gir andre piksler
+FRAME_HASH_SCALE = float(os.getenv("FRAME_HASH_SCALE", "0.5"))
+# Refresher på rad med nye data men byte-identisk bilde før vi regner renderen som hengt
+RENDER_STUCK_REFRESHES = int(os.getenv("RENDER_STUCK_REFRESHES", "2"))
+# Uendrede data lenger enn dette × forventet intervall mellom endringer regnes som stoppet opp
+DATA_STALE_FACTOR = float(os.getenv("DATA_STALE_FACTOR", "4"))
+# gap: glidende snitt av sekunder mellom dataendringer. stale: varsler siden siste endring (dobler grensen).
+# frame: eksakt bilde-hash fra forrige refresh. render_stuck: refresher på rad med nye data og samme bilde.
+DATA_STATE = {}  # url -> {'hash', 'changed', 'changed_at', 'gap', 'stale', 'frame', 'render_stuck'}
+
+# FNV-1a over teksten i visual-containerne (første selektor som treffer), i én rundtur
+DATA_FINGERPRINT_JS = """
+const sels = arguments[0];
+let text = '', visuals = 0;
+for (const sel of sels) {
+    let nodes = [];
+    try { nodes = document.querySelectorAll(sel); } catch (e) {}
+    if (!nodes.length) continue;
+    for (const el of nodes) { text += (el.innerText || el.textContent || '') + '\\u0001'; visuals++; }
+    break;
+}
+let h = 0x811c9dc5;
+for (let i = 0; i < text.length; i++) { h ^= text.charCodeAt(i); h = Math.imul(h, 0x01000193) >>> 0; }
+return {hash: h.toString(16), visuals: visuals, chars: text.length};
+"""
+
+
+def _decode_png_gray(data):
+    """Minimal PNG-dekoder (8-bit RGB/RGBA/gråtone, ikke interlaced) -> (bredde, høyde, gråtoner)."""
+    import struct
+    import zlib
+    pos, idat = 8, b""
+    width = height = color_type = 0
+    while pos < len(data):
+        length, ctype = struct.unpack(">I4s", data[pos:pos + 8])
+        chunk = data[pos + 8:pos + 8 + length]
+        if ctype == b"IHDR":
+            width, height, depth, color_type, _, _, interlace = struct.unpack(">IIBBBBB", chunk)
+            if depth != 8 or interlace:
+                raise ValueError("Kun 8-bit, ikke-interlaced PNG støttes")
+        elif ctype == b"IDAT":
+            idat += chunk
+        elif ctype == b"IEND":
+            break
+        pos += 12 + length
+
+    bpp = {0: 1, 2: 3, 4: 2, 6: 4}[color_type]
+    raw = zlib.decompress(idat)
+    stride = width * bpp
+    prev = bytearray(stride)
+    gray = []
+    i = 0
+    for _ in range(height):
+        ftype = raw[i]
+        line = bytearray(raw[i + 1:i + 1 + stride])
+        i += 1 + stride
+        for x in range(stride):
+            a = line[x - bpp] if x >= bpp else 0
+            b = prev[x]
+            if ftype == 1:
+                line[x] = (line[x] + a) & 0xFF
+            elif ftype == 2:
+                line[x] = (line[x] + b) & 0xFF
+            elif ftype == 3:
+                line[x] = (line[x] + ((a + b) >> 1)) & 0xFF
+            elif ftype == 4:
+                c = prev[x - bpp] if x >= bpp else 0
+                p = a + b - c
+                pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+                line[x] = (line[x] + (a if pa <= pb and pa <= pc else b if pb <= pc else c)) & 0xFF
+        if bpp >= 3:
+            gray.extend((line[x] * 299 + line[x + 1] * 587 + line[x + 2] * 114) // 1000
+                        for x in range(0, stride, bpp))
+        else:
+            gray.extend(line[x] for x in range(0, stride, bpp))
+        prev = line
+    return width, height, gray
+
+
+def _capture(driver, scale, size=None):
+    """Skjermbilde av hele vinduet skalert i nettleseren, som base64-PNG."""
+    size = size or driver.get_window_size()
+    shot = driver.execute_cdp_cmd("Page.captureScreenshot", {
+        "format": "png",
+        "clip": {"x": 0, "y": 0, "width": size["width"], "height": size["height"], "scale": scale},
+    })
+    return shot["data"]
+
+
+def screen_fingerprint(driver, scale=0.05, size=None):
+    """
+    Ta et nedskalert skjermbilde og reduser det til et rutenett av gjennomsnittlig gråtone.
+    Returnerer {'tiles', 'hash', 'stddev'}; hash er en perseptuell aHash (bit per rute over snittet).
+    """
+    import base64
+    width, height, gray = _decode_png_gray(base64.b64decode(_capture(driver, scale, size)))
+
+    cols, rows = FINGERPRINT_GRID
+    tiles = []
+    for ty in range(rows):
+        y0, y1 = ty * height // rows, max((ty + 1) * height // rows, ty * height // rows + 1)
+        for tx in range(cols):
+            x0, x1 = tx * width // cols, max((tx + 1) * width // cols, tx * width // cols + 1)
+            vals = [gray[y * width + x] for y in range(y0, y1) for x in range(x0, x1)]
+            tiles.append(sum(vals) / len(vals))
+    mean = sum(tiles) / len(tiles)
+    stddev = (sum((t - mean) ** 2 for t in tiles) / len(tiles)) ** 0.5
+    bits = 0
+    for t in tiles:
+        bits = (bits << 1) | (1 if t > mean else 0)
+    return {"tiles": tiles, "hash": bits, "stddev": stddev, "mean": mean}
+
+
+def frame_hash(driver, scale=FRAME_HASH_SCALE, size=None):
+    """Eksakt hash av skjermbildet i FRAME_HASH_SCALE. Bildet dekodes ikke; bare byte-likhet brukes."""
+    return hashlib.sha1(_capture(driver, scale, size).encode()).hexdigest()
+
+
+def fingerprint_delta(a, b):
+    """Gjennomsnittlig forskjell per rute (0-255) mellom to fingeravtrykk."""
+    return sum(abs(x - y) for x, y in zip(a["tiles"], b["tiles"])) / len(a["tiles"])
+
+
+def data_fingerprint(driver):
+    """Hash av teksten i alle visuals ({'hash', 'visuals', 'chars'}), eller None hvis ingen visuals ble funnet."""
+    result = driver.execute_script(DATA_FINGERPRINT_JS, VISUAL_CONTAINER_SELECTORS + VISUAL_SELECTORS)
+    if not result or not result.get("visuals"):
+        return None
+    return result
+
+
+def track_data(driver, operations_url):
+    """
+    Oppdater DATA_STATE for URL-en etter en refresh.
+    Returnerer True (nye data), False (uendret) eller None (ukjent: første måling eller ingen visuals).
+    """
+    state = DATA_STATE.setdefault(operations_url, {"hash": None, "changed": None, "changed_at": None,
+                                                   "gap": None, "stale": 0, "frame": None, "render_stuck": 0})
+    try:
+        fp = data_fingerprint(driver)
+    except Exception as e:
+        print(f"⚠️  Klarte ikke lese data-fingeravtrykk: {e}")
+        fp = None
+    if fp is None:
+        state["changed"] = None
+        return None
+    changed = None if state["hash"] is None else fp["hash"] != state["hash"]
+    now = time.time()
+    if changed and state["changed_at"] is not None:
+        gap = now - state["changed_at"]
+        state["gap"] = gap if state["gap"] is None else 0.7 * state["gap"] + 0.3 * gap
+    if changed or state["hash"] is None:
+        state["changed_at"], state["stale"] = now, 0
+    state["hash"], state["changed"] = fp["hash"], changed
+    metric_incr("qs_data_refresh_total", result={True: "changed", False: "unchanged", None: "first"}[changed])
+    return changed
+
+
+def data_changed(operations_url):
+    """Siste kjente utfall fra track_data for URL-en (True/False/None)."""
+    return DATA_STATE.get(operations_url, {}).get("changed")
+
+
+def data_stale(operations_url, now=None):
+    """
+    Sekunder siden dataene sist endret seg, hvis det er over DATA_STALE_FACTOR × forventet intervall, ellers None.
+    Forventet intervall er snittet mellom tidligere endringer (REFRESH_MAX_SECS før to endringer er sett).
+    Grensen dobles for hvert varsel uten nye data, så et nattstille dashboard ikke lastes på nytt hele natten.
+    """
+    state = DATA_STATE.get(operations_url)
+    if not state or state["changed"] is not False or state["changed_at"] is None:
+        return None
+    expected = max(state["gap"] or REFRESH_MAX_SECS, REFRESH_MIN_SECS)
+    age = (now or time.time()) - state["changed_at"]
+    return age if age > DATA_STALE_FACTOR * expected * 2 ** state["stale"] else None
+
+
+def check_staleness(driver, operations_url):
+    """
+    Kalles etter hver refresh. Oppdager blank/hvit skjerm og frosset visning, og gjenoppretter.
+    Med data-fingeravtrykk: nye data men byte-identisk bilde (frame_hash) i RENDER_STUCK_REFRESHES refresher
+    = hengt renderer. Uendrede data er et rolig dashboard (refresh-intervallet strekkes), til de har stått
+    stille lenger enn data_stale tillater. Da lastes siden på nytt og intervallet går tilbake til minimum.
+    Uten data-fingeravtrykk: bilde som ikke har endret seg på FREEZE_REFRESHES refresher regnes som frosset.
+    Returnerer driveren som skal brukes videre.
+    """
+    from collections import deque
+    history = FINGERPRINTS.setdefault(operations_url, deque(maxlen=FINGERPRINT_HISTORY))
+    changed = track_data(driver, operations_url)
+    t0 = time.time()
+    try:
+        size = driver.get_window_size()
+        fp = screen_fingerprint(driver, size=size)
+        frame = frame_hash(driver, size=size) if changed is not None else None
+    except Exception as e:
+        # Skjermbilde som ikke svarer tyder på hengt renderer
+        print(f"⚠️  Klarte ikke ta fingeravtrykk: {e}")
+        metric_incr("qs_staleness_total", state="capture_failed")
+        return recover_dashboard(driver, operations_url, f"Skjermbilde feilet: {e}", start_tier="navigate")
+    metric_observe("qs_fingerprint_seconds", time.time() - t0)
+
+    if fp["stddev"] < BLANK_STDDEV:
+        print(f"⚠️  Skjermen er blank/ensfarget (snitt {fp['mean']:.0f}, stddev {fp['stddev']:.1f})")
+        metric_incr("qs_staleness_total", state="blank")
+        history.clear()
+        return recover_dashboard(driver, operations_url, "Blank skjerm etter refresh", start_tier="navigate")
+
+    history.append(fp)
+    if changed is not None:
+        state = DATA_STATE[operations_url]
+        previous_frame, state["frame"] = state["frame"], frame
+        state["render_stuck"] = state["render_stuck"] + 1 if changed and frame == previous_frame else 0
+        if state["render_stuck"] >= RENDER_STUCK_REFRESHES:
+            print(f"⚠️  Nye data i {state['render_stuck']} refresher, men byte-identisk bilde – renderer henger")
+            metric_incr("qs_staleness_total", state="render_stuck")
+            history.clear()
+            state["frame"], state["render_stuck"] = None, 0
+            return recover_dashboard(driver, operations_url, "Nye data uten nytt bilde", start_tier="reload")
+
+        # Uendret bilde med uendrede data er ikke en frys før dataene har stått stille for lenge
+        age = data_stale(operations_url)
+        if age is None:
+            return driver
+        print(f"⚠️  Ingen nye data på {age / 60:.0f} min – dataoppdateringen kan ha stoppet opp")
+        metric_incr("qs_staleness_total", state="data_stale")
+        state["stale"] += 1
+        # Ukjent utfall: det adaptive intervallet går tilbake til minimum i stedet for å strekkes videre
+        state["changed"] = None
+        history.clear()
+        return recover_dashboard(driver, operations_url, "Uendrede data over tid", start_tier="reload")
+    recent = list(history)[-FREEZE_REFRESHES:]
+    if len(recent) == FREEZE_REFRESHES and all(
+        fingerprint_delta(recent[0], other) < UNCHANGED_TILE_DELTA for other in recent[1:]
+    ):
+        print(f"⚠️  Uendret bilde i {FREEZE_REFRESHES} refresher på rad – data eller renderer kan ha frosset")
+        metric_incr("qs_staleness_total", state="frozen")
+        history.clear()
+        # Data-refresh har åpenbart ikke hjulpet – full reload først
+        return recover_dashboard(driver, operations_url, "Uendret bilde over tid", start_tier="reload")
+    return driver
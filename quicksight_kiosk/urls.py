@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+Register over dashboard-URL-er. Alle kombinasjoner av (tema, modus, by) bygges og normaliseres én gang
+ved import, slik at oppslag under kjøring er et rent dict-oppslag. Ukjente verdier gir feil med forslag
+i stedet for et stille ufiltrert (og mye tyngre) alle-byer-dashboard.
+"""
+
+import sys
+from urllib.parse import quote, unquote
+
+DASHBOARDS_BASE = "https://eu-central-1.quicksight.aws.amazon.com/sn/account/ryde-tech/dashboards"
+
+# Dashboard URL-er og sheet IDs
+MIDNIGHT_DASHBOARD_ID = "4c86565f-7e0b-4b6b-bfea-14ca7f307bf7"
+LIGHT_DASHBOARD_ID = "094b6397-67e5-4011-ad16-25e93041060d"
+
+OPERATIONS_SHEET_ID_MIDNIGHT = "b3763094-7789-45e2-809f-293306b55f00"
+MECHANICS_SHEET_ID_MIDNIGHT = "7913f79f-6d23-4328-9a63-4f8ad50bca36"
+OPERATIONS_SHEET_ID_LIGHT = "b3db0892-09d5-4dcf-8490-e155e0360f16"
+MECHANICS_SHEET_ID_LIGHT = "b8858404-f110-4efd-96f9-bf50ccf495be"
+
+# City-mappinger
+CITY_MAPPING = {
+    "asker": "asker%20%26%20bærum",
+    "bergen": "bergen",
+    "bodø": "bodø",
+    "borås": "borås",
+    "changzhou": "changzhou%20%26%20shanghai",
+    "drammen": "drammen",
+    "eskilstuna": "eskilstuna",
+    "fredrikstad": "fredrikstad%20%26%20sarpsborg",
+    "göteborg": "göteborg",
+    "halmstad": "halmstad",
+    "helsingborg": "helsingborg",
+    "hämeenlinna": "hämeenlinna",
+    "helsinki": "helsinki%20%26%20espoo%20%26%20vantaa%20%26%20myyrmäki",
+    "hq": "hq",
+    "joensuu": "joensuu",
+    "jyväskylä": "jyväskylä",
+    "karlstad": "karlstad",
+    "kristiansand": "kristiansand",
+    "kuopio": "kuopio",
+    "lahti": "lahti",
+    "lappeenranta": "lappeenranta",
+    "linköping": "linköping",
+    "luleå": "luleå",
+    "malmö": "malmö%20%26%20lund",
+    "moss": "moss",
+    "norrköping": "norrköping",
+    "not used": "not used",
+    "oslo": "oslo%20%26%20l%C3%B8renskog",
+    "oulu": "oulu",
+    "östersund": "östersund",
+    "örebro": "örebro",
+    "pori": "pori",
+    "sandefjord": "sandefjord%20%26%20tønsberg",
+    "seinäjoki": "seinäjoki",
+    "shanghai": "shanghai",
+    "skien": "skien%20%26%20porsgrunn",
+    "stavanger": "stavanger%20%26%20sandnes%20%26%20sola",
+    "sundsvall": "sundsvall",
+    "tampere": "tampere",
+    "trondheim": "trondheim",
+    "tromsø": "tromsø",
+    "turku": "turku%20%26%20raisio",
+    "umeå": "umeå",
+    "uppsala": "uppsala",
+    "vaasa": "vaasa",
+    "västeräs": "västeräs",
+    "växjö": "växjö",
+}
+
+THEMES = ("light", "midnight")
+MODES = ("operations", "mechanics")
+# THEME tom eller "auto" = tidsbasert tema (se schedule.get_current_theme)
+AUTO_THEMES = ("", "auto")
+
+DASHBOARD_IDS = {"light": LIGHT_DASHBOARD_ID, "midnight": MIDNIGHT_DASHBOARD_ID}
+SHEET_IDS = {
+    ("light", "operations"): OPERATIONS_SHEET_ID_LIGHT,
+    ("light", "mechanics"): MECHANICS_SHEET_ID_LIGHT,
+    ("midnight", "operations"): OPERATIONS_SHEET_ID_MIDNIGHT,
+    ("midnight", "mechanics"): MECHANICS_SHEET_ID_MIDNIGHT,
+}
+
+
+def normalize_filter(value):
+    """By-filter med blandet rå UTF-8 og prosentkoding -> konsekvent prosentkodet UTF-8."""
+    return quote(unquote(value), safe="")
+
+
+CITY_FILTERS = {city: normalize_filter(value) for city, value in CITY_MAPPING.items()}
+CITIES = tuple(CITY_MAPPING)
+
+
+def build_dashboard_url(theme, mode, city=None):
+    """Bygg URL for (tema, modus, by). city=None gir dashboardet uten by-filter (alle byer)."""
+    dashboard_id = DASHBOARD_IDS[theme]
+    sheet_id = SHEET_IDS[(theme, mode)]
+    city_query = f"#p.City={CITY_FILTERS[city]}" if city else ""
+    return f"{DASHBOARDS_BASE}/{dashboard_id}/sheets/{dashboard_id}_{sheet_id}{city_query}"
+
+
+REGISTRY = {
+    (theme, mode, city): build_dashboard_url(theme, mode, city)
+    for theme in THEMES for mode in MODES for city in CITIES
+}
+
+
+def _fold(name):
+    """Små bokstaver uten aksenter, for uskarp sammenligning ("Bodo" ~ "bodø", "goteborg" ~ "göteborg")."""
+    import unicodedata
+    name = unicodedata.normalize("NFKD", name.lower().strip())
+    name = "".join(ch for ch in name if not unicodedata.combining(ch))
+    return name.replace("ø", "o").replace("æ", "ae").replace("ß", "ss")
+
+
+def suggest(value, choices, labels=None):
+    """
+    Opptil tre nærmeste gyldige verdier for value.
+    labels: valgfri {verdi: visningsnavn}, f.eks. "asker & bærum" for "asker", som også sammenlignes.
+    """
+    import difflib
+    folded = {}
+    for choice in choices:
+        folded.setdefault(_fold(choice), choice)
+        if labels and choice in labels:
+            folded.setdefault(_fold(labels[choice]), choice)
+    key = _fold(value)
+    if key in folded:
+        return [folded[key]]
+    hits = []
+    for match in difflib.get_close_matches(key, folded, n=5, cutoff=0.6):
+        if folded[match] not in hits:
+            hits.append(folded[match])
+    return hits[:3]
+
+
+def _unknown(kind, value, choices, labels=None):
+    hint = suggest(value, choices, labels)
+    message = f"Ukjent {kind} '{value}'"
+    if hint:
+        message += f" – mente du {' / '.join(hint)}?"
+    else:
+        message += f" (gyldige: {', '.join(choices) if len(choices) <= 5 else f'{len(choices)} byer, se CITY_MAPPING'})"
+    return message
+
+
+def validate(theme=None, mode=None, city=None):
+    """Returner liste med feilmeldinger (tom = gyldig). Argumenter som er None sjekkes ikke."""
+    errors = []
+    if theme is not None and theme not in THEMES and theme not in AUTO_THEMES:
+        errors.append(_unknown("tema", theme, THEMES))
+    if mode is not None and mode not in MODES:
+        errors.append(_unknown("modus", mode, MODES))
+    if city is not None and city not in CITY_FILTERS:
+        labels = {c: unquote(v) for c, v in CITY_MAPPING.items()}
+        errors.append(_unknown("by", city, CITIES, labels))
+    return errors
+
+
+def require_valid(theme=None, mode=None, city=None, source=".env"):
+    """Avslutt med feilkode 2 og forslag hvis tema/modus/by er ugyldig."""
+    errors = validate(theme, mode, city)
+    if errors:
+        for error in errors:
+            print(f"❌ {error} ({source})")
+        sys.exit(2)
+
+
+def dashboard_url(theme, mode, city):
+    """Oppslag i registeret. Kaster ValueError med forslag for ukjent tema, modus eller by."""
+    try:
+        return REGISTRY[(theme, mode, city)]
+    except KeyError:
+        errors = validate(theme, mode, city) or [f"Ukjent dashboard ({theme}, {mode}, {city})"]
+        raise ValueError("; ".join(errors)) from None
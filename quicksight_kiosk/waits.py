@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""Venting på elementer: alle kandidat-selektorer i samme race, med treffstatistikk mellom kjøringer."""
+
+import os
+import json
+import time
+from pathlib import Path
+
+from .config import split_candidates
+
+# Treffstatistikk per selektor, lagret mellom kjøringer slik at den beste prøves først
+SELECTOR_STATS_FILE = Path(os.getenv("SELECTOR_STATS_FILE", str(Path.home() / ".qs-selector-stats.json")))
+_selector_stats = None
+
+# Sjekker alle kandidatene i én rundtur og returnerer [element, indeks] for første synlige treff
+RACE_JS = """
+const [kind, cands, needEnabled] = arguments;
+function shown(el) {
+    if (el.checkVisibility && !el.checkVisibility({checkOpacity: true, checkVisibilityCSS: true})) return false;
+    const r = el.getBoundingClientRect();
+    return r.width > 0 && r.height > 0;
+}
+function matches(sel) {
+    try {
+        if (kind === 'css') return Array.from(document.querySelectorAll(sel));
+        const snap = document.evaluate(sel, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        const out = [];
+        for (let i = 0; i < snap.snapshotLength; i++) out.push(snap.snapshotItem(i));
+        return out;
+    } catch (e) { return []; }
+}
+for (let i = 0; i < cands.length; i++) {
+    for (const el of matches(cands[i])) {
+        if (shown(el) && !(needEnabled && el.disabled)) return [el, i];
+    }
+}
+return null;
+"""
+
+
+def _load_selector_stats():
+    global _selector_stats
+    if _selector_stats is None:
+        try:
+            with open(SELECTOR_STATS_FILE) as f:
+                _selector_stats = json.load(f)
+        except Exception:
+            _selector_stats = {}
+    return _selector_stats
+
+
+def _record_selector_hit(selector, elapsed):
+    stats = _load_selector_stats()
+    entry = stats.setdefault(selector, {"hits": 0, "ms": 0.0})
+    entry["hits"] += 1
+    # Glidende snitt av tid til treff
+    entry["ms"] = round(entry["ms"] + (elapsed * 1000 - entry["ms"]) / entry["hits"], 1)
+    try:
+        with open(SELECTOR_STATS_FILE, "w") as f:
+            json.dump(stats, f, indent=1, ensure_ascii=False)
+    except Exception:
+        pass
+
+
+def order_by_hits(candidates):
+    """Sorter kandidater etter tidligere treff (flest først), ellers i oppgitt rekkefølge."""
+    stats = _load_selector_stats()
+    return sorted(candidates, key=lambda s: -stats.get(s, {}).get("hits", 0))
+
+
+def race_selectors(driver, kind: str, candidates, timeout=15, clickable=False):
+    """
+    Venter på alle kandidat-selektorene samtidig (én execute_script per poll) og
+    returnerer (element, vinnende selektor). Kaster TimeoutException hvis ingen dukker opp.
+    kind: "css" eller "xpath"
+    """
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.common.exceptions import (
+        TimeoutException, JavascriptException, StaleElementReferenceException,
+    )
+
+    ordered = order_by_hits(candidates)
+    t0 = time.time()
+    try:
+        el, idx = WebDriverWait(
+            driver, timeout, poll_frequency=0.2,
+            ignored_exceptions=(JavascriptException, StaleElementReferenceException),
+        ).until(lambda d: d.execute_script(RACE_JS, kind, ordered, clickable))
+    except TimeoutException:
+        raise TimeoutException(f"Ingen av selektorene ble funnet innen {timeout}s: {', '.join(candidates)}")
+    winner = ordered[idx]
+    elapsed = time.time() - t0
+    _record_selector_hit(winner, elapsed)
+    print(f"  🎯 Selektor vant etter {elapsed:.2f}s: {winner}")
+    return el, winner
+
+
+def wait_any_css(driver, css_list: str, timeout=15):
+    el, _winner = race_selectors(driver, "css", split_candidates(css_list), timeout=timeout)
+    return el
+
+
+def click_xpath_if_present(driver, xpath, timeout=5):
+    """xpath: én XPath eller en liste med alternativer som kjører i samme race."""
+    candidates = [xpath] if isinstance(xpath, str) else list(xpath)
+    try:
+        el, _winner = race_selectors(driver, "xpath", candidates, timeout=timeout, clickable=True)
+        el.click()
+        return True
+    except Exception:
+        return False
+
+
+def type_into(driver, css_list: str, text: str, timeout=15):
+    el = wait_any_css(driver, css_list, timeout=timeout)
+    try:
+        el.clear()
+    except Exception:
+        pass
+    el.send_keys(text)
+    return True
+
+
+def reload_and_wait(driver, timeout=15):
+    """
+    location.reload() og vent til det nye dokumentet faktisk er i gang (ny performance.timeOrigin og
+    readyState forbi 'loading'), i stedet for en fast pause. Returnerer False ved timeout.
+    """
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.common.exceptions import TimeoutException, WebDriverException
+
+    origin = driver.execute_script("return performance.timeOrigin;")
+    driver.execute_script("location.reload();")
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.1, ignored_exceptions=(WebDriverException,)).until(
+            lambda d: d.execute_script(
+                "return performance.timeOrigin !== arguments[0] && document.readyState !== 'loading';", origin))
+        return True
+    except TimeoutException:
+        return False
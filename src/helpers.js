@@ -1,12 +1,47 @@
+import { readFileSync, writeFileSync } from 'node:fs';
+import { homedir } from 'node:os';
+import { join } from 'node:path';
+
+// Treffstatistikk per selektor, delt med Python-scraperen (samme fil og format)
+const STATS_FILE = process.env.SELECTOR_STATS_FILE || join(homedir(), '.qs-selector-stats.json');
+
+function loadStats() {
+  try {
+    return JSON.parse(readFileSync(STATS_FILE, 'utf8'));
+  } catch (_) {
+    return {};
+  }
+}
+
+function recordHit(selector, ms) {
+  const stats = loadStats();
+  const entry = stats[selector] ?? { hits: 0, ms: 0 };
+  entry.hits += 1;
+  entry.ms = Math.round((entry.ms + (ms - entry.ms) / entry.hits) * 10) / 10;
+  stats[selector] = entry;
+  try {
+    writeFileSync(STATS_FILE, JSON.stringify(stats, null, 1));
+  } catch (_) { }
+}
+
 export async function waitForAnySelector(page, candidates, opts = {}) {
-  const list = candidates.split(',').map(s => s.trim()).filter(Boolean);
-  for (const selector of list) {
-    try {
-      await page.waitForSelector(selector, { state: 'visible', timeout: opts.timeout ?? 8000 });
-      return selector;
-    } catch (_) { }
+  const stats = loadStats();
+  const list = candidates.split(',').map(s => s.trim()).filter(Boolean)
+    .sort((a, b) => (stats[b]?.hits ?? 0) - (stats[a]?.hits ?? 0));
+  const timeout = opts.timeout ?? 8000;
+  const started = Date.now();
+  // Alle kandidatene venter samtidig med felles timeout – første synlige vinner
+  try {
+    const winner = await Promise.any(list.map(selector =>
+      page.waitForSelector(selector, { state: 'visible', timeout }).then(() => selector)
+    ));
+    const ms = Date.now() - started;
+    recordHit(winner, ms);
+    console.log(`🎯 Selektor vant etter ${ms}ms: ${winner}`);
+    return winner;
+  } catch (_) {
+    throw new Error(`Ingen av kandidat-selektorene dukket opp: ${candidates}`);
   }
-  throw new Error(`Ingen av kandidat-selektorene dukket opp: ${candidates}`);
 }
 
 export async function safeClick(page, selector) {
@@ -1,6 +1,7 @@
 import 'dotenv/config';
 import { chromium } from 'playwright';
 import { waitForAnySelector, safeClick, typeAndEnter, dumpArtifacts } from './helpers.js';
+import { restoreSession, saveSession } from './session.js';
 
 const {
   TARGET_URL,
@@ -30,6 +31,8 @@ async function main() {
     ignoreHTTPSErrors: true
   });
 
+  // Lagret sesjon fra kiosken (eller en tidligere kjøring) settes inn før første navigasjon
+  const restored = await restoreSession(ctx);
   const page = await ctx.newPage();
 
   page.on('response', async (resp) => {
@@ -42,7 +45,11 @@ async function main() {
   const resp = await page.goto(TARGET_URL, { waitUntil: 'domcontentloaded', timeout: 60000 });
   if (!resp || !resp.ok()) console.warn('Advarsel: Første svar ikke OK, fortsetter...');
 
-  if (USERNAME && PASSWORD) {
+  const onSignin = () => /signin|login/i.test(page.url());
+  if (restored && !onSignin()) {
+    console.log('✅ Allerede innlogget (lagret sesjon).');
+  } else if (USERNAME && PASSWORD) {
+    if (restored) console.warn('⚠️  Lagret sesjon ble avvist – logger inn via skjemaet.');
     if (!SEL_USERNAME || !SEL_PASSWORD || !SEL_SUBMIT) {
       throw new Error('Innlogging aktivert, men selektorer mangler i .env');
     }
@@ -57,6 +64,7 @@ async function main() {
     await safeClick(page, submitSel);
 
     await page.waitForLoadState('domcontentloaded', { timeout: 30000 });
+    if (!onSignin()) await saveSession(ctx, page);
   }
 
   if (READY_SELECTOR) {
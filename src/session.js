@@ -0,0 +1,106 @@
+import { createCipheriv, createDecipheriv, randomBytes } from 'node:crypto';
+import { existsSync, readFileSync, writeFileSync, renameSync, openSync, closeSync } from 'node:fs';
+import { homedir } from 'node:os';
+import { join } from 'node:path';
+
+// Delt, kryptert sesjon – samme fil, nøkkel og format som quicksight_kiosk/session.py (AES-256-GCM)
+const STORE_FILE = process.env.SESSION_STORE_FILE || join(homedir(), '.qs-session.enc');
+const KEY_FILE = process.env.SESSION_KEY_FILE || join(homedir(), '.qs-session.key');
+const MAX_AGE_SECS = Number(process.env.SESSION_MAX_AGE_SECS || 8 * 3600);
+const ENABLED = !['0', 'false', 'no', 'off'].includes((process.env.SESSION_STORE || 'true').toLowerCase());
+const AAD = Buffer.from('qs-session-v1');
+
+function loadKey() {
+  if (process.env.SESSION_STORE_KEY) return Buffer.from(process.env.SESSION_STORE_KEY.trim(), 'base64');
+  if (!existsSync(KEY_FILE)) {
+    try {
+      const fd = openSync(KEY_FILE, 'wx', 0o600);
+      writeFileSync(fd, randomBytes(32));
+      closeSync(fd);
+    } catch (_) { }  // En annen prosess rakk å lage nøkkelen først
+  }
+  return readFileSync(KEY_FILE);
+}
+
+// CDP-cookie (Python) -> Playwright-cookie. Sesjonscookies har ingen expires.
+function toPlaywrightCookie(c) {
+  const out = { name: c.name, value: c.value, domain: c.domain, path: c.path || '/' };
+  if (c.expires !== undefined) out.expires = c.expires;
+  if (c.httpOnly !== undefined) out.httpOnly = c.httpOnly;
+  if (c.secure !== undefined) out.secure = c.secure;
+  if (c.sameSite) out.sameSite = c.sameSite;
+  return out;
+}
+
+function fromPlaywrightCookie(c) {
+  const out = { name: c.name, value: c.value, domain: c.domain, path: c.path, httpOnly: c.httpOnly, secure: c.secure };
+  if (c.expires > 0) out.expires = c.expires;
+  if (c.sameSite) out.sameSite = c.sameSite;
+  return out;
+}
+
+export function loadSession() {
+  if (!ENABLED || !existsSync(STORE_FILE)) return null;
+  try {
+    const envelope = JSON.parse(readFileSync(STORE_FILE, 'utf8'));
+    const data = Buffer.from(envelope.data, 'base64');
+    const decipher = createDecipheriv('aes-256-gcm', loadKey(), Buffer.from(envelope.nonce, 'base64'));
+    decipher.setAAD(AAD);
+    decipher.setAuthTag(data.subarray(data.length - 16));
+    const session = JSON.parse(Buffer.concat([decipher.update(data.subarray(0, data.length - 16)), decipher.final()]));
+    if (Date.now() / 1000 >= (session.expires_at ?? 0)) {
+      console.log('ℹ️  Lagret sesjon er utløpt.');
+      return null;
+    }
+    return session;
+  } catch (err) {
+    console.warn(`⚠️  Kunne ikke lese lagret sesjon (${err?.code || err?.name}) – logger inn på vanlig måte.`);
+    return null;
+  }
+}
+
+// Sett inn lagret sesjon i konteksten før første navigasjon. true hvis en gyldig sesjon ble satt inn.
+export async function restoreSession(ctx) {
+  const session = loadSession();
+  if (!session) return false;
+  const now = Date.now() / 1000;
+  const cookies = session.cookies.filter(c => c.expires === undefined || c.expires > now).map(toPlaywrightCookie);
+  await ctx.addCookies(cookies);
+  if (Object.keys(session.local_storage || {}).length) {
+    await ctx.addInitScript(stored => {
+      const items = stored[location.origin];
+      if (!items) return;
+      try {
+        for (const [k, v] of Object.entries(items)) {
+          if (localStorage.getItem(k) === null) localStorage.setItem(k, v);
+        }
+      } catch (e) { }
+    }, session.local_storage);
+  }
+  const ageMin = Math.round((now - session.saved_at) / 60);
+  console.log(`🔑 Lagret sesjon satt inn (${cookies.length} cookies, ${ageMin} min gammel).`);
+  return true;
+}
+
+export async function saveSession(ctx, page) {
+  if (!ENABLED) return false;
+  const now = Date.now() / 1000;
+  const [origin, storage] = await page.evaluate(() => [location.origin, Object.fromEntries(Object.entries(localStorage))]);
+  const session = {
+    saved_at: now,
+    expires_at: now + MAX_AGE_SECS,
+    cookies: (await ctx.cookies()).map(fromPlaywrightCookie),
+    local_storage: Object.keys(storage).length ? { [origin]: storage } : {}
+  };
+  const nonce = randomBytes(12);
+  const cipher = createCipheriv('aes-256-gcm', loadKey(), nonce);
+  cipher.setAAD(AAD);
+  const data = Buffer.concat([cipher.update(JSON.stringify(session)), cipher.final(), cipher.getAuthTag()]);
+  const envelope = { v: 1, alg: 'AES-256-GCM', nonce: nonce.toString('base64'), data: data.toString('base64') };
+  // Atomisk bytte: andre prosesser leser aldri en halvskrevet fil
+  const tmp = `${STORE_FILE}.${process.pid}.tmp`;
+  writeFileSync(tmp, JSON.stringify(envelope), { mode: 0o600 });
+  renameSync(tmp, STORE_FILE);
+  console.log(`🔑 Sesjon lagret (${session.cookies.length} cookies).`);
+  return true;
+}
@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+"""Felles oppsett: målinger og størrelsesfilen skrives til en midlertidig mappe, ikke hjemmemappen."""
+
+import os
+import tempfile
+
+_TMP = tempfile.mkdtemp(prefix="qs-tests-")
+os.environ.setdefault("METRICS_FILE", os.path.join(_TMP, "qs-metrics.jsonl"))
+os.environ.setdefault("NETWORK_SIZES_FILE", os.path.join(_TMP, "qs-blocked-sizes.json"))
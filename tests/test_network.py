@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+import json
+
+import pytest
+
+from quicksight_kiosk import network
+
+API = "https://eu-central-1.quicksight.aws.amazon.com/sn/api/dashboards/x"
+PANORAMA_API = "https://eu-central-1.quicksight.aws.amazon.com/sn/api/panorama/batch"
+TELEMETRY = "https://panorama.aws.amazon.com/panorama/collect"
+FONT = "https://fonts.gstatic.com/s/roboto.woff2"
+
+
+@pytest.fixture
+def lists(monkeypatch):
+    monkeypatch.setattr(network, "NETWORK_BLOCKLIST", list(network.DEFAULT_BLOCKLIST))
+    monkeypatch.setattr(network, "NETWORK_ALLOWLIST", list(network.DEFAULT_ALLOWLIST))
+
+
+@pytest.mark.parametrize("a, b, expected", [
+    ("abc", "abc", True),
+    ("abc", "abd", False),
+    ("a*c", "abc", True),
+    ("a*c", "abd", False),
+    ("*x*", "*y*", True),
+    ("https://a.com/*", "https://b.com/*", False),
+    ("https://a.com/*", "*fonts.gstatic.com*", True),
+    ("*panorama*", "*quicksight.aws.amazon.com/sn/api/*", True),
+    ("https://a.com/x", "*.css", False),
+    ("*", "", True),
+    ("a*", "", False),
+])
+def test_globs_overlap(a, b, expected):
+    assert network.globs_overlap(a, b) is expected
+    assert network.globs_overlap(b, a) is expected
+
+
+def test_block_pattern(lists):
+    assert network.block_pattern(TELEMETRY) == "*panorama*"
+    assert network.block_pattern(FONT) == "*fonts.gstatic.com*"
+    assert network.block_pattern(API) is None
+    # Allowlist vinner over blokkmønstrene per request
+    assert network.url_allowed(PANORAMA_API)
+    assert network.block_pattern(PANORAMA_API) is None
+
+
+def test_safe_blocklist_drops_patterns_that_can_hit_allowlist(monkeypatch, capsys):
+    monkeypatch.setattr(network, "NETWORK_ALLOWLIST", ["https://eu-central-1.quicksight.aws.amazon.com/*"])
+    monkeypatch.setattr(network, "NETWORK_BLOCKLIST", ["*panorama*", "https://fonts.gstatic.com/*"])
+    assert network.safe_blocklist() == ["https://fonts.gstatic.com/*"]
+    assert "1 av 2" in capsys.readouterr().out
+
+
+def test_estimate_blocked_bytes():
+    sizes = {"*a*": [4, 2000], "*b*": [0, 0]}
+    assert network.estimate_blocked_bytes({"*a*": 3}, sizes) == 1500
+    assert network.estimate_blocked_bytes({"*a*": 2, "*c*": 5}, sizes) == 1000
+    assert network.estimate_blocked_bytes({"*b*": 1, "*c*": 5}, sizes) is None
+    assert network.estimate_blocked_bytes({}, sizes) is None
+
+
+def test_save_sizes_accumulates(monkeypatch, tmp_path):
+    monkeypatch.setattr(network, "NETWORK_SIZES_FILE", str(tmp_path / "sizes.json"))
+    assert network._load_sizes() == {}
+    network._save_sizes({"*a*": (2, 100)})
+    network._save_sizes({"*a*": (1, 50), "*b*": (1, 10)})
+    assert network._load_sizes() == {"*a*": [3, 150], "*b*": [1, 10]}
+
+
+class FakeSocket:
+    """DevTools-websocket som spiller av hendelser og samler det filteret sender."""
+
+    def __init__(self, events):
+        self.events = [json.dumps(e) for e in events]
+        self.sent = []
+
+    def send(self, text):
+        self.sent.append(json.loads(text))
+
+    def recv(self):
+        if not self.events:
+            raise ConnectionError("lukket")
+        return self.events.pop(0)
+
+
+def paused(url, request_id, session="S1"):
+    return {"method": "Fetch.requestPaused", "sessionId": session,
+            "params": {"requestId": request_id, "request": {"url": url}}}
+
+
+def test_filter_loop_allows_and_blocks_per_request(lists):
+    ws = FakeSocket([
+        {"method": "Target.attachedToTarget",
+         "params": {"sessionId": "S1", "targetInfo": {"type": "page"}, "waitingForDebugger": True}},
+        {"method": "Target.attachedToTarget",
+         "params": {"sessionId": "W1", "targetInfo": {"type": "service_worker"}, "waitingForDebugger": True}},
+        paused(TELEMETRY, "r1"),
+        paused(PANORAMA_API, "r2"),
+        paused(FONT, "r3"),
+    ])
+    state = {"blocked": {}, "allowed": 0}
+    with pytest.raises(ConnectionError):
+        network._filter_loop(ws, state)
+
+    sent = [(m["method"], m.get("sessionId"), m["params"]) for m in ws.sent]
+    assert sent[0][0] == "Target.setAutoAttach" and sent[0][2]["waitForDebuggerOnStart"]
+    assert sent[1] == ("Fetch.enable", "S1", {"patterns": [{"urlPattern": p} for p in network.DEFAULT_BLOCKLIST]})
+    assert sent[2] == ("Runtime.runIfWaitingForDebugger", "S1", {})
+    # Ingen Fetch for service workers, men de slippes videre
+    assert sent[3] == ("Runtime.runIfWaitingForDebugger", "W1", {})
+    assert sent[4] == ("Fetch.failRequest", "S1", {"requestId": "r1", "errorReason": "BlockedByClient"})
+    assert sent[5] == ("Fetch.continueRequest", "S1", {"requestId": "r2"})
+    assert sent[6] == ("Fetch.failRequest", "S1", {"requestId": "r3", "errorReason": "BlockedByClient"})
+    assert state == {"blocked": {"*panorama*": 1, "*fonts.gstatic.com*": 1}, "allowed": 1}
+    assert len({m["id"] for m in ws.sent}) == len(ws.sent)
+
+
+def test_debugger_address():
+    class Driver:
+        capabilities = {"goog:chromeOptions": {"debuggerAddress": "localhost:9222"}}
+
+    assert network._debugger_address(Driver()) == "localhost:9222"
+    assert network._debugger_address(object()) is None
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime
+
+import pytest
+
+from quicksight_kiosk import schedule
+
+POLICY = "07:00-18:00=120-600, 22:00-06:00=900-3600"
+
+
+def at(hhmm):
+    hh, mm = map(int, hhmm.split(":"))
+    return datetime(2026, 3, 10, hh, mm)
+
+
+@pytest.fixture
+def adaptive(monkeypatch):
+    monkeypatch.setattr(schedule, "REFRESH_ADAPTIVE", True)
+    monkeypatch.setattr(schedule, "REFRESH_BACKOFF", 2.0)
+    monkeypatch.setattr(schedule, "REFRESH_MIN_SECS", 300)
+    monkeypatch.setattr(schedule, "REFRESH_MAX_SECS", 1800)
+
+
+def test_parse_refresh_policy():
+    assert schedule.parse_refresh_policy(POLICY) == [(420, 1080, 120, 600), (1320, 360, 900, 3600)]
+    assert schedule.parse_refresh_policy("") == []
+
+
+@pytest.mark.parametrize("spec", [
+    "07:00-18:00",
+    "07:00=120-600",
+    "7-18=120-600",
+    "25:00-06:00=120-600",
+    "07:00-18:60=120-600",
+    "07:00-18:00=abc-600",
+    "07:00-18:00=120",
+])
+def test_parse_refresh_policy_rejects_bad_format(spec):
+    with pytest.raises(ValueError, match="HH:MM-HH:MM=min-maks"):
+        schedule.parse_refresh_policy(spec)
+
+
+@pytest.mark.parametrize("spec", ["07:00-18:00=0-600", "07:00-18:00=600-120", "07:00-18:00=-5-10"])
+def test_parse_refresh_policy_rejects_bad_bounds(spec):
+    with pytest.raises(ValueError):
+        schedule.parse_refresh_policy(spec)
+
+
+@pytest.mark.parametrize("hhmm, bounds", [
+    ("07:00", (120, 600)),
+    ("12:30", (120, 600)),
+    ("17:59", (120, 600)),
+    ("22:00", (900, 3600)),
+    ("23:45", (900, 3600)),
+    ("02:00", (900, 3600)),
+    ("05:59", (900, 3600)),
+])
+def test_refresh_bounds_inside_windows(adaptive, hhmm, bounds):
+    assert schedule.refresh_bounds(schedule.parse_refresh_policy(POLICY), at(hhmm)) == bounds
+
+
+@pytest.mark.parametrize("hhmm", ["06:00", "06:59", "18:00", "21:59"])
+def test_refresh_bounds_falls_back_outside_windows(adaptive, hhmm):
+    assert schedule.refresh_bounds(schedule.parse_refresh_policy(POLICY), at(hhmm)) == (300, 1800)
+
+
+def test_refresh_bounds_never_below_min(adaptive, monkeypatch):
+    monkeypatch.setattr(schedule, "REFRESH_MAX_SECS", 60)
+    assert schedule.refresh_bounds((), at("12:00")) == (300, 300)
+
+
+def test_next_refresh_interval_backs_off_within_bounds(adaptive):
+    policies = schedule.parse_refresh_policy(POLICY)
+    noon = at("12:00")
+    assert schedule.next_refresh_interval(120, False, policies, noon) == 240
+    assert schedule.next_refresh_interval(400, False, policies, noon) == 600
+    assert schedule.next_refresh_interval(600, True, policies, noon) == 120
+    assert schedule.next_refresh_interval(600, None, policies, noon) == 120
+    # Intervallet fra dagen holdes oppe til nattens minimum
+    assert schedule.next_refresh_interval(240, False, policies, at("23:00")) == 900
+
+
+def test_next_refresh_interval_fixed_when_not_adaptive(monkeypatch):
+    monkeypatch.setattr(schedule, "REFRESH_ADAPTIVE", False)
+    monkeypatch.setattr(schedule, "REFRESH_SECS", 300)
+    assert schedule.next_refresh_interval(900, False) == 300
+
+
+def test_next_policy_boundary():
+    policies = schedule.parse_refresh_policy(POLICY)
+    assert schedule.next_policy_boundary(policies, at("12:00")) == at("18:00")
+    assert schedule.next_policy_boundary(policies, at("23:00")).date() > at("23:00").date()
+    assert schedule.next_policy_boundary((), at("12:00")) is None
+
+
+def test_next_restart_at():
+    assert schedule.next_restart_at(("06:00", "22:00"), at("12:00")) == at("22:00")
+    assert schedule.next_restart_at((), at("12:00")) == datetime.max
+
+
+def test_theme_by_time(monkeypatch):
+    monkeypatch.delenv("THEME", raising=False)
+    assert schedule.get_current_theme(at("06:29")) == "midnight"
+    assert schedule.get_current_theme(at("06:30")) == "light"
+    assert schedule.get_current_theme(at("22:30")) == "midnight"
+    monkeypatch.setenv("THEME", "Midnight")
+    assert schedule.get_current_theme(at("12:00")) == "midnight"
+    assert schedule.next_theme_change(at("12:00")) is None
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+import os
+import signal
+import time
+
+import pytest
+
+from quicksight_kiosk import scheduler as sch
+
+
+class Stop(KeyboardInterrupt):
+    """Avslutter run_scheduler; KeyboardInterrupt går forbi on_error."""
+
+
+def stop():
+    raise Stop
+
+
+def test_next_due_follows_heap_order():
+    sched = sch.new_scheduler()
+    sch.schedule(sched, "b", lambda: None, 20)
+    sch.schedule(sched, "a", lambda: None, 10)
+    assert sch._next_due(sched)[1] == "a"
+    assert 9 < sch.due_in(sched, "a") <= 10
+    assert sch.due_in(sched, "unknown") is None
+
+
+def test_reschedule_and_cancel_drop_stale_entries():
+    sched = sch.new_scheduler()
+    sch.schedule(sched, "a", lambda: None, 10)
+    sch.schedule(sched, "b", lambda: None, 20)
+    sch.reschedule(sched, "a", 30)
+    assert sch._next_due(sched)[1] == "b"
+    # Det gamle innslaget for "a" er kastet, det nye ligger igjen
+    assert [name for _, _, name in sched["heap"]].count("a") == 1
+    sch.cancel(sched, "b")
+    assert sch._next_due(sched)[1] == "a"
+    sch.cancel(sched, "a")
+    assert sch._next_due(sched) == (None, None)
+    assert sched["heap"] == []
+
+
+def test_reschedule_ignores_unknown_task():
+    sched = sch.new_scheduler()
+    sch.reschedule(sched, "missing", 0)
+    assert sched["heap"] == [] and sched["tasks"] == {}
+
+
+def test_run_scheduler_runs_tasks_in_due_order():
+    sched = sch.new_scheduler()
+    ran = []
+    sch.schedule(sched, "late", lambda: ran.append("late"), 0.02)
+    sch.schedule(sched, "early", lambda: ran.append("early"), 0.0)
+    sch.schedule(sched, "stop", stop, 0.05)
+    with pytest.raises(Stop):
+        sch.run_scheduler(sched, on_signal=lambda name: None)
+    assert ran == ["early", "late"]
+
+
+def test_run_scheduler_repeats_until_task_returns_none():
+    sched = sch.new_scheduler()
+    runs = []
+
+    def task():
+        runs.append(time.monotonic())
+        return 0.0 if len(runs) < 3 else None
+
+    sch.schedule(sched, "task", task, 0)
+    sch.schedule(sched, "stop", stop, 0.05)
+    with pytest.raises(Stop):
+        sch.run_scheduler(sched, on_signal=lambda name: None)
+    assert len(runs) == 3
+
+
+def test_run_scheduler_on_error_sets_retry_delay():
+    sched = sch.new_scheduler()
+    errors, runs = [], []
+
+    def flaky():
+        runs.append(1)
+        if len(runs) == 1:
+            raise RuntimeError("boom")
+        return None
+
+    def on_error(name, exc):
+        errors.append((name, str(exc)))
+        return 0.0
+
+    sch.schedule(sched, "flaky", flaky, 0)
+    sch.schedule(sched, "stop", stop, 0.05)
+    with pytest.raises(Stop):
+        sch.run_scheduler(sched, on_signal=lambda name: None, on_error=on_error)
+    assert errors == [("flaky", "boom")]
+    assert len(runs) == 2
+
+
+def test_run_scheduler_on_error_none_stops_task():
+    sched = sch.new_scheduler()
+    runs = []
+    sch.schedule(sched, "bad", lambda: runs.append(1) or 1 / 0, 0)
+    sch.schedule(sched, "stop", stop, 0.05)
+    with pytest.raises(Stop):
+        sch.run_scheduler(sched, on_signal=lambda name: None, on_error=lambda name, exc: None)
+    assert runs == [1]
+    assert sch.due_in(sched, "bad") is None
+
+
+def test_run_scheduler_without_on_error_raises():
+    sched = sch.new_scheduler()
+    sch.schedule(sched, "bad", lambda: 1 / 0, 0)
+    with pytest.raises(ZeroDivisionError):
+        sch.run_scheduler(sched, on_signal=lambda name: None)
+
+
+@pytest.fixture
+def signals():
+    """install_signal_handlers med opprydding: gamle signalhåndterere og wakeup-fd settes tilbake."""
+    names = [name for name in sch.SIGNAL_NAMES if hasattr(signal, name)]
+    if len(names) < len(sch.SIGNAL_NAMES):
+        pytest.skip("SIGHUP/SIGUSR1 finnes ikke på denne plattformen")
+    old = {name: signal.getsignal(getattr(signal, name)) for name in names}
+    sched = sch.new_scheduler()
+    sch.install_signal_handlers(sched)
+    yield sched
+    signal.set_wakeup_fd(-1)
+    os.close(sched["wakeup_fd"])
+    for name, handler in old.items():
+        signal.signal(getattr(signal, name), handler)
+
+
+def test_signal_wakes_sleep_immediately(signals):
+    t0 = time.monotonic()
+    os.kill(os.getpid(), signal.SIGUSR1)
+    sch._sleep(signals, 5)
+    assert time.monotonic() - t0 < 1
+    assert signals["signals"] == ["SIGUSR1"]
+
+
+def test_signal_reschedules_task(signals):
+    ran = []
+
+    def on_signal(name):
+        ran.append(name)
+        sch.reschedule(signals, "refresh", 0)
+
+    def refresh():
+        ran.append("refresh")
+        raise Stop
+
+    sch.schedule(signals, "refresh", refresh, 3600)
+    sch.schedule(signals, "kick", lambda: os.kill(os.getpid(), signal.SIGHUP), 0)
+    t0 = time.monotonic()
+    with pytest.raises(Stop):
+        sch.run_scheduler(signals, on_signal)
+    assert ran == ["SIGHUP", "refresh"]
+    assert time.monotonic() - t0 < 1
+
+
+def test_seconds_until_is_capped(monkeypatch):
+    from datetime import datetime, timedelta
+    now = datetime(2026, 3, 10, 12, 0)
+    monkeypatch.setattr(sch, "WALL_RECHECK_SECS", 3600)
+    assert sch.seconds_until(now + timedelta(minutes=5), now) == 300
+    assert sch.seconds_until(now + timedelta(hours=5), now) == 3600
+    assert sch.seconds_until(now - timedelta(minutes=5), now) == 0
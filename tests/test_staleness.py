@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+import base64
+import struct
+import zlib
+
+import pytest
+
+from quicksight_kiosk import staleness
+
+
+def _paeth(a, b, c):
+    p = a + b - c
+    pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+    return a if pa <= pb and pa <= pc else b if pb <= pc else c
+
+
+def encode_png(width, height, pixels, color_type=2, filters=(0,), depth=8):
+    """Liten PNG-koder for testene. pixels: rader med bytes; filters brukes rad for rad, om igjen."""
+    bpp = {0: 1, 2: 3, 4: 2, 6: 4}[color_type]
+    raw, prev = b"", bytes(len(pixels[0]))
+    for y, line in enumerate(pixels):
+        ftype = filters[y % len(filters)]
+        out = bytearray()
+        for x, value in enumerate(line):
+            a = line[x - bpp] if x >= bpp else 0
+            b = prev[x]
+            c = prev[x - bpp] if x >= bpp else 0
+            pred = (0, a, b, (a + b) >> 1, _paeth(a, b, c))[ftype]
+            out.append((value - pred) & 0xFF)
+        raw += bytes([ftype]) + bytes(out)
+        prev = line
+
+    def chunk(ctype, data):
+        return struct.pack(">I4s", len(data), ctype) + data + struct.pack(">I", zlib.crc32(ctype + data))
+
+    ihdr = struct.pack(">IIBBBBB", width, height, depth, color_type, 0, 0, 0)
+    # IDAT delt i to biter, som Chrome også kan gjøre
+    data = zlib.compress(raw)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", ihdr) + chunk(b"IDAT", data[:5]) + chunk(b"IDAT", data[5:])
+            + chunk(b"IEND", b""))
+
+
+def rgb_rows(width, height, color):
+    """color(x, y) -> (r, g, b)"""
+    return [bytes(v for x in range(width) for v in color(x, y)) for y in range(height)]
+
+
+def gray(r, g, b):
+    return (r * 299 + g * 587 + b * 114) // 1000
+
+
+def gradient(x, y):
+    return (x * 37 + y * 11) % 256, (x * 5 + y * 53) % 256, (x * y * 7) % 256
+
+
+@pytest.mark.parametrize("ftype", [0, 1, 2, 3, 4])
+def test_decode_png_gray_rgb_all_filters(ftype):
+    width, height = 7, 5
+    png = encode_png(width, height, rgb_rows(width, height, gradient), filters=(ftype,))
+    w, h, values = staleness._decode_png_gray(png)
+    assert (w, h) == (width, height)
+    assert values == [gray(*gradient(x, y)) for y in range(height) for x in range(width)]
+
+
+def test_decode_png_gray_mixed_filters_and_alpha():
+    width, height = 6, 6
+    rows = [bytes(v for x in range(width) for v in (*gradient(x, y), 255)) for y in range(height)]
+    _, _, values = staleness._decode_png_gray(encode_png(width, height, rows, color_type=6, filters=(4, 3, 2, 1, 0)))
+    assert values == [gray(*gradient(x, y)) for y in range(height) for x in range(width)]
+
+
+def test_decode_png_gray_grayscale():
+    rows = [bytes([0, 128, 255]), bytes([10, 20, 30])]
+    assert staleness._decode_png_gray(encode_png(3, 2, rows, color_type=0, filters=(1, 2))) == \
+        (3, 2, [0, 128, 255, 10, 20, 30])
+
+
+def test_decode_png_gray_rejects_16_bit():
+    with pytest.raises(ValueError):
+        staleness._decode_png_gray(encode_png(1, 1, [bytes(6)], depth=16))
+
+
+class FakeDriver:
+    """Svarer på Page.captureScreenshot med en fast PNG."""
+
+    def __init__(self, png):
+        self.png = png
+        self.calls = []
+
+    def get_window_size(self):
+        return {"width": 320, "height": 180}
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.calls.append((cmd, params))
+        return {"data": base64.b64encode(self.png).decode()}
+
+
+def test_screen_fingerprint_uniform_is_blank():
+    png = encode_png(32, 18, rgb_rows(32, 18, lambda x, y: (255, 255, 255)))
+    fp = staleness.screen_fingerprint(FakeDriver(png))
+    assert len(fp["tiles"]) == 16 * 9
+    assert fp["stddev"] == 0 and fp["mean"] == 255
+    assert fp["stddev"] < staleness.BLANK_STDDEV
+
+
+def test_screen_fingerprint_half_dark():
+    png = encode_png(32, 18, rgb_rows(32, 18, lambda x, y: (0, 0, 0) if x < 16 else (255, 255, 255)))
+    driver = FakeDriver(png)
+    fp = staleness.screen_fingerprint(driver, size={"width": 640, "height": 360})
+    assert fp["stddev"] > staleness.BLANK_STDDEV
+    # Høyre halvdel av hver rad er over snittet
+    assert fp["hash"] == int(("0" * 8 + "1" * 8) * 9, 2)
+    cmd, params = driver.calls[0]
+    assert cmd == "Page.captureScreenshot" and params["clip"]["width"] == 640 and params["clip"]["scale"] == 0.05
+
+
+def test_fingerprint_delta():
+    a = {"tiles": [0.0, 10.0, 20.0, 30.0]}
+    b = {"tiles": [0.0, 12.0, 16.0, 30.0]}
+    assert staleness.fingerprint_delta(a, a) == 0
+    assert staleness.fingerprint_delta(a, b) == pytest.approx(1.5)
+    assert staleness.fingerprint_delta(a, b) == staleness.fingerprint_delta(b, a)
+
+
+def test_frame_hash_depends_on_pixels():
+    one = encode_png(4, 4, rgb_rows(4, 4, gradient))
+    other = encode_png(4, 4, rgb_rows(4, 4, lambda x, y: (0, 0, 0)))
+    assert staleness.frame_hash(FakeDriver(one)) == staleness.frame_hash(FakeDriver(one))
+    assert staleness.frame_hash(FakeDriver(one)) != staleness.frame_hash(FakeDriver(other))
+
+
+@pytest.fixture
+def data_state(monkeypatch):
+    monkeypatch.setattr(staleness, "DATA_STATE", {})
+    monkeypatch.setattr(staleness, "DATA_STALE_FACTOR", 4)
+    monkeypatch.setattr(staleness, "REFRESH_MIN_SECS", 60)
+    monkeypatch.setattr(staleness, "REFRESH_MAX_SECS", 1800)
+    return staleness.DATA_STATE
+
+
+def state(**kw):
+    base = {"hash": "h", "changed": False, "changed_at": 1000.0, "gap": None, "stale": 0, "frame": None,
+            "render_stuck": 0}
+    base.update(kw)
+    return base
+
+
+def test_data_stale_uses_gap_between_changes(data_state):
+    data_state["u"] = state(gap=300)
+    assert staleness.data_stale("u", now=1000 + 4 * 300) is None
+    assert staleness.data_stale("u", now=1000 + 4 * 300 + 1) == 1201
+
+
+def test_data_stale_defaults_to_max_interval_and_doubles(data_state):
+    data_state["u"] = state()
+    assert staleness.data_stale("u", now=1000 + 4 * 1800) is None
+    assert staleness.data_stale("u", now=1000 + 4 * 1800 + 1) is not None
+    data_state["u"]["stale"] = 1
+    assert staleness.data_stale("u", now=1000 + 4 * 1800 + 1) is None
+    assert staleness.data_stale("u", now=1000 + 8 * 1800 + 1) is not None
+
+
+def test_data_stale_never_below_min_interval(data_state):
+    data_state["u"] = state(gap=5)
+    assert staleness.data_stale("u", now=1000 + 4 * 60) is None
+    assert staleness.data_stale("u", now=1000 + 4 * 60 + 1) is not None
+
+
+@pytest.mark.parametrize("changed", [True, None])
+def test_data_stale_only_when_unchanged(data_state, changed):
+    data_state["u"] = state(changed=changed)
+    assert staleness.data_stale("u", now=10 ** 9) is None
+    assert staleness.data_stale("unknown", now=10 ** 9) is None
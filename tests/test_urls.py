@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from quicksight_kiosk import urls
+
+
+def test_registry_has_every_combination():
+    assert len(urls.REGISTRY) == len(urls.THEMES) * len(urls.MODES) * len(urls.CITIES)
+    for (theme, mode, city), url in urls.REGISTRY.items():
+        assert url == urls.build_dashboard_url(theme, mode, city)
+
+
+def test_city_filter_is_percent_encoded_once():
+    url = urls.dashboard_url("light", "operations", "oslo")
+    assert url.endswith("#p.City=oslo%20%26%20l%C3%B8renskog")
+    assert urls.CITY_FILTERS["bodø"] == "bod%C3%B8"
+    assert urls.CITY_FILTERS["asker"] == "asker%20%26%20b%C3%A6rum"
+
+
+def test_url_without_city_has_no_filter():
+    url = urls.build_dashboard_url("midnight", "mechanics")
+    assert "#" not in url
+    assert urls.MIDNIGHT_DASHBOARD_ID in url and urls.MECHANICS_SHEET_ID_MIDNIGHT in url
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("Bodo", ["bodø"]),
+    ("goteborg", ["göteborg"]),
+    ("OSLO ", ["oslo"]),
+    ("trondhiem", ["trondheim"]),
+])
+def test_suggest_folds_accents_and_typos(value, expected):
+    assert urls.suggest(value, urls.CITIES) == expected
+
+
+def test_suggest_matches_labels():
+    labels = {"asker": "asker & bærum"}
+    assert urls.suggest("asker & baerum", urls.CITIES, labels) == ["asker"]
+
+
+def test_suggest_returns_at_most_three():
+    assert len(urls.suggest("a", urls.CITIES)) <= 3
+    assert urls.suggest("xyzzy", urls.CITIES) == []
+
+
+def test_validate():
+    assert urls.validate("light", "operations", "oslo") == []
+    assert urls.validate("auto") == []
+    assert urls.validate("") == []
+    [error] = urls.validate(mode="operation")
+    assert "operations" in error
+    [error] = urls.validate(city="Bergn")
+    assert "bergen" in error
+    assert len(urls.validate("dark", "x", "y")) == 3
+
+
+def test_dashboard_url_rejects_unknown_city_with_suggestion():
+    with pytest.raises(ValueError, match="stavanger"):
+        urls.dashboard_url("light", "operations", "stavangr")
+
+
+def test_dashboard_url_rejects_auto_theme():
+    with pytest.raises(ValueError, match="Ukjent dashboard"):
+        urls.dashboard_url("auto", "operations", "oslo")
+
+
+def test_require_valid_exits_with_code_2(capsys):
+    with pytest.raises(SystemExit) as exc:
+        urls.require_valid(city="osloo", source="CITY")
+    assert exc.value.code == 2
+    assert "oslo" in capsys.readouterr().out
+    urls.require_valid("light", "mechanics", "oslo")